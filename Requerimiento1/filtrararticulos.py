@@ -3,6 +3,8 @@ import re
 import sys
 from pathlib import Path
 
+from lecturabib import MIN_BYTES_PARALELO, leer_entradas, read_text, split_bib_entries
+
 BASE_DIR = Path(__file__).resolve().parent
 IN_DIR = BASE_DIR / "ArchivosDescargados"
 OUT_DIR = BASE_DIR / "ArchivosFiltrados"
@@ -13,12 +15,6 @@ DESCARTADOS = OUT_DIR / "articulosDescartados.bib"
 
 # ------------------------- Utilidades -------------------------
 
-def read_text(p: Path) -> str:
-    try:
-        return p.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        return p.read_text(encoding="latin-1")
-
 def normalize_doi(doi: str) -> str:
     if not doi:
         return ""
@@ -46,37 +42,6 @@ def has_abstract(entry: str) -> bool:
     val = (m.group(1) or m.group(2) or "").strip()
     return len(val) > 0
 
-def split_bib_entries(text: str) -> list[str]:
-    """
-    Divide un archivo .bib en entradas individuales respetando el balanceo de llaves.
-    Considera cualquier bloque que empiece por '@' y cierra con la llave de nivel 0.
-    """
-    entries = []
-    i = 0
-    n = len(text)
-    while i < n:
-        at = text.find('@', i)
-        if at == -1:
-            break
-        lb = text.find('{', at)
-        if lb == -1:
-            break
-        depth = 1
-        j = lb + 1
-        while j < n and depth > 0:
-            if text[j] == '{':
-                depth += 1
-            elif text[j] == '}':
-                depth -= 1
-            j += 1
-        entry = text[at:j]
-        if entry:
-            if not entry.endswith("\n\n"):
-                entry = entry.rstrip() + "\n\n"
-            entries.append(entry)
-        i = j
-    return entries
-
 # ------------------------- Lógica principal -------------------------
 
 def main():
@@ -108,8 +73,11 @@ def main():
     descartados = []
 
     for bf in bib_files:
-        text = read_text(bf)
-        entries = split_bib_entries(text)
+        # Exportaciones grandes: se parten en trozos y se procesan en paralelo
+        if bf.stat().st_size >= MIN_BYTES_PARALELO:
+            entries = leer_entradas(bf, modo="paralelo")
+        else:
+            entries = split_bib_entries(read_text(bf))
         print(f"[INFO] {bf.name}: {len(entries)} entradas")
 
         for e in entries:
@@ -0,0 +1,286 @@
+# Proyecto/Requerimiento1/lecturabib.py
+"""
+Lectura de archivos BibTeX grandes usando varios núcleos.
+
+El archivo se corta en trozos por fronteras seguras (un '@' al inicio de línea
+con las llaves balanceadas hasta ese punto), cada trozo se analiza en un
+proceso distinto y los resultados se unen respetando el orden original.
+
+Uso por consola:
+    python lecturabib.py archivo.bib [procesos]
+"""
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+# Por debajo de este tamaño no compensa levantar procesos
+MIN_BYTES_PARALELO = 4 * 1024 * 1024
+
+# Tipos de entrada que no son registros bibliográficos
+TIPOS_IGNORADOS = {"comment", "preamble", "string"}
+
+RE_INICIO = re.compile(rb'^[ \t]*@', re.M)
+RE_CABECERA = re.compile(r'\s*@\s*([A-Za-z]+)\s*[{(]\s*([^,\s]*)\s*,?')
+RE_NOMBRE = re.compile(r'\s*([A-Za-z][\w\-:.]*)\s*=\s*')
+RE_TRAS_VALOR = re.compile(r'\s*(.?)', re.S)
+RE_LLAVE = re.compile(r'[{}]')
+RE_COMILLA = re.compile(r'[{}"]')
+
+# ------------------------- Utilidades -------------------------
+
+def codificacion_archivo(data: bytes) -> str:
+    """utf-8 si todo el archivo lo es; si no, latin-1 (como filtrararticulos)."""
+    try:
+        data.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+def read_text(p: Path) -> str:
+    try:
+        return p.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        return p.read_text(encoding="latin-1")
+
+def _cierre_llave(text: str, i: int) -> int:
+    """
+    Posición justo después de la llave que cierra el bloque abierto antes de i
+    (len(text) si no se cierra). Salta de llave en llave con regex en vez de
+    recorrer carácter por carácter.
+    """
+    depth = 1
+    for m in RE_LLAVE.finditer(text, i):
+        if m.group() == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return m.end()
+    return len(text)
+
+def split_bib_entries(text: str) -> list[str]:
+    """
+    Divide un texto .bib en entradas individuales respetando el balanceo de llaves.
+    Cualquier bloque que empiece por '@' y cierre con la llave de nivel 0.
+    """
+    entries = []
+    i = 0
+    n = len(text)
+    while i < n:
+        at = text.find('@', i)
+        if at == -1:
+            break
+        lb = text.find('{', at)
+        if lb == -1:
+            break
+        j = _cierre_llave(text, lb + 1)
+        entry = text[at:j]
+        if entry:
+            if not entry.endswith("\n\n"):
+                entry = entry.rstrip() + "\n\n"
+            entries.append(entry)
+        i = j
+    return entries
+
+def _leer_valor(entry: str, i: int) -> tuple[str, int]:
+    """Lee un valor {…}, "…" o sin delimitar desde la posición i. Devuelve (valor, fin)."""
+    n = len(entry)
+    if i >= n:
+        return "", i
+    c = entry[i]
+    if c == '{':
+        # Caso común: sin llaves anidadas
+        cierre = entry.find('}', i + 1)
+        if cierre != -1 and entry.find('{', i + 1, cierre) == -1:
+            return entry[i + 1:cierre], cierre + 1
+        j = _cierre_llave(entry, i + 1)
+        return entry[i + 1:j - 1], j
+    if c == '"':
+        depth = 0
+        for m in RE_COMILLA.finditer(entry, i + 1):
+            cj = m.group()
+            if cj == '{':
+                depth += 1
+            elif cj == '}':
+                depth -= 1
+            elif depth == 0 and entry[m.start() - 1] != '\\':
+                return entry[i + 1:m.start()], m.end()
+        return entry[i + 1:], n
+    # Valor sin delimitar (números o macros): hasta la siguiente coma o cierre
+    j = i
+    while j < n and entry[j] not in ',}\n':
+        j += 1
+    return entry[i:j].strip(), j
+
+def _quitar_sangria(valor: str) -> str:
+    """Como bibtexparser: sin espacios al inicio de cada línea salvo la primera."""
+    lineas = valor.splitlines()
+    if len(lineas) > 1:
+        lineas = [lineas[0]] + [l.lstrip() for l in lineas[1:]]
+    return '\n'.join(lineas)
+
+def parse_entry(entry: str) -> dict | None:
+    """
+    Convierte una entrada BibTeX en un diccionario con el mismo formato que
+    bibtexparser: 'ENTRYTYPE', 'ID' y los campos en minúsculas, con la sangría
+    de las líneas de cada valor quitada.
+    Devuelve None para @comment, @preamble, @string o entradas mal formadas:
+    como bibtexparser, una entrada en la que tras un valor no viene ',' ni el
+    cierre (p. ej. una llave de más dentro del abstract) se descarta entera.
+    """
+    m = RE_CABECERA.match(entry)
+    if not m:
+        return None
+    tipo = m.group(1).lower()
+    if tipo in TIPOS_IGNORADOS:
+        return None
+
+    registro = {"ENTRYTYPE": tipo, "ID": m.group(2)}
+    i = m.end()
+    n = len(entry)
+    while i < n:
+        mn = RE_NOMBRE.match(entry, i)
+        if not mn:
+            # Saltar separadores o basura hasta el siguiente campo
+            j = entry.find(',', i)
+            if j == -1:
+                break
+            i = j + 1
+            continue
+        valor, i = _leer_valor(entry, mn.end())
+        registro[mn.group(1).lower()] = _quitar_sangria(valor)
+        tras = RE_TRAS_VALOR.match(entry, i)
+        if tras.group(1) in ('', '}', ')'):
+            break
+        if tras.group(1) != ',':
+            return None
+        i = tras.end()
+    return registro
+
+# ------------------------- Trozos en paralelo -------------------------
+
+def _siguiente_frontera(data: bytes, pos: int, inicio: int) -> int | None:
+    """Primer '@' de inicio de línea desde pos con llaves balanceadas desde inicio."""
+    while True:
+        m = RE_INICIO.search(data, pos)
+        if not m:
+            return None
+        cand = m.start()
+        # bytes.count es lineal pero corre en C: mucho más barato que parsear
+        if data.count(b'{', inicio, cand) == data.count(b'}', inicio, cand):
+            return cand
+        pos = m.end()
+
+def fronteras_seguras(data: bytes, n_trozos: int) -> list[int]:
+    """
+    Calcula desplazamientos (en bytes) donde se puede cortar el archivo sin
+    partir una entrada: un '@' al comienzo de línea con las llaves balanceadas
+    desde la frontera anterior. Incluye 0 y len(data).
+    """
+    n = len(data)
+    fronteras = [0]
+    if n_trozos <= 1 or n == 0:
+        return fronteras + [n]
+
+    tam = n // n_trozos
+    for k in range(1, n_trozos):
+        cand = _siguiente_frontera(data, max(k * tam, fronteras[-1] + 1), fronteras[-1])
+        if cand is None:
+            break
+        fronteras.append(cand)
+    fronteras.append(n)
+    return fronteras
+
+def _leer_trozo(path: str, inicio: int, fin: int, codificacion: str) -> str:
+    with open(path, "rb") as f:
+        f.seek(inicio)
+        return f.read(fin - inicio).decode(codificacion)
+
+def _entradas_trozo(args: tuple[str, int, int, str]) -> list[str]:
+    return split_bib_entries(_leer_trozo(*args))
+
+def _registros_trozo(args: tuple[str, int, int, str]) -> list[dict]:
+    registros = (parse_entry(e) for e in split_bib_entries(_leer_trozo(*args)))
+    return [r for r in registros if r is not None]
+
+def _mapear_trozos(path: Path, funcion, procesos: int | None, trozos: int | None) -> list:
+    """Reparte el archivo en trozos, aplica `funcion` en un pool y concatena en orden."""
+    procesos = procesos or os.cpu_count() or 1
+    data = path.read_bytes()
+    # Varios trozos por proceso para repartir mejor la carga
+    trozos = trozos or procesos * 4
+    fronteras = fronteras_seguras(data, trozos)
+    # La codificación se decide con el archivo completo, igual que read_text:
+    # las fronteras caen en un '@' (ASCII), así que cada trozo se decodifica igual
+    codificacion = codificacion_archivo(data)
+    del data
+    tareas = [(str(path), a, b, codificacion) for a, b in zip(fronteras, fronteras[1:]) if b > a]
+
+    resultado = []
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for parte in pool.map(funcion, tareas):
+            resultado.extend(parte)
+    return resultado
+
+def _usar_paralelo(path: Path, modo: str, procesos: int | None) -> bool:
+    if modo == "secuencial":
+        return False
+    if modo == "paralelo":
+        return True
+    # modo "auto": solo si hay varios núcleos y el archivo es grande
+    return (procesos or os.cpu_count() or 1) > 1 and path.stat().st_size >= MIN_BYTES_PARALELO
+
+def leer_entradas(path: Path, modo: str = "auto", procesos: int | None = None,
+                  trozos: int | None = None) -> list[str]:
+    """
+    Devuelve las entradas crudas (texto) de un .bib, en el orden del archivo.
+    modo: "auto", "secuencial" o "paralelo".
+    """
+    path = Path(path)
+    if not _usar_paralelo(path, modo, procesos):
+        return split_bib_entries(read_text(path))
+    return _mapear_trozos(path, _entradas_trozo, procesos, trozos)
+
+def leer_bib(path: Path, modo: str = "auto", procesos: int | None = None,
+             trozos: int | None = None) -> list[dict]:
+    """
+    Devuelve las entradas de un .bib como diccionarios (formato bibtexparser),
+    en el orden del archivo.
+    modo: "auto", "secuencial" o "paralelo".
+    """
+    path = Path(path)
+    if not _usar_paralelo(path, modo, procesos):
+        registros = (parse_entry(e) for e in split_bib_entries(read_text(path)))
+        return [r for r in registros if r is not None]
+    return _mapear_trozos(path, _registros_trozo, procesos, trozos)
+
+# ------------------------- Ejecución por consola -------------------------
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python lecturabib.py archivo.bib [procesos]", file=sys.stderr)
+        sys.exit(1)
+    path = Path(sys.argv[1])
+    if not path.exists():
+        print(f"[ERROR] No existe el archivo de entrada: {path}", file=sys.stderr)
+        sys.exit(1)
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    t0 = perf_counter()
+    secuencial = leer_bib(path, modo="secuencial")
+    t_sec = perf_counter() - t0
+
+    t0 = perf_counter()
+    paralelo = leer_bib(path, modo="paralelo", procesos=procesos)
+    t_par = perf_counter() - t0
+
+    print(f"[INFO] Entradas: {len(secuencial)}")
+    print(f"[INFO] Secuencial: {t_sec:.3f}s")
+    print(f"[INFO] Paralelo ({procesos or os.cpu_count()} procesos): {t_par:.3f}s")
+    print(f"[INFO] Mismo resultado: {secuencial == paralelo}")
+
+if __name__ == "__main__":
+    main()
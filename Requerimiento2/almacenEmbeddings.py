@@ -0,0 +1,248 @@
+"""
+Almacén persistente de embeddings (Sentence-BERT, DistilBERT, ...).
+
+Cada modelo tiene su carpeta en Requerimiento2/cache/embeddings/<modelo>/ con:
+  - vectores.f32 : matriz float32 (una fila por abstract) que solo crece por el final
+  - indice.txt   : hash del abstract de cada fila, una línea por fila
+  - meta.json    : nombre del modelo y dimensión
+Los abstracts que faltan se codifican por cubetas de longitud
+(codificacionLotes) y se añaden al final, así que la inferencia del
+transformer se hace una sola vez por abstract y modelo.
+La lectura usa np.memmap, sin cargar el archivo completo en memoria.
+
+Varios procesos (workers de Streamlit, scripts) pueden añadir a la vez: cada
+escritura toma un bloqueo exclusivo del archivo `bloqueo` de la carpeta, vuelve
+a leer el índice de disco y calcula la fila de cada vector a partir de las filas
+que ya hay escritas, así que las escrituras nunca se intercalan.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from codificacionLotes import codificar_paralelo, codificar_por_cubetas
+
+RAIZ_EMBEDDINGS = Path(__file__).resolve().parent / "cache" / "embeddings"
+
+# Textos que se codifican y escriben juntos (dentro, el lote lo fija la cubeta de longitud)
+TAM_LOTE = 512
+
+# Modelos de IA del Requerimiento 2 (nombre del algoritmo -> modelo SentenceTransformer)
+MODELOS_IA = {
+    "Sentence-BERT": "all-MiniLM-L6-v2",
+    "DistilBERT STS": "distilbert-base-nli-stsb-mean-tokens",
+}
+
+
+def hash_texto(texto: str) -> str:
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def nombre_carpeta(modelo: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', modelo)
+
+
+@contextmanager
+def bloqueo_archivo(ruta: Path):
+    """Bloqueo exclusivo entre procesos sobre `ruta` (fcntl en Unix, msvcrt en Windows)."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class AlmacenEmbeddings:
+    """Embeddings de un modelo, indexados por hash del abstract."""
+
+    def __init__(self, nombre_modelo: str, modelo=None, codificador=None,
+                 raiz: Path = RAIZ_EMBEDDINGS, procesos: int = 1):
+        """
+        nombre_modelo: nombre de SentenceTransformer (también identifica la carpeta).
+        modelo: instancia ya cargada (opcional). Si no se da, se carga al primer uso.
+        codificador: función textos -> ndarray que reemplaza a modelo.encode (opcional).
+        procesos: procesos de CPU para codificar (cada uno con su copia del modelo).
+        """
+        self.nombre_modelo = nombre_modelo
+        self._modelo = modelo
+        self._codificador = codificador
+        self.procesos = procesos
+        self.carpeta = Path(raiz) / nombre_carpeta(nombre_modelo)
+        self.ruta_vectores = self.carpeta / "vectores.f32"
+        self.ruta_indice = self.carpeta / "indice.txt"
+        self.ruta_meta = self.carpeta / "meta.json"
+        self.ruta_bloqueo = self.carpeta / "bloqueo"
+        self.dim: int | None = None
+        self.filas: dict[str, int] = {}
+        self._mmap = None
+        self._lock = threading.Lock()
+        self._cargar()
+
+    # ------------------------- Persistencia -------------------------
+
+    def _leer_disco(self) -> tuple[list[str], int]:
+        """Hashes de indice.txt y filas completas de vectores.f32 (puede haber una escritura en curso)."""
+        hashes = self.ruta_indice.read_text(encoding="utf-8").split() if self.ruta_indice.exists() else []
+        n_vectores = self.ruta_vectores.stat().st_size // (4 * self.dim) if self.ruta_vectores.exists() else 0
+        return hashes, n_vectores
+
+    def _cargar(self):
+        if not self.ruta_meta.exists():
+            return
+        self.dim = json.loads(self.ruta_meta.read_text(encoding="utf-8"))["dim"]
+        hashes, n_vectores = self._leer_disco()
+        # Solo valen las filas completas en ambos archivos; lo que sobre (una
+        # escritura a medias o en curso en otro proceso) se recorta con el bloqueo
+        n = min(len(hashes), n_vectores)
+        self.filas = {h: i for i, h in enumerate(hashes[:n])}
+        self._mmap = None
+
+    def _truncar(self, n: int, hashes: list[str]):
+        with open(self.ruta_vectores, "r+b") as f:
+            f.truncate(n * 4 * self.dim)
+        self.ruta_indice.write_text("".join(h + "\n" for h in hashes), encoding="utf-8")
+
+    def _anadir(self, hashes: list[str], vectores: np.ndarray):
+        vectores = np.ascontiguousarray(vectores, dtype=np.float32)
+        with bloqueo_archivo(self.ruta_bloqueo):
+            # Otro proceso pudo añadir filas desde la última lectura: se parte del disco
+            if self.ruta_meta.exists():
+                self._cargar()
+            else:
+                self.dim = int(vectores.shape[1])
+                self.ruta_meta.write_text(
+                    json.dumps({"modelo": self.nombre_modelo, "dim": self.dim}), encoding="utf-8")
+            en_disco, n_vectores = self._leer_disco()
+            n = len(self.filas)
+            if n < len(en_disco) or n < n_vectores:
+                self._truncar(n, en_disco[:n])
+            nuevos = [k for k, h in enumerate(hashes) if h not in self.filas]
+            if not nuevos:
+                return
+            hashes = [hashes[k] for k in nuevos]
+            # Primero los vectores y luego el índice: una fila sin hash se descarta al cargar
+            with open(self.ruta_vectores, "ab") as f:
+                f.write(vectores[nuevos].tobytes())
+            with open(self.ruta_indice, "a", encoding="utf-8") as f:
+                f.write("".join(h + "\n" for h in hashes))
+            for k, h in enumerate(hashes):
+                self.filas[h] = n + k
+            self._mmap = None
+
+    def _sincronizar(self):
+        """Incorpora las filas que otros procesos añadieron desde la última lectura."""
+        if not self.ruta_meta.exists():
+            return
+        if self.dim is None or self._leer_disco()[1] != len(self.filas):
+            self._cargar()
+
+    # ------------------------- Codificación -------------------------
+
+    def _codificar(self, textos: list[str]) -> np.ndarray:
+        if self._codificador is not None:
+            return self._codificador(textos)
+        if self.procesos > 1:
+            return codificar_paralelo(self.nombre_modelo, textos, self.procesos, modelo=self._modelo)
+        if self._modelo is None:
+            from sentence_transformers import SentenceTransformer
+            self._modelo = SentenceTransformer(self.nombre_modelo)
+        return codificar_por_cubetas(self._modelo, textos)
+
+    def vectores(self) -> np.ndarray:
+        """Todos los vectores guardados (memmap de solo lectura, n×dim)."""
+        n = len(self.filas)
+        if n == 0 or self.dim is None:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        if self._mmap is None or self._mmap.shape[0] != n:
+            self._mmap = np.memmap(self.ruta_vectores, dtype=np.float32, mode="r",
+                                   shape=(n, self.dim))
+        return self._mmap
+
+    def completar(self, textos: list[str], tam_lote: int = TAM_LOTE) -> int:
+        """Codifica y guarda los textos que aún no están. Devuelve cuántos se añadieron."""
+        with self._lock:
+            self._sincronizar()
+            pendientes = {}
+            for t in textos:
+                h = hash_texto(t)
+                if h not in self.filas and h not in pendientes:
+                    pendientes[h] = t
+            # Por longitud: cada trozo agrupa textos parecidos y se rellena poco
+            hashes = sorted(pendientes, key=lambda h: len(pendientes[h]))
+            if self.procesos > 1 and self._codificador is None:
+                # Un solo reparto entre procesos (cargar el modelo en cada uno es caro)
+                emb = self._codificar([pendientes[h] for h in hashes])
+                for k in range(0, len(hashes), tam_lote):
+                    self._anadir(hashes[k:k + tam_lote], emb[k:k + tam_lote])
+                return len(hashes)
+            for k in range(0, len(hashes), tam_lote):
+                lote = hashes[k:k + tam_lote]
+                self._anadir(lote, self._codificar([pendientes[h] for h in lote]))
+            return len(hashes)
+
+    def obtener(self, textos: list[str], normalizar: bool = False,
+                tam_lote: int = TAM_LOTE) -> np.ndarray:
+        """
+        Embeddings de `textos` (en el mismo orden), codificando solo los nuevos.
+        normalizar=True devuelve los vectores con norma L2 = 1.
+        """
+        self.completar(textos, tam_lote)
+        if not textos:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        filas = [self.filas[hash_texto(t)] for t in textos]
+        emb = np.array(self.vectores()[filas])
+        return normalizar_filas(emb) if normalizar else emb
+
+    def codificar(self, textos: list[str], normalizar: bool = False) -> np.ndarray:
+        """
+        Embeddings de `textos` sin guardar los nuevos: los que ya están se leen
+        del almacén y el resto se codifica solo para esta llamada (consultas de
+        texto libre, que no deben crecer el almacén del corpus).
+        """
+        with self._lock:
+            self._sincronizar()
+            filas = [self.filas.get(hash_texto(t)) for t in textos]
+            nuevos = [t for t, f in zip(textos, filas) if f is None]
+            codificados = iter(np.asarray(self._codificar(nuevos), dtype=np.float32) if nuevos else [])
+            guardados = self.vectores()
+            emb = [next(codificados) if f is None else guardados[f] for f in filas]
+        if not emb:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        emb = np.array(emb, dtype=np.float32)
+        return normalizar_filas(emb) if normalizar else emb
+
+
+def normalizar_filas(emb: np.ndarray) -> np.ndarray:
+    """Filas con norma L2 = 1 (las nulas se dejan igual)."""
+    normas = np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb / np.where(normas > 0, normas, 1)
+
+
+def almacen_compartido(nombre_modelo: str, modelo=None, **kwargs) -> AlmacenEmbeddings:
+    """
+    Almacén que codifica con el servicio local de embeddings mientras responda
+    (servicioEmbeddings); si no está o deja de responder, con el modelo en este
+    proceso (`modelo` si se da, si no se carga al primer uso).
+    """
+    from servicioEmbeddings import CodificadorConRespaldo
+
+    return AlmacenEmbeddings(nombre_modelo, modelo=modelo,
+                             codificador=CodificadorConRespaldo(nombre_modelo, modelo=modelo), **kwargs)
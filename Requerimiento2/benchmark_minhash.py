@@ -0,0 +1,74 @@
+"""
+Benchmark: Jaccard y n-gramas exactos (jaccardDisperso) contra la estimación
+con MinHash y la búsqueda de pares con LSH.
+
+Para cada número de permutaciones mide el tiempo de las firmas, de la matriz
+estimada y de LSH, el error absoluto (medio y máximo) frente a la matriz
+exacta y, para los pares con similitud exacta >= umbral, el recall de los
+candidatos de LSH y el recall/precisión tras filtrar por el Jaccard estimado.
+
+Uso:
+    python benchmark_minhash.py [umbral] [permutaciones separadas por coma]
+"""
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from busquedaSimilares import cargar_corpus
+from cacheRasgos import CacheRasgos
+from jaccardDisperso import matriz_jaccard_conjuntos
+from minHash import MinHash, matriz_estimada, parametros_lsh, pares_candidatos, pares_similares
+
+
+def medir(funcion, *args):
+    t0 = perf_counter()
+    resultado = funcion(*args)
+    return resultado, perf_counter() - t0
+
+
+def comparar(nombre: str, conjuntos: list, umbral: float, permutaciones: list[int]):
+    n = len(conjuntos)
+    exacta, t_exacta = medir(matriz_jaccard_conjuntos, conjuntos)
+    iu = np.triu_indices(n, k=1)
+    valores = exacta[iu]
+    reales = {(int(i), int(j)) for i, j, v in zip(iu[0], iu[1], valores) if v >= umbral}
+    print(f"\n=== {nombre}: {n} documentos, {len(valores)} pares, "
+          f"{len(reales)} con similitud >= {umbral} ===")
+    print(f"Exacta (matriz dispersa): {t_exacta:.3f} s")
+    print(f"{'perm':>5} {'firmas s':>9} {'matriz s':>9} {'error medio':>12} {'error máx':>10} "
+          f"{'LSH b×r':>8} {'LSH s':>7} {'candidatos':>10} {'recall cand.':>12} {'recall':>7} {'precisión':>10}")
+    for num_perm in permutaciones:
+        minhash = MinHash(num_perm)
+        F, t_firmas = medir(minhash.firmas, conjuntos)
+        estimada, t_matriz = medir(matriz_estimada, F)
+        error = np.abs(estimada[iu] - valores)
+        bandas, filas = parametros_lsh(umbral, num_perm)
+        pares, t_lsh = medir(pares_similares, F, umbral, bandas, filas)
+        candidatos = {tuple(p) for p in pares_candidatos(F, bandas, filas).tolist()}
+        recall_cand = len(candidatos & reales) / len(reales) if reales else 1.0
+        encontrados = set(zip(pares.row.tolist(), pares.col.tolist()))
+        acierto = len(encontrados & reales)
+        recall = acierto / len(reales) if reales else 1.0
+        precision = acierto / len(encontrados) if encontrados else 1.0
+        print(f"{num_perm:>5} {t_firmas:>9.3f} {t_matriz:>9.3f} {error.mean():>12.4f} {error.max():>10.4f} "
+              f"{f'{bandas}×{filas}':>8} {t_lsh:>7.3f} {len(candidatos):>10} {recall_cand:>12.2%} "
+              f"{recall:>7.2%} {precision:>10.2%}")
+
+
+def main():
+    umbral = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    permutaciones = [int(p) for p in sys.argv[2].split(",")] if len(sys.argv) > 2 else [32, 64, 128, 256]
+
+    textos = cargar_corpus()["abstract"].tolist()
+    rasgos = CacheRasgos.cargar()
+    palabras = [rasgos.tokens(t) for t in textos]
+    ngramas = [rasgos.ngramas(t, 3) for t in textos]
+    rasgos.guardar()
+
+    comparar("Jaccard (palabras)", palabras, umbral, permutaciones)
+    comparar("N-gramas (trigramas de caracteres)", ngramas, umbral, permutaciones)
+
+
+if __name__ == "__main__":
+    main()
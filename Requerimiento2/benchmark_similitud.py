@@ -0,0 +1,371 @@
+"""
+Benchmark de escalado de los 6 algoritmos de similitudTextual.
+
+Para cada algoritmo y cada tamaño de corpus (y, con textos sintéticos, cada
+longitud de abstract) mide:
+  - tiempo total (s) y pares por segundo (n·(n-1)/2 / tiempo), en una ejecución
+    sin tracemalloc (que ralentiza cada asignación),
+  - en una segunda ejecución, el pico de memoria de Python/numpy del proceso
+    principal (tracemalloc) y el pico de RSS sumado de los procesos hijos
+    (los workers de Levenshtein), muestreado en /proc (solo Linux; las
+    páginas compartidas cuentan una vez por proceso, así que es una cota superior),
+y, sobre la muestra real más grande, el acuerdo entre algoritmos
+(correlación de Spearman entre los triángulos superiores de sus matrices).
+
+Cada medición parte de cachés vacías (rasgos en memoria y embeddings en una
+carpeta temporal); el modelo TF-IDF es el del corpus, como en similitudTextual,
+y los modelos de Sentence-BERT y DistilBERT se cargan una vez antes de medir,
+así que los tiempos de esos algoritmos son de codificación, no de carga.
+Un algoritmo que supera --limite segundos no se mide en tamaños mayores.
+
+Salida: ResultadosBenchmark/benchmark_similitud.json (con la versión del
+código) y, si matplotlib está instalado, gráficos PNG en la misma carpeta.
+
+Uso:
+    python benchmark_similitud.py
+    python benchmark_similitud.py --tamanos 50,100,200,400 --longitudes 50,200,800 --algoritmos clasicos
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import similitudTextual as st
+from almacenEmbeddings import MODELOS_IA, AlmacenEmbeddings
+from cacheRasgos import CacheRasgos
+
+CARPETA_SALIDA = Path(__file__).resolve().parent / "ResultadosBenchmark"
+
+RE_PALABRA = re.compile(r'\w+|[^\w\s]')
+
+# Cada cuánto se suma el RSS de los procesos hijos durante la medición de memoria
+INTERVALO_MUESTREO = 0.05
+
+
+# -----------------------------------------------------------
+# Datos
+# -----------------------------------------------------------
+
+class GeneradorSintetico:
+    """Abstracts sintéticos con la distribución de palabras del corpus real."""
+
+    def __init__(self, textos: list[str], semilla: int = 0):
+        palabras, cuentas = np.unique(
+            [w for t in textos for w in RE_PALABRA.findall(t)], return_counts=True)
+        self.palabras = palabras
+        self.probabilidades = cuentas / cuentas.sum()
+        self.rng = np.random.default_rng(semilla)
+
+    def generar(self, n: int, longitud: int) -> list[str]:
+        """n textos de `longitud` palabras (±20 %)."""
+        textos = []
+        for _ in range(n):
+            m = max(1, int(self.rng.integers(int(longitud * 0.8), int(longitud * 1.2) + 1)))
+            textos.append(" ".join(self.rng.choice(self.palabras, size=m, p=self.probabilidades)))
+        return textos
+
+
+def version_codigo() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocida"
+
+
+# -----------------------------------------------------------
+# Medición
+# -----------------------------------------------------------
+
+def disponible(algoritmo: str) -> bool:
+    if algoritmo not in MODELOS_IA:
+        return True
+    try:
+        import sentence_transformers  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def cargar_modelos(algoritmos: list[str]) -> dict:
+    """SentenceTransformer de cada algoritmo de IA pedido (se carga una sola vez)."""
+    pedidos = [a for a in algoritmos if a in MODELOS_IA and disponible(a)]
+    if not pedidos:
+        return {}
+    from sentence_transformers import SentenceTransformer
+
+    return {a: SentenceTransformer(MODELOS_IA[a]) for a in pedidos}
+
+
+def reiniciar_caches(carpeta_embeddings: Path, modelos: dict | None = None):
+    """
+    Cachés vacías para que cada medición incluya la extracción de rasgos y la
+    codificación; los modelos ya cargados (`modelos`) se reutilizan.
+    """
+    modelos = modelos or {}
+    st._rasgos = CacheRasgos(ruta=None)
+    st._almacenes.clear()
+    for algoritmo, modelo in MODELOS_IA.items():
+        st._almacenes[algoritmo] = AlmacenEmbeddings(modelo, modelo=modelos.get(algoritmo),
+                                                     raiz=carpeta_embeddings / algoritmo)
+
+
+def rss_descendientes() -> int | None:
+    """RSS total (bytes) de los procesos descendientes de este; None fuera de Linux."""
+    proc = Path("/proc")
+    if not (proc / "self" / "statm").exists():
+        return None
+    hijos: dict[int, list[int]] = {}
+    for d in proc.iterdir():
+        if not d.name.isdigit():
+            continue
+        try:
+            stat = (d / "stat").read_text()
+        except OSError:
+            continue
+        # pid (comm) estado ppid ...; comm puede llevar espacios y paréntesis
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        hijos.setdefault(ppid, []).append(int(d.name))
+    pagina = os.sysconf("SC_PAGE_SIZE")
+    total, pendientes = 0, list(hijos.get(os.getpid(), []))
+    while pendientes:
+        pid = pendientes.pop()
+        pendientes.extend(hijos.get(pid, []))
+        try:
+            total += int((proc / str(pid) / "statm").read_text().split()[1]) * pagina
+        except (OSError, IndexError, ValueError):
+            pass  # el proceso terminó entre la lista y la lectura
+    return total
+
+
+class MuestreoHijos:
+    """Pico del RSS sumado de los procesos hijos mientras dura el bloque with."""
+
+    def __init__(self, intervalo: float = INTERVALO_MUESTREO):
+        self.intervalo = intervalo
+        self.pico: int | None = None
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+
+    def _muestrear(self):
+        while True:
+            rss = rss_descendientes()
+            if rss is None:
+                return
+            self.pico = max(self.pico or 0, rss)
+            if self._parar.wait(self.intervalo):
+                return
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._hilo.join()
+
+
+def medir(algoritmo: str, textos: list[str], modelos: dict | None = None) -> tuple[dict, np.ndarray]:
+    """
+    Dos ejecuciones con cachés vacías: la primera solo cronometra; la segunda
+    mide la memoria (tracemalloc en este proceso y RSS de los hijos), para que
+    el coste de tracemalloc no entre en los tiempos.
+    """
+    n = len(textos)
+    with tempfile.TemporaryDirectory() as tmp:
+        reiniciar_caches(Path(tmp) / "tiempo", modelos)
+        t0 = time.perf_counter()
+        matriz = np.asarray(st.ALGORITMOS[algoritmo](textos))
+        segundos = time.perf_counter() - t0
+
+        reiniciar_caches(Path(tmp) / "memoria", modelos)
+        tracemalloc.start()
+        try:
+            with MuestreoHijos() as hijos:
+                st.ALGORITMOS[algoritmo](textos)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    pares = n * (n - 1) // 2
+    return {
+        "segundos": round(segundos, 4),
+        "pares": pares,
+        "pares_seg": round(pares / segundos, 1) if segundos > 0 else None,
+        "pico_mb": round(pico / 2**20, 2),
+        "pico_hijos_mb": round(hijos.pico / 2**20, 2) if hijos.pico is not None else None,
+    }, matriz
+
+
+def acuerdo(matrices: dict[str, np.ndarray]) -> dict[str, dict[str, float]]:
+    """Correlación de Spearman entre los pares i<j de cada par de algoritmos."""
+    from scipy.stats import spearmanr
+
+    nombres = list(matrices)
+    n = next(iter(matrices.values())).shape[0]
+    iu = np.triu_indices(n, k=1)
+    valores = {a: matrices[a][iu] for a in nombres}
+    tabla = {a: {} for a in nombres}
+    for a in nombres:
+        for b in nombres:
+            rho = spearmanr(valores[a], valores[b]).statistic if a != b else 1.0
+            tabla[a][b] = round(float(rho), 4)
+    return tabla
+
+
+def ejecutar(algoritmos: list[str], tamanos: list[int], longitudes: list[int],
+             limite: float, semilla: int = 0) -> dict:
+    df = st.cargar_articulos()
+    reales = df["abstract"].tolist()
+    rng = np.random.default_rng(semilla)
+    orden = rng.permutation(len(reales))
+    generador = GeneradorSintetico(reales, semilla)
+    st.modelo_tfidf()  # ajuste del corpus fuera de las mediciones
+    modelos = cargar_modelos(algoritmos)  # carga de los modelos de IA, también fuera
+
+    resultados = []
+    matrices_reales = {}
+    casos = [("real", None, n) for n in tamanos if n <= len(reales)]
+    casos += [("sintetico", L, n) for L in longitudes for n in tamanos]
+    for algoritmo in algoritmos:
+        if not disponible(algoritmo):
+            print(f"⚠️ {algoritmo}: sentence_transformers no está instalado, se omite")
+            continue
+        superado = set()
+        for datos, longitud, n in casos:
+            if (datos, longitud) in superado:
+                continue
+            textos = [reales[i] for i in orden[:n]] if datos == "real" else generador.generar(n, longitud)
+            fila, matriz = medir(algoritmo, textos, modelos)
+            fila.update({"algoritmo": algoritmo, "datos": datos, "n": n, "longitud": longitud,
+                         "palabras_media": round(float(np.mean([len(t.split()) for t in textos])), 1)})
+            resultados.append(fila)
+            print(f"{algoritmo:<16} {datos:<10} n={n:<6} palabras≈{fila['palabras_media']:<7} "
+                  f"{fila['segundos']:>8.3f} s {fila['pares_seg'] or 0:>12.0f} pares/s {fila['pico_mb']:>8.1f} MB"
+                  f" (+{fila['pico_hijos_mb'] or 0:.1f} MB hijos)")
+            if datos == "real" and n == max(c[2] for c in casos if c[0] == "real"):
+                matrices_reales[algoritmo] = matriz
+            if fila["segundos"] > limite:
+                superado.add((datos, longitud))
+
+    return {
+        "version": version_codigo(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+        "acuerdo": acuerdo(matrices_reales) if len(matrices_reales) > 1 else {},
+    }
+
+
+# -----------------------------------------------------------
+# Informe
+# -----------------------------------------------------------
+
+def graficar(informe: dict, carpeta: Path) -> list[Path]:
+    """Tiempo y pares/s frente a n, y mapa de calor del acuerdo (requiere matplotlib)."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️ matplotlib no está instalado: se omiten los gráficos")
+        return []
+
+    rutas = []
+    filas = informe["resultados"]
+    for metrica, etiqueta, archivo in [("segundos", "Tiempo (s)", "tiempo.png"),
+                                       ("pares_seg", "Pares por segundo", "pares_seg.png")]:
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for algoritmo in sorted({f["algoritmo"] for f in filas}):
+            puntos = sorted((f["n"], f[metrica]) for f in filas
+                            if f["algoritmo"] == algoritmo and f["datos"] == "real" and f[metrica])
+            if puntos:
+                ax.plot(*zip(*puntos), marker="o", label=algoritmo)
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Número de abstracts (reales)")
+        ax.set_ylabel(etiqueta)
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(carpeta / archivo, dpi=120)
+        plt.close(fig)
+        rutas.append(carpeta / archivo)
+
+    # Efecto de la longitud: textos sintéticos con el mayor n medido por algoritmo
+    sinteticos = [f for f in filas if f["datos"] == "sintetico"]
+    if sinteticos:
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for algoritmo in sorted({f["algoritmo"] for f in sinteticos}):
+            propias = [f for f in sinteticos if f["algoritmo"] == algoritmo]
+            n_max = max(f["n"] for f in propias)
+            puntos = sorted((f["longitud"], f["pares_seg"]) for f in propias if f["n"] == n_max and f["pares_seg"])
+            if puntos:
+                ax.plot(*zip(*puntos), marker="o", label=f"{algoritmo} (n={n_max})")
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Palabras por abstract (sintético)")
+        ax.set_ylabel("Pares por segundo")
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(carpeta / "longitud.png", dpi=120)
+        plt.close(fig)
+        rutas.append(carpeta / "longitud.png")
+
+    if informe["acuerdo"]:
+        nombres = list(informe["acuerdo"])
+        M = np.array([[informe["acuerdo"][a][b] for b in nombres] for a in nombres])
+        fig, ax = plt.subplots(figsize=(8, 7))
+        im = ax.imshow(M, vmin=-1, vmax=1, cmap="viridis")
+        ax.set_xticks(range(len(nombres)), nombres, rotation=45, ha="right")
+        ax.set_yticks(range(len(nombres)), nombres)
+        for i in range(len(nombres)):
+            for j in range(len(nombres)):
+                ax.text(j, i, f"{M[i, j]:.2f}", ha="center", va="center", color="k")
+        fig.colorbar(im, ax=ax, label="Spearman")
+        ax.set_title("Acuerdo entre algoritmos")
+        fig.tight_layout()
+        fig.savefig(carpeta / "acuerdo.png", dpi=120)
+        plt.close(fig)
+        rutas.append(carpeta / "acuerdo.png")
+    return rutas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escalado de los algoritmos de similitud")
+    parser.add_argument("--algoritmos", default="todos", help="Mismos nombres que similitudTextual")
+    parser.add_argument("--tamanos", default="25,50,100,200", help="Números de abstracts")
+    parser.add_argument("--longitudes", default="50,200,800", help="Palabras por abstract sintético")
+    parser.add_argument("--limite", type=float, default=60, help="Segundos a partir de los que no se sigue creciendo")
+    parser.add_argument("--salida", type=Path, default=CARPETA_SALIDA)
+    args = parser.parse_args()
+
+    try:
+        algoritmos = st.elegir_algoritmos(args.algoritmos)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    tamanos = sorted(int(x) for x in args.tamanos.split(","))
+    longitudes = [int(x) for x in args.longitudes.split(",") if x.strip()]
+
+    informe = ejecutar(algoritmos, tamanos, longitudes, args.limite)
+    args.salida.mkdir(parents=True, exist_ok=True)
+    ruta = args.salida / "benchmark_similitud.json"
+    ruta.write_text(json.dumps(informe, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n✅ Informe: {ruta}")
+    for grafico in graficar(informe, args.salida):
+        print(f"   Gráfico: {grafico}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Búsqueda de los artículos más parecidos a una consulta (k vecinos más cercanos).
+
+La consulta puede ser la clave BibTeX (ID) de un artículo del corpus o un
+texto libre. Para cada medida se prepara una sola vez un índice del corpus:
+  - TF-IDF        : matriz del ModeloTfidf (filas de norma L2 = 1); coseno = X · q
+  - Sentence-BERT : embeddings normalizados (AlmacenEmbeddings); coseno = E · q
+  - Jaccard       : matriz binaria de ids de palabras (CacheRasgos);
+                    |A ∩ Q| = X · q y |A ∪ Q| = |A| + |Q| - |A ∩ Q|
+En los índices dispersos la consulta solo recorre las columnas (listas de
+documentos) de sus términos; los embeddings se puntúan por bloques de filas.
+De las puntuaciones se toman los k mejores con np.argpartition, así que una
+consulta sobre 100k abstracts tarda milisegundos.
+Con dim_comprimida, Sentence-BERT puntúa con un índice PCA + int8
+(indiceComprimido) y reordena los candidatos con los embeddings completos.
+
+Uso por consola:
+    python busquedaSimilares.py "graph neural networks" --medida tfidf -k 10
+    python busquedaSimilares.py Smith2020Deep --medida jaccard
+    python busquedaSimilares.py "protein folding" --medida sbert --dim-comprimida 64
+"""
+import argparse
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from cacheRasgos import CacheRasgos
+from jaccardDisperso import matriz_binaria_ids
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Filas del corpus por bloque al puntuar
+TAM_BLOQUE = 65536
+
+MEDIDAS = ("TF-IDF", "Sentence-BERT", "Jaccard")
+
+# Nombres cortos aceptados por consola
+ALIAS_MEDIDAS = {"tfidf": "TF-IDF", "sbert": "Sentence-BERT", "jaccard": "Jaccard"}
+
+
+def firma_articulos(df: pd.DataFrame) -> str:
+    """Identifica las filas (ID, título, abstract, en orden) con las que se construye un buscador."""
+    h = hashlib.sha1()
+    for fila in df[["ID", "titulo", "abstract"]].itertuples(index=False):
+        h.update("\x1f".join(map(str, fila)).encode("utf-8") + b"\x1e")
+    return h.hexdigest()[:16]
+
+
+def top_k(puntuaciones: np.ndarray, k: int, excluir: int | None = None) -> np.ndarray:
+    """Posiciones de las k puntuaciones más altas, de mayor a menor."""
+    n = puntuaciones.size
+    if excluir is not None:
+        puntuaciones = puntuaciones.copy()
+        puntuaciones[excluir] = -np.inf
+        n -= 1
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    mejores = np.argpartition(-puntuaciones, k - 1)[:k]
+    return mejores[np.argsort(-puntuaciones[mejores], kind="stable")]
+
+
+class IndiceSimilitud:
+    """Vectores del corpus para una medida y función que puntúa una consulta contra todos."""
+
+    def __init__(self, medida: str, matriz, tamanos: np.ndarray | None = None):
+        self.medida = medida
+        # ndarray denso (embeddings) o CSR disperso (TF-IDF, Jaccard)
+        self.matriz = matriz
+        # Solo Jaccard: número de palabras distintas de cada documento
+        self.tamanos = tamanos
+        # Índice invertido (CSC): las columnas de cada término son sus listas de documentos
+        self._columnas = matriz.tocsc() if sp.issparse(matriz) else None
+
+    def vector(self, pos: int):
+        """Vector de consulta del documento `pos` del corpus."""
+        if self._columnas is None:
+            return self.matriz[pos]
+        fila = self.matriz[pos]
+        return fila.indices, fila.data
+
+    def puntuar(self, q, tam_q: float = 0.0, tam_bloque: int = TAM_BLOQUE) -> np.ndarray:
+        """
+        Similitud de la consulta contra todo el corpus.
+        q: vector denso (embeddings) o par (columnas, valores) en los índices dispersos.
+        """
+        n = self.matriz.shape[0]
+        if self._columnas is not None:
+            # Solo se recorren las listas de documentos de los términos de la consulta
+            columnas, valores = q
+            prod = self._columnas[:, columnas] @ np.asarray(valores, dtype=np.float64)
+            prod = np.asarray(prod, dtype=np.float64).ravel()
+            if self.tamanos is None:
+                return prod
+            union = self.tamanos + tam_q - prod
+            return np.divide(prod, union, out=np.zeros(n), where=union > 0)
+        salida = np.empty(n, dtype=np.float64)
+        for s in range(0, n, tam_bloque):
+            salida[s:s + tam_bloque] = self.matriz[s:s + tam_bloque] @ q
+        return salida
+
+
+class BuscadorSimilares:
+    """
+    Índices de búsqueda sobre un corpus de abstracts.
+    Cada índice se construye la primera vez que se usa su medida.
+    """
+
+    def __init__(self, ids: list[str], textos: list[str], titulos: list[str] | None = None,
+                 rasgos: CacheRasgos | None = None, almacenes: dict | None = None,
+                 dim_comprimida: int | None = None):
+        """
+        ids / textos / titulos: clave, abstract y título de cada artículo.
+        rasgos: caché de palabras (se carga la de disco si no se da).
+        almacenes: {"Sentence-BERT": AlmacenEmbeddings} (opcional; se crea al primer uso).
+        dim_comprimida: si se da, Sentence-BERT busca en un IndiceComprimido de esa dimensión.
+        """
+        self.ids = list(ids)
+        self.textos = list(textos)
+        self.titulos = list(titulos) if titulos is not None else [""] * len(self.ids)
+        self.posicion = {clave: i for i, clave in enumerate(self.ids)}
+        self.rasgos = rasgos
+        self.almacenes = dict(almacenes or {})
+        self._indices: dict[str, IndiceSimilitud] = {}
+        self._tfidf = None
+        self.dim_comprimida = dim_comprimida
+        self._comprimido = None
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, **kwargs) -> "BuscadorSimilares":
+        """A partir de un DataFrame con columnas ID, titulo y abstract."""
+        return cls(df["ID"].tolist(), df["abstract"].tolist(), df["titulo"].tolist(), **kwargs)
+
+    # ------------------------- Índices -------------------------
+
+    def _rasgos(self) -> CacheRasgos:
+        if self.rasgos is None:
+            self.rasgos = CacheRasgos.cargar()
+        return self.rasgos
+
+    def _almacen(self, medida: str):
+        if medida not in self.almacenes:
+            from almacenEmbeddings import MODELOS_IA, almacen_compartido
+            self.almacenes[medida] = almacen_compartido(MODELOS_IA[medida])
+        return self.almacenes[medida]
+
+    def indice(self, medida: str) -> IndiceSimilitud:
+        if medida not in MEDIDAS:
+            raise ValueError(f"Medida desconocida: {medida} (opciones: {', '.join(MEDIDAS)})")
+        if medida not in self._indices:
+            if medida == "TF-IDF":
+                from modeloTfidf import ModeloTfidf
+                # Modelo del corpus guardado en disco: cada fila ya tiene norma 1
+                self._tfidf = ModeloTfidf.cargar_o_ajustar(self.textos)
+                X = self._tfidf.vectores(self.textos)
+                self._indices[medida] = IndiceSimilitud(medida, X)
+            elif medida == "Sentence-BERT":
+                E = self._almacen(medida).obtener(self.textos, normalizar=True)
+                self._indices[medida] = IndiceSimilitud(medida, E)
+                if self.dim_comprimida:
+                    from indiceComprimido import IndiceComprimido
+                    self._comprimido = IndiceComprimido.ajustar(E, self.dim_comprimida)
+            else:
+                rasgos = self._rasgos()
+                X = matriz_binaria_ids([rasgos.tokens(t) for t in self.textos],
+                                       n_columnas=rasgos.n_palabras())
+                rasgos.guardar()
+                tamanos = np.asarray(X.sum(axis=1), dtype=np.float64).ravel()
+                self._indices[medida] = IndiceSimilitud(medida, X, tamanos)
+        return self._indices[medida]
+
+    # ------------------------- Consultas -------------------------
+
+    def _vector_consulta(self, indice: IndiceSimilitud, texto: str):
+        """
+        Vector de un texto libre en el espacio del índice, y su tamaño (Jaccard).
+        La consulta no se guarda en el almacén de embeddings ni en la caché de rasgos.
+        """
+        if indice.medida == "TF-IDF":
+            fila = self._tfidf.transformar([texto])
+            return (fila.indices, fila.data), 0.0
+        if indice.medida == "Sentence-BERT":
+            return self._almacen(indice.medida).codificar([texto], normalizar=True)[0], 0.0
+        ids, distintas = self._rasgos().tokens_consulta(texto)
+        # Las palabras que no están en el corpus cuentan en |Q| pero no en la intersección
+        columnas = np.fromiter(sorted(i for i in ids if i < indice.matriz.shape[1]), dtype=np.int64)
+        return (columnas, np.ones(columnas.size)), float(distintas)
+
+    def buscar(self, consulta: str, medida: str = "TF-IDF", k: int = 10) -> pd.DataFrame:
+        """
+        Los k artículos más similares a `consulta` (ID del corpus o texto libre).
+        Si la consulta es un ID, el propio artículo no aparece en el resultado.
+        Devuelve un DataFrame con columnas ID, titulo y Similitud.
+        """
+        indice = self.indice(medida)
+        pos = self.posicion.get(consulta)
+        if pos is not None:
+            q = indice.vector(pos)
+            tam_q = float(indice.tamanos[pos]) if indice.tamanos is not None else 0.0
+        else:
+            q, tam_q = self._vector_consulta(indice, consulta)
+        if medida == "Sentence-BERT" and self._comprimido is not None:
+            mejores, similitudes = self._comprimido.buscar(q, k, excluir=pos)
+        else:
+            puntuaciones = indice.puntuar(q, tam_q)
+            mejores = top_k(puntuaciones, k, excluir=pos)
+            similitudes = puntuaciones[mejores]
+        return pd.DataFrame({
+            "ID": [self.ids[i] for i in mejores],
+            "titulo": [self.titulos[i] for i in mejores],
+            "Similitud": np.round(similitudes, 4),
+        })
+
+
+def buscar_similares(df: pd.DataFrame, consulta: str, medida: str = "TF-IDF",
+                     k: int = 10) -> pd.DataFrame:
+    """Atajo de una sola consulta (construye el índice cada vez; para varias, usar BuscadorSimilares)."""
+    return BuscadorSimilares.desde_dataframe(df).buscar(consulta, medida, k)
+
+
+def cargar_corpus() -> pd.DataFrame:
+    """Artículos con abstract desde la base del corpus o, si no existe, desde el BibTeX."""
+    sys.path.insert(0, str(BASE_DIR))
+    import corpus
+
+    if corpus.existe():
+        with corpus.leer() as con:
+            return corpus.articulos_con_abstract(con)
+    filas = []
+    for entry in corpus.leer_bib(corpus.BIB_PATH):
+        abstract = corpus.normalizar_espacios(entry.get("abstract", ""))
+        if abstract:
+            filas.append({"ID": entry.get("ID", ""),
+                          "titulo": corpus.normalizar_espacios(entry.get("title", "Sin título")),
+                          "abstract": abstract})
+    return pd.DataFrame(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artículos más similares a un ID o a un texto")
+    parser.add_argument("consulta", help="Clave BibTeX de un artículo o texto libre")
+    parser.add_argument("--medida", default="tfidf", choices=sorted(ALIAS_MEDIDAS))
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--dim-comprimida", type=int, default=None,
+                        help="Sentence-BERT con índice PCA + int8 de esa dimensión")
+    args = parser.parse_args()
+
+    df = cargar_corpus()
+    if df.empty:
+        print("⚠️ No se encontraron abstracts en el corpus.")
+        sys.exit(1)
+    buscador = BuscadorSimilares.desde_dataframe(df, dim_comprimida=args.dim_comprimida)
+    medida = ALIAS_MEDIDAS[args.medida]
+
+    t0 = time.perf_counter()
+    buscador.indice(medida)
+    t1 = time.perf_counter()
+    resultado = buscador.buscar(args.consulta, medida, args.k)
+    t2 = time.perf_counter()
+
+    print(f"\n{len(df)} artículos | índice {medida}: {t1 - t0:.2f} s | consulta: {(t2 - t1) * 1000:.1f} ms\n")
+    with pd.option_context("display.max_colwidth", 70, "display.width", 160):
+        print(resultado.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Caché LRU de similitudes por par de abstracts.
+
+En la página de comparación cada clic en "Calcular Similitud" recalculaba las
+6 medidas del par elegido, y el usuario suele ir y volver entre los mismos
+artículos. Aquí cada resultado se guarda con la clave
+    (algoritmo, hash_a, hash_b)      (hashes ordenados: las medidas son simétricas)
+en un OrderedDict con un máximo de entradas: al pasarlo se descartan las
+usadas hace más tiempo. La caché es segura entre hilos (Streamlit la comparte
+entre sesiones con st.cache_resource) y se puede persistir en disco con la
+misma escritura atómica que cacheRasgos. Escribir las 50k entradas en cada
+clic sería caro: guardar() solo escribe si hubo cambios y como mucho una vez
+cada INTERVALO_GUARDADO segundos (forzar=True, p. ej. al salir, escribe ya).
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from cacheRasgos import escribir_pickle_atomico, hash_texto
+
+RUTA_CACHE = Path(__file__).resolve().parent / "cache" / "pares.pkl"
+
+MAX_ENTRADAS = 50_000
+
+# Segundos mínimos entre dos escrituras en disco
+INTERVALO_GUARDADO = 60.0
+
+
+class CachePares:
+    """Similitudes (algoritmo, par de textos) -> valor, con política LRU."""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, ruta: Path | None = RUTA_CACHE,
+                 intervalo_guardado: float = INTERVALO_GUARDADO):
+        self.max_entradas = max_entradas
+        self.ruta = Path(ruta) if ruta else None
+        self.intervalo_guardado = intervalo_guardado
+        self._ultimo_guardado = float("-inf")
+        self._datos: OrderedDict[tuple[str, str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._modificada = False
+        self.aciertos = 0
+        self.fallos = 0
+
+    # ------------------------- Persistencia -------------------------
+
+    @classmethod
+    def cargar(cls, ruta: Path = RUTA_CACHE, max_entradas: int = MAX_ENTRADAS) -> "CachePares":
+        """Carga la caché desde disco; si no existe o está dañada, empieza vacía."""
+        cache = cls(max_entradas, ruta)
+        if ruta and Path(ruta).exists():
+            try:
+                with open(ruta, "rb") as f:
+                    datos = pickle.load(f)
+                # Las más recientes van al final: si sobran, se quedan esas
+                for clave, valor in list(datos.items())[-max_entradas:]:
+                    cache._datos[clave] = valor
+            except Exception as e:
+                print(f"[WARN] Caché de pares ignorada ({e})")
+        return cache
+
+    def guardar(self, forzar: bool = False):
+        """
+        Escribe la caché en disco si cambió y pasó INTERVALO_GUARDADO desde la
+        última escritura (o siempre, con forzar). Escritura atómica.
+        """
+        if not self.ruta:
+            return
+        with self._lock:
+            if not self._modificada:
+                return
+            if not forzar and time.monotonic() - self._ultimo_guardado < self.intervalo_guardado:
+                return
+            escribir_pickle_atomico(self.ruta, dict(self._datos))
+            self._modificada = False
+            self._ultimo_guardado = time.monotonic()
+
+    # ------------------------- Consulta -------------------------
+
+    @staticmethod
+    def clave(algoritmo: str, a: str, b: str) -> tuple[str, str, str]:
+        ha, hb = hash_texto(a), hash_texto(b)
+        return (algoritmo, ha, hb) if ha <= hb else (algoritmo, hb, ha)
+
+    def obtener(self, algoritmo: str, a: str, b: str) -> float | None:
+        clave = self.clave(algoritmo, a, b)
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is None:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def poner(self, algoritmo: str, a: str, b: str, valor: float):
+        clave = self.clave(algoritmo, a, b)
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+            self._modificada = True
+
+    def obtener_o_calcular(self, algoritmo: str, a: str, b: str,
+                           funcion: Callable[[str, str], float]) -> float:
+        """Valor guardado del par o, si no está, funcion(a, b) (que se guarda)."""
+        valor = self.obtener(algoritmo, a, b)
+        if valor is None:
+            valor = funcion(a, b)
+            if valor is not None:
+                self.poner(algoritmo, a, b, valor)
+        return valor
+
+    def __len__(self) -> int:
+        return len(self._datos)
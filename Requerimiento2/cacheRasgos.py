@@ -0,0 +1,151 @@
+"""
+Caché de rasgos por documento para Jaccard y n-gramas.
+
+Para cada abstract se calculan una sola vez:
+  - el conjunto de palabras en minúsculas (re.findall(r'\\w+', texto.lower()))
+  - el conjunto de n-gramas de caracteres (espacios colapsados, minúsculas)
+Las palabras y n-gramas se internan como enteros y cada conjunto se guarda
+como frozenset de ids, indexado por el hash del contenido. La caché se puede
+persistir en disco, así que se reutiliza entre pares y entre ejecuciones:
+comparar dos documentos queda reducido a operaciones de conjuntos.
+"""
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+RUTA_CACHE = Path(__file__).resolve().parent / "cache" / "rasgos.pkl"
+
+RE_PALABRA = re.compile(r'\w+')
+RE_ESPACIOS = re.compile(r'\s+')
+
+
+def hash_texto(texto: str) -> str:
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def escribir_pickle_atomico(ruta: Path, datos):
+    """
+    Escribe `datos` en un temporal propio de la misma carpeta y lo mueve a
+    `ruta`: varios escritores a la vez nunca ven ni mueven un archivo a medias.
+    """
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=ruta.parent, prefix=ruta.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, ruta)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class CacheRasgos:
+    """Conjuntos de palabras y n-gramas por documento, con ids internados."""
+
+    def __init__(self, ruta: Path | None = RUTA_CACHE):
+        self.ruta = Path(ruta) if ruta else None
+        self.vocab_palabras: dict[str, int] = {}
+        self.vocab_ngramas: dict[str, int] = {}
+        # hash -> frozenset de ids de palabras
+        self.palabras: dict[str, frozenset] = {}
+        # (n, hash) -> frozenset de ids de n-gramas
+        self.ngramas_doc: dict[tuple[int, str], frozenset] = {}
+        self._modificada = False
+        # Streamlit comparte la caché entre sesiones (hilos)
+        self._lock = threading.Lock()
+
+    # ------------------------- Persistencia -------------------------
+
+    @classmethod
+    def cargar(cls, ruta: Path = RUTA_CACHE) -> "CacheRasgos":
+        """Carga la caché desde disco; si no existe o está dañada, empieza vacía."""
+        cache = cls(ruta)
+        if ruta and Path(ruta).exists():
+            try:
+                with open(ruta, "rb") as f:
+                    estado = pickle.load(f)
+                cache.vocab_palabras = estado["vocab_palabras"]
+                cache.vocab_ngramas = estado["vocab_ngramas"]
+                cache.palabras = estado["palabras"]
+                cache.ngramas_doc = estado["ngramas_doc"]
+            except Exception as e:
+                print(f"[WARN] Caché de rasgos ignorada ({e})")
+        return cache
+
+    def guardar(self):
+        """Escribe la caché en disco (solo si cambió). Escritura atómica."""
+        if not self.ruta:
+            return
+        with self._lock:
+            if not self._modificada:
+                return
+            escribir_pickle_atomico(self.ruta, {
+                "vocab_palabras": self.vocab_palabras,
+                "vocab_ngramas": self.vocab_ngramas,
+                "palabras": self.palabras,
+                "ngramas_doc": self.ngramas_doc,
+            })
+            self._modificada = False
+
+    # ------------------------- Rasgos -------------------------
+
+    def tokens(self, texto: str) -> frozenset:
+        """Ids de las palabras (en minúsculas) del texto."""
+        h = hash_texto(texto)
+        ids = self.palabras.get(h)
+        if ids is None:
+            palabras = RE_PALABRA.findall(texto.lower())
+            with self._lock:
+                vocab = self.vocab_palabras
+                ids = frozenset(vocab.setdefault(w, len(vocab)) for w in palabras)
+                self.palabras[h] = ids
+                self._modificada = True
+        return ids
+
+    def tokens_consulta(self, texto: str) -> tuple[frozenset, int]:
+        """
+        Ids de las palabras del texto que ya tienen id y número de palabras
+        distintas, sin internar nada: una consulta no modifica la caché.
+        """
+        h = hash_texto(texto)
+        ids = self.palabras.get(h)
+        if ids is not None:
+            return ids, len(ids)
+        palabras = set(RE_PALABRA.findall(texto.lower()))
+        vocab = self.vocab_palabras
+        return frozenset(vocab[w] for w in palabras if w in vocab), len(palabras)
+
+    def ngramas(self, texto: str, n: int = 3) -> frozenset:
+        """Ids de los n-gramas de caracteres del texto."""
+        clave = (n, hash_texto(texto))
+        ids = self.ngramas_doc.get(clave)
+        if ids is None:
+            t = RE_ESPACIOS.sub(' ', texto.lower())
+            with self._lock:
+                vocab = self.vocab_ngramas
+                ids = frozenset(vocab.setdefault(t[i:i + n], len(vocab))
+                                for i in range(len(t) - n + 1))
+                self.ngramas_doc[clave] = ids
+                self._modificada = True
+        return ids
+
+    def n_palabras(self) -> int:
+        return len(self.vocab_palabras)
+
+    def n_ngramas(self) -> int:
+        return len(self.vocab_ngramas)
+
+
+def jaccard_conjuntos(A: frozenset, B: frozenset) -> float:
+    """|A ∩ B| / |A ∪ B| calculado con los tamaños (una sola intersección)."""
+    if not A and not B:
+        return 0.0
+    inter = len(A & B)
+    return inter / (len(A) + len(B) - inter)
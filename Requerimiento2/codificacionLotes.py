@@ -0,0 +1,207 @@
+"""
+Codificación de abstracts por cubetas de longitud (CPU, sin GPU).
+
+model.encode rellena cada lote hasta el texto más largo y usa el mismo
+tamaño de lote para todo. Aquí:
+  - se cuenta la longitud en tokens de cada abstract con el tokenizador del modelo,
+  - los abstracts se reparten en cubetas por longitud (LIMITES_CUBETAS),
+  - cada cubeta usa un tamaño de lote acorde a su longitud: se mantiene
+    aproximadamente constante el número de tokens por lote (TOKENS_POR_LOTE),
+    así los textos cortos van en lotes grandes y los largos en lotes pequeños,
+  - opcionalmente las cubetas se reparten entre varios procesos, cada uno con
+    su copia del modelo y una parte de los hilos de la CPU.
+Los embeddings se devuelven en el orden original.
+
+Uso por consola (mide documentos/segundo por modelo):
+    python codificacionLotes.py --modelos sbert,distilbert --procesos 1,2 -n 1000
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Límites superiores (en tokens) de cada cubeta; el modelo trunca en max_seq_length
+LIMITES_CUBETAS = (32, 64, 128, 256, 384, 512)
+
+# Tokens (relleno incluido) por lote
+TOKENS_POR_LOTE = 8192
+MAX_LOTE = 256
+
+# Textos por tarea cuando se reparte entre procesos
+TEXTOS_POR_TAREA = 256
+
+RE_PALABRA = re.compile(r'\w+|[^\w\s]')
+
+
+def contar_tokens(modelo, textos: list[str]) -> np.ndarray:
+    """Longitud en tokens de cada texto (tokenizador del modelo si lo tiene; modelo puede ser None)."""
+    tokenizador = getattr(modelo, "tokenizer", None)
+    if tokenizador is not None:
+        ids = tokenizador(textos, add_special_tokens=True, truncation=False)["input_ids"]
+        return np.fromiter((len(x) for x in ids), dtype=np.int64, count=len(textos))
+    # Aproximación: palabras y signos de puntuación
+    return np.fromiter((len(RE_PALABRA.findall(t)) + 2 for t in textos), dtype=np.int64, count=len(textos))
+
+
+def tam_lote_cubeta(limite: int, tokens_por_lote: int = TOKENS_POR_LOTE) -> int:
+    return max(1, min(MAX_LOTE, tokens_por_lote // limite))
+
+
+def cubetas(longitudes: np.ndarray, max_tokens: int | None = None,
+            limites: tuple[int, ...] = LIMITES_CUBETAS,
+            tokens_por_lote: int = TOKENS_POR_LOTE) -> list[tuple[np.ndarray, int]]:
+    """
+    Índices de cada cubeta (ordenados por longitud) con su tamaño de lote.
+    max_tokens: longitud a la que trunca el modelo (las más largas caen en la última cubeta).
+    """
+    if max_tokens:
+        longitudes = np.minimum(longitudes, max_tokens)
+        limites = tuple(sorted({min(l, max_tokens) for l in limites} | {max_tokens}))
+    orden = np.argsort(longitudes, kind="stable")
+    ordenadas = longitudes[orden]
+    resultado = []
+    inicio = 0
+    for limite in limites:
+        fin = int(np.searchsorted(ordenadas, limite, side="right"))
+        if fin > inicio:
+            resultado.append((orden[inicio:fin], tam_lote_cubeta(limite, tokens_por_lote)))
+        inicio = fin
+    if inicio < len(orden):
+        resultado.append((orden[inicio:], tam_lote_cubeta(int(ordenadas[-1]), tokens_por_lote)))
+    return resultado
+
+
+def codificar_por_cubetas(modelo, textos: list[str], tokens_por_lote: int = TOKENS_POR_LOTE) -> np.ndarray:
+    """Embeddings de `textos` en el orden original, codificando cubeta a cubeta."""
+    if not textos:
+        return np.zeros((0, 0), dtype=np.float32)
+    longitudes = contar_tokens(modelo, textos)
+    salida = None
+    for indices, lote in cubetas(longitudes, getattr(modelo, "max_seq_length", None),
+                                 tokens_por_lote=tokens_por_lote):
+        emb = np.asarray(modelo.encode([textos[i] for i in indices], batch_size=lote,
+                                       show_progress_bar=False), dtype=np.float32)
+        if salida is None:
+            salida = np.empty((len(textos), emb.shape[1]), dtype=np.float32)
+        salida[indices] = emb
+    return salida
+
+
+# -----------------------------------------------------------
+# Varios procesos
+# -----------------------------------------------------------
+
+# Modelo del proceso trabajador (se carga una vez, en el inicializador)
+_modelo = None
+
+
+def _iniciar(nombre_modelo: str, hilos: int):
+    global _modelo
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(hilos)
+    _modelo = SentenceTransformer(nombre_modelo, device="cpu")
+
+
+def _codificar_tarea(args: tuple[np.ndarray, list[str], int]) -> tuple[np.ndarray, np.ndarray]:
+    indices, textos, lote = args
+    emb = _modelo.encode(textos, batch_size=lote, show_progress_bar=False)
+    return indices, np.asarray(emb, dtype=np.float32)
+
+
+def codificar_paralelo(nombre_modelo: str, textos: list[str], procesos: int,
+                       modelo=None) -> np.ndarray:
+    """
+    Igual que codificar_por_cubetas pero repartiendo las cubetas (en tareas de
+    TEXTOS_POR_TAREA textos) entre `procesos` procesos con los hilos divididos.
+    `modelo` (opcional) solo se usa para contar tokens en el proceso principal.
+    """
+    if procesos <= 1:
+        if modelo is None:
+            from sentence_transformers import SentenceTransformer
+            modelo = SentenceTransformer(nombre_modelo, device="cpu")
+        return codificar_por_cubetas(modelo, textos)
+    if not textos:
+        return np.zeros((0, 0), dtype=np.float32)
+    # Sin el modelo en este proceso las longitudes se aproximan contando palabras
+    longitudes = contar_tokens(modelo, textos)
+    tareas = []
+    for indices, lote in cubetas(longitudes, getattr(modelo, "max_seq_length", None)):
+        for s in range(0, len(indices), TEXTOS_POR_TAREA):
+            parte = indices[s:s + TEXTOS_POR_TAREA]
+            tareas.append((parte, [textos[i] for i in parte], lote))
+    hilos = max(1, (os.cpu_count() or 1) // procesos)
+    salida = None
+    # spawn: no heredar un torch ya inicializado (sus hilos no sobreviven a fork)
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto, initializer=_iniciar,
+                             initargs=(nombre_modelo, hilos)) as pool:
+        for indices, emb in pool.map(_codificar_tarea, tareas):
+            if salida is None:
+                salida = np.empty((len(textos), emb.shape[1]), dtype=np.float32)
+            salida[indices] = emb
+    return salida
+
+
+# -----------------------------------------------------------
+# Medición de rendimiento
+# -----------------------------------------------------------
+
+def medir_modelo(nombre_modelo: str, textos: list[str], procesos: list[int]) -> list[dict]:
+    """Documentos/segundo con model.encode directo y con cubetas (1..n procesos)."""
+    from sentence_transformers import SentenceTransformer
+
+    modelo = SentenceTransformer(nombre_modelo, device="cpu")
+    modelo.encode(textos[:8], show_progress_bar=False)  # calentamiento
+    filas = []
+
+    t0 = time.perf_counter()
+    base = np.asarray(modelo.encode(textos, show_progress_bar=False), dtype=np.float32)
+    t = time.perf_counter() - t0
+    filas.append({"modelo": nombre_modelo, "modo": "encode directo", "procesos": 1,
+                  "segundos": round(t, 2), "docs_seg": round(len(textos) / t, 1), "dif_max": 0.0})
+
+    for p in procesos:
+        t0 = time.perf_counter()
+        emb = codificar_paralelo(nombre_modelo, textos, p, modelo=modelo)
+        t = time.perf_counter() - t0
+        filas.append({"modelo": nombre_modelo, "modo": "cubetas", "procesos": p,
+                      "segundos": round(t, 2), "docs_seg": round(len(textos) / t, 1),
+                      "dif_max": float(np.abs(emb - base).max())})
+    return filas
+
+
+def main():
+    from almacenEmbeddings import MODELOS_IA
+
+    alias = {"sbert": "Sentence-BERT", "distilbert": "DistilBERT STS"}
+    parser = argparse.ArgumentParser(description="Documentos/segundo al codificar abstracts")
+    parser.add_argument("--modelos", default="sbert,distilbert", help="sbert, distilbert")
+    parser.add_argument("--procesos", default="1", help="Lista separada por comas, ej: 1,2,4")
+    parser.add_argument("-n", type=int, default=1000, help="Número de abstracts")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from busquedaSimilares import cargar_corpus
+
+    textos = cargar_corpus()["abstract"].tolist()[:args.n]
+    if not textos:
+        print("⚠️ No se encontraron abstracts en el corpus.")
+        sys.exit(1)
+    procesos = [int(p) for p in args.procesos.split(",")]
+
+    filas = []
+    for m in args.modelos.split(","):
+        filas.extend(medir_modelo(MODELOS_IA[alias[m.strip()]], textos, procesos))
+    print(f"\n{len(textos)} abstracts, {os.cpu_count()} CPU\n")
+    print(pd.DataFrame(filas).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Ejecución concurrente de los algoritmos de similitud.
+
+Los 6 algoritmos son independientes, así que se lanzan todos a la vez en un
+ThreadPoolExecutor y cada resultado se entrega en cuanto termina
+(as_completed): el primero llega sin esperar a los demás y el total se
+acerca al del algoritmo más lento en lugar de a la suma.
+
+Los hilos bastan porque el trabajo pesado no retiene el GIL o sale del proceso:
+  - Levenshtein reparte sus filas entre procesos (matrizLevenshtein),
+  - los modelos de IA pasan casi todo el tiempo en torch,
+  - Jaccard, TF-IDF y n-gramas son productos de matrices dispersas de scipy.
+repartir_cpu decide cuántas CPU van a los procesos de Levenshtein y cuántos
+hilos usa torch para que no compitan entre sí.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator
+
+# Algoritmos que usan varias CPU por su cuenta
+PROCESOS_CPU = ("Levenshtein", "Levenshtein (palabras)")
+HILOS_TORCH = ("Sentence-BERT", "DistilBERT STS")
+
+
+def repartir_cpu(algoritmos: list[str], cpus: int | None = None) -> dict[str, int]:
+    """
+    CPU asignadas a cada algoritmo. Levenshtein (procesos) y los modelos de IA
+    (hilos de torch, compartidos por los dos modelos) se reparten las CPU a
+    medias si se piden juntos; el resto de algoritmos usa 1.
+    """
+    cpus = cpus or os.cpu_count() or 1
+    usa_procesos = any(a in PROCESOS_CPU for a in algoritmos)
+    usa_torch = any(a in HILOS_TORCH for a in algoritmos)
+    para_procesos = max(1, cpus // 2) if usa_procesos and usa_torch else cpus
+    para_torch = max(1, cpus - para_procesos) if usa_procesos else cpus
+    return {a: para_procesos if a in PROCESOS_CPU else para_torch if a in HILOS_TORCH else 1
+            for a in algoritmos}
+
+
+def limitar_hilos_torch(hilos: int):
+    """Hilos de torch: si ya está importado se ajusta ahora; si no, al importarlo."""
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(hilos)
+    else:
+        os.environ["OMP_NUM_THREADS"] = str(hilos)
+
+
+def _medir(funcion: Callable[[], object]) -> tuple[object, float, Exception | None]:
+    t0 = time.perf_counter()
+    try:
+        return funcion(), time.perf_counter() - t0, None
+    except Exception as e:  # el error se entrega con el resultado, no corta a los demás
+        return None, time.perf_counter() - t0, e
+
+
+def ejecutar_concurrente(tareas: dict[str, Callable[[], object]],
+                         hilos: int | None = None) -> Iterator[tuple[str, object, float, Exception | None]]:
+    """
+    Ejecuta cada tarea (nombre -> función sin argumentos) en un hilo y genera
+    (nombre, resultado, segundos, error) por orden de finalización.
+    Si una tarea falla, resultado es None y error la excepción.
+    Las tareas se envían en el orden del diccionario.
+    """
+    if not tareas:
+        return
+    with ThreadPoolExecutor(max_workers=hilos or len(tareas)) as pool:
+        futuros = {pool.submit(_medir, funcion): nombre for nombre, funcion in tareas.items()}
+        for futuro in as_completed(futuros):
+            resultado, segundos, error = futuro.result()
+            yield futuros[futuro], resultado, segundos, error
@@ -0,0 +1,232 @@
+"""
+Exportación de resultados de similitud para selecciones grandes.
+
+La versión anterior metía en una tabla de reportlab un DataFrame con todos
+los pares y escribía matrices n×n en CSV: con más de unas decenas de
+artículos el PDF crecía sin control. Aquí:
+  - cada matriz se dibuja como mapa de calor (PNG),
+  - el PDF lleva el mapa y solo la tabla de los N pares más similares,
+  - la lista completa de pares (i < j) va a un archivo comprimido por
+    columnas: Parquet (zstd) escrito por bloques de filas si pyarrow está
+    instalado; si no, .npz comprimido con una columna por array, que también
+    se escribe por bloques (cada .npy del zip se rellena bloque a bloque),
+  - exportar_columnas guarda igual cualquier conjunto de columnas (por
+    ejemplo, solo los pares por encima de un umbral, ver paresDispersos).
+Los N mejores pares se sacan con np.argpartition sobre el triángulo
+superior, sin ordenar todos los pares.
+"""
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Pares por tabla del PDF
+N_TOP = 20
+
+# Filas de la matriz por bloque al escribir los pares
+FILAS_POR_BLOQUE = 256
+
+# Con más artículos que esto, el mapa de calor no lleva títulos en los ejes
+MAX_ETIQUETAS = 40
+
+
+def top_pares(matriz: np.ndarray, titulos: list[str], n_top: int = N_TOP) -> pd.DataFrame:
+    """Los n_top pares (i < j) con mayor similitud, de mayor a menor."""
+    n = matriz.shape[0]
+    i, j = np.triu_indices(n, k=1)
+    valores = np.asarray(matriz)[i, j]
+    k = min(n_top, valores.size)
+    if k == 0:
+        return pd.DataFrame(columns=["Articulo_1", "Articulo_2", "Similitud"])
+    mejores = np.argpartition(-valores, k - 1)[:k]
+    mejores = mejores[np.argsort(-valores[mejores], kind="stable")]
+    return pd.DataFrame({
+        "Articulo_1": [titulos[a] for a in i[mejores]],
+        "Articulo_2": [titulos[b] for b in j[mejores]],
+        "Similitud": np.round(valores[mejores], 4),
+    })
+
+
+def guardar_mapa_calor(matriz: np.ndarray, titulos: list[str], nombre: str, ruta: Path) -> Path:
+    """Mapa de calor de la matriz en PNG (títulos en los ejes solo para selecciones pequeñas)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    n = matriz.shape[0]
+    fig, ax = plt.subplots(figsize=(8, 7))
+    im = ax.imshow(matriz, vmin=0, vmax=1, cmap="viridis", interpolation="nearest")
+    if n <= MAX_ETIQUETAS:
+        etiquetas = [t[:30] for t in titulos]
+        ax.set_xticks(range(n), etiquetas, rotation=90, fontsize=6)
+        ax.set_yticks(range(n), etiquetas, fontsize=6)
+    else:
+        ax.set_xlabel("Artículo")
+        ax.set_ylabel("Artículo")
+    ax.set_title(f"{nombre} ({n} artículos)")
+    fig.colorbar(im, ax=ax, label="Similitud")
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=110)
+    plt.close(fig)
+    return ruta
+
+
+def exportar_pdf(matrices: dict[str, np.ndarray], titulos: list[str],
+                 archivo_salida: Path = Path("Resultados_Similitud.pdf"),
+                 n_top: int = N_TOP) -> Path:
+    """PDF con, por algoritmo, el mapa de calor y la tabla de los n_top pares más similares."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Image, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    archivo_salida = Path(archivo_salida)
+    carpeta_imagenes = archivo_salida.with_suffix("")
+    carpeta_imagenes.mkdir(parents=True, exist_ok=True)
+
+    doc = SimpleDocTemplate(str(archivo_salida), pagesize=letter)
+    estilos = getSampleStyleSheet()
+    elementos = []
+    for metodo, matriz in matrices.items():
+        elementos.append(Paragraph(f"Resultados - {metodo}", estilos['Heading1']))
+        elementos.append(Spacer(1, 12))
+
+        imagen = guardar_mapa_calor(matriz, titulos, metodo,
+                                    carpeta_imagenes / f"{metodo.replace(' ', '_')}.png")
+        elementos.append(Image(str(imagen), width=5.5 * inch, height=4.8 * inch))
+        elementos.append(Spacer(1, 12))
+
+        df = top_pares(matriz, [t[:50] for t in titulos], n_top)
+        elementos.append(Paragraph(f"Top {len(df)} pares más similares", estilos['Heading2']))
+        tabla = Table([df.columns.to_list()] + df.values.tolist(), repeatRows=1)
+        tabla.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 7),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        elementos.append(tabla)
+        elementos.append(PageBreak())
+
+    doc.build(elementos)
+    return archivo_salida
+
+
+def _posiciones_bloques(n: int, filas_por_bloque: int):
+    """Genera (a, b) con los pares a < b de cada bloque de filas, en orden."""
+    for s in range(0, n, filas_por_bloque):
+        e = min(s + filas_por_bloque, n)
+        # Dentro del bloque: fila a (s <= a < e) contra columnas b > a
+        a, b = np.nonzero(np.triu(np.ones((e - s, n), dtype=bool), k=s + 1))
+        yield a + s, b
+
+
+def _bloques_pares(matrices: dict[str, np.ndarray], indices: np.ndarray, filas_por_bloque: int):
+    """Genera DataFrames con los pares i < j de un bloque de filas y una columna por algoritmo."""
+    for a, b in _posiciones_bloques(len(indices), filas_por_bloque):
+        bloque = {"indice_1": indices[a].astype(np.int32), "indice_2": indices[b].astype(np.int32)}
+        for nombre, matriz in matrices.items():
+            bloque[nombre] = np.asarray(matriz[a, b], dtype=np.float32)
+        yield pd.DataFrame(bloque)
+
+
+def _escribir_npz_por_bloques(matrices: dict[str, np.ndarray], indices: np.ndarray, ruta: Path,
+                              filas_por_bloque: int) -> Path:
+    """
+    .npz comprimido (legible con np.load) sin juntar los pares en memoria: el
+    número de pares se conoce de antemano, así que cada columna se escribe como
+    un .npy dentro del zip con su cabecera y luego sus datos bloque a bloque.
+    """
+    n = len(indices)
+    total = n * (n - 1) // 2
+    columnas = {"indice_1": (np.int32, lambda a, b: indices[a]),
+                "indice_2": (np.int32, lambda a, b: indices[b])}
+    for nombre, matriz in matrices.items():
+        columnas[nombre] = (np.float32, lambda a, b, m=matriz: np.asarray(m[a, b]))
+    with zipfile.ZipFile(ruta, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for nombre, (tipo, valores) in columnas.items():
+            with zf.open(f"{nombre}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array_header_1_0(f, {
+                    "descr": np.lib.format.dtype_to_descr(np.dtype(tipo)),
+                    "fortran_order": False,
+                    "shape": (total,),
+                })
+                for a, b in _posiciones_bloques(n, filas_por_bloque):
+                    f.write(np.ascontiguousarray(valores(a, b), dtype=tipo).tobytes())
+    return ruta
+
+
+def exportar_pares(matrices: dict[str, np.ndarray], indices: list[int], ruta: Path,
+                   filas_por_bloque: int = FILAS_POR_BLOQUE) -> Path:
+    """
+    Todos los pares (i < j) con una columna float32 por algoritmo.
+    indices: índice de cada fila de las matrices en el corpus (van en indice_1 / indice_2).
+    Devuelve la ruta escrita (.parquet con pyarrow; si no, .npz comprimido).
+    En los dos casos se escribe por bloques de filas_por_bloque filas.
+    """
+    indices = np.asarray(indices)
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        pa = None
+
+    if pa is not None:
+        ruta = ruta.with_suffix(".parquet")
+        escritor = None
+        try:
+            for bloque in _bloques_pares(matrices, indices, filas_por_bloque):
+                tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(ruta, tabla.schema, compression="zstd")
+                escritor.write_table(tabla)
+        finally:
+            if escritor is not None:
+                escritor.close()
+        return ruta
+
+    return _escribir_npz_por_bloques(matrices, indices, ruta.with_suffix(".npz"), filas_por_bloque)
+
+
+def exportar_columnas(columnas: dict[str, np.ndarray], ruta: Path) -> Path:
+    """Columnas ya en memoria a .parquet (zstd, con pyarrow) o .npz comprimido."""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        ruta = ruta.with_suffix(".npz")
+        np.savez_compressed(ruta, **columnas)
+        return ruta
+    ruta = ruta.with_suffix(".parquet")
+    pq.write_table(pa.table(columnas), ruta, compression="zstd")
+    return ruta
+
+
+def leer_pares(ruta: Path) -> pd.DataFrame:
+    """Lee un archivo de exportar_pares (.parquet o .npz)."""
+    ruta = Path(ruta)
+    if ruta.suffix == ".parquet":
+        return pd.read_parquet(ruta)
+    with np.load(ruta) as datos:
+        return pd.DataFrame({c: datos[c] for c in datos.files})
+
+
+def exportar_top_csv(matrices: dict[str, np.ndarray], titulos: list[str], carpeta: Path,
+                     n_top: int = N_TOP) -> Path:
+    """Un CSV por algoritmo con sus n_top pares más similares."""
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    for nombre, matriz in matrices.items():
+        top_pares(matriz, titulos, n_top).to_csv(
+            carpeta / f"{nombre.replace(' ', '_')}.csv", index=False, encoding="utf-8")
+    return carpeta
@@ -0,0 +1,274 @@
+"""
+Índice comprimido de embeddings: PCA + cuantización escalar int8.
+
+Guardar y recorrer completos los embeddings float32 (384 o 768 dimensiones por
+abstract) es caro para buscar o agrupar. Aquí cada vector se comprime así:
+  1. PCA: se resta la media μ y se proyecta sobre las `dim` componentes
+     principales W (d×dim), sacadas por SVD de una muestra del corpus:
+         z = Wᵀ (x - μ)
+  2. int8: cada dimensión j de z se guarda como round(z_j / s_j) en [-127, 127],
+     con s_j = max|z_j| / 127.
+Para una consulta q, como x ≈ μ + W z:
+         q · x ≈ q · μ + (Wᵀ q ⊙ s) · códigos
+es decir, un producto de la matriz int8 n×dim por un solo vector (por bloques
+de filas). Con dim = 64 cada vector ocupa 64 bytes en lugar de 1536 (384·4).
+
+El orden aproximado puede corregirse con un reordenado exacto: se toman
+k·CANDIDATOS_REORDENAR candidatos con los códigos y solo esas filas de los
+vectores completos (un memmap de AlmacenEmbeddings, por ejemplo) se leen y se
+puntúan con el producto exacto. recall_en_k mide qué fracción de los k
+vecinos exactos recupera el índice, con y sin reordenado.
+
+Uso por consola (recall@k y tiempos contra los vectores completos):
+    python indiceComprimido.py --modelo sbert --dim 32,64,128 -k 10
+    python indiceComprimido.py --sinteticos 100000 --dim-original 384
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from busquedaSimilares import top_k
+
+DIM = 64
+
+# Filas usadas para ajustar la PCA (la SVD de una muestra basta)
+MUESTRA_PCA = 20_000
+
+# Candidatos por vecino pedido que se reordenan con los vectores completos
+CANDIDATOS_REORDENAR = 4
+
+# Filas por bloque al puntuar: el bloque convertido a float32 (2048×64 = 512 KB)
+# cabe en caché, y así la conversión int8 -> float32 no domina el tiempo
+TAM_BLOQUE = 2048
+
+
+def normalizar_filas(X: np.ndarray) -> np.ndarray:
+    X = np.asarray(X, dtype=np.float32)
+    normas = np.linalg.norm(X, axis=-1, keepdims=True)
+    return X / np.where(normas > 0, normas, 1)
+
+
+class IndiceComprimido:
+    """Códigos int8 de los vectores proyectados por PCA y lo necesario para puntuarlos."""
+
+    def __init__(self, media: np.ndarray, componentes: np.ndarray, escala: np.ndarray,
+                 codigos: np.ndarray, normalizar: bool = True, exactos: np.ndarray | None = None,
+                 varianza: float | None = None):
+        """
+        media (d), componentes (d×dim), escala (dim), codigos (n×dim int8).
+        normalizar: los vectores se indexaron con norma L2 = 1 (coseno = producto).
+        exactos: vectores completos n×d para el reordenado (opcional; puede ser un memmap).
+        varianza: fracción de la varianza conservada por la PCA (informativo).
+        """
+        self.media = media
+        self.componentes = componentes
+        self.escala = escala
+        self.codigos = codigos
+        self.normalizar = normalizar
+        self.exactos = exactos
+        self.varianza = varianza
+
+    @property
+    def n(self) -> int:
+        return self.codigos.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.codigos.shape[1]
+
+    # ------------------------- Construcción -------------------------
+
+    @classmethod
+    def ajustar(cls, vectores: np.ndarray, dim: int = DIM, normalizar: bool = True,
+                conservar_exactos: bool = True, muestra: int = MUESTRA_PCA,
+                semilla: int = 0, tam_bloque: int = TAM_BLOQUE) -> "IndiceComprimido":
+        """
+        Ajusta la PCA con (una muestra de) `vectores` (n×d) y cuantiza todas las filas.
+        conservar_exactos: guarda la referencia a `vectores` para el reordenado
+        (no se copia: con un memmap solo se leen las filas candidatas).
+        """
+        n, d = vectores.shape
+        rng = np.random.default_rng(semilla)
+        filas = np.sort(rng.choice(n, muestra, replace=False)) if n > muestra else np.arange(n)
+        M = np.asarray(vectores[filas], dtype=np.float32)
+        if normalizar:
+            M = normalizar_filas(M)
+        media = M.mean(axis=0)
+        _, s, Vt = np.linalg.svd(M - media, full_matrices=False)
+        componentes = np.ascontiguousarray(Vt[:dim].T, dtype=np.float32)
+        # Con menos filas que dimensiones la SVD da menos componentes
+        dim = componentes.shape[1]
+        varianza = float((s[:dim] ** 2).sum() / max((s ** 2).sum(), 1e-12))
+
+        indice = cls(media.astype(np.float32), componentes, np.ones(dim, dtype=np.float32),
+                     np.zeros((0, dim), dtype=np.int8), normalizar,
+                     vectores if conservar_exactos else None, varianza)
+        Z = np.empty((n, dim), dtype=np.float32)
+        for s0 in range(0, n, tam_bloque):
+            Z[s0:s0 + tam_bloque] = indice.proyectar(vectores[s0:s0 + tam_bloque])
+        maximos = np.abs(Z).max(axis=0) if n else np.zeros(dim, dtype=np.float32)
+        indice.escala = (np.where(maximos > 0, maximos, 1) / 127).astype(np.float32)
+        indice.codigos = np.clip(np.rint(Z / indice.escala), -127, 127).astype(np.int8)
+        return indice
+
+    def proyectar(self, X: np.ndarray) -> np.ndarray:
+        """Coordenadas PCA (sin cuantizar) de los vectores X (m×d o d)."""
+        X = normalizar_filas(X) if self.normalizar else np.asarray(X, dtype=np.float32)
+        return (X - self.media) @ self.componentes
+
+    # ------------------------- Consultas -------------------------
+
+    def puntuar(self, q: np.ndarray, tam_bloque: int = TAM_BLOQUE) -> np.ndarray:
+        """Producto aproximado de la consulta q (d) con todas las filas del índice."""
+        q = normalizar_filas(q) if self.normalizar else np.asarray(q, dtype=np.float32)
+        qz = (self.componentes.T @ q) * self.escala
+        salida = np.empty(self.n, dtype=np.float32)
+        salida[:] = float(q @ self.media)
+        for s in range(0, self.n, tam_bloque):
+            salida[s:s + tam_bloque] += self.codigos[s:s + tam_bloque].astype(np.float32) @ qz
+        return salida
+
+    def exacto(self, filas: np.ndarray, q: np.ndarray) -> np.ndarray:
+        """Producto exacto de q con las filas indicadas de los vectores completos."""
+        if self.exactos is None:
+            raise ValueError("El índice no conserva los vectores completos")
+        orden = np.argsort(filas)  # lectura secuencial del memmap
+        V = np.empty((len(filas), self.exactos.shape[1]), dtype=np.float32)
+        V[orden] = self.exactos[filas[orden]]
+        if self.normalizar:
+            V, q = normalizar_filas(V), normalizar_filas(q)
+        return V @ np.asarray(q, dtype=np.float32)
+
+    def buscar(self, q: np.ndarray, k: int = 10, excluir: int | None = None,
+               reordenar: bool = True,
+               candidatos: int = CANDIDATOS_REORDENAR) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Posiciones y similitudes de los k vecinos de q, de mayor a menor.
+        reordenar: los k·candidatos mejores por los códigos se puntúan con los
+        vectores completos (si el índice los conserva).
+        """
+        aprox = self.puntuar(q)
+        if not reordenar or self.exactos is None:
+            mejores = top_k(aprox, k, excluir)
+            return mejores, aprox[mejores]
+        cand = top_k(aprox, k * candidatos, excluir)
+        sims = self.exacto(cand, q)
+        orden = np.argsort(-sims, kind="stable")[:k]
+        return cand[orden], sims[orden]
+
+    def nbytes(self) -> int:
+        """Memoria del índice sin contar los vectores completos."""
+        return sum(a.nbytes for a in (self.media, self.componentes, self.escala, self.codigos))
+
+    # ------------------------- Persistencia -------------------------
+
+    def guardar(self, ruta) -> Path:
+        ruta = Path(ruta).with_suffix(".npz")
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(ruta, media=self.media, componentes=self.componentes, escala=self.escala,
+                 codigos=self.codigos, normalizar=self.normalizar,
+                 varianza=np.nan if self.varianza is None else self.varianza)
+        return ruta
+
+    @classmethod
+    def cargar(cls, ruta, exactos: np.ndarray | None = None) -> "IndiceComprimido":
+        """Índice guardado con guardar(); exactos: vectores completos para el reordenado."""
+        with np.load(Path(ruta).with_suffix(".npz")) as datos:
+            varianza = float(datos["varianza"])
+            return cls(datos["media"], datos["componentes"], datos["escala"], datos["codigos"],
+                       bool(datos["normalizar"]), exactos,
+                       None if np.isnan(varianza) else varianza)
+
+
+# -----------------------------------------------------------
+# Recall@k contra los vectores completos
+# -----------------------------------------------------------
+
+def recall_en_k(vectores: np.ndarray, indice: IndiceComprimido, consultas: np.ndarray,
+                k: int = 10, reordenar: bool = False) -> float:
+    """
+    Fracción media de los k vecinos exactos (producto con los vectores
+    completos) que devuelve el índice. consultas: posiciones del corpus
+    usadas como consulta (el propio documento se excluye).
+    """
+    E = normalizar_filas(vectores) if indice.normalizar else np.asarray(vectores, dtype=np.float32)
+    aciertos = 0
+    for pos in consultas:
+        q = E[pos]
+        exactos = set(top_k(E @ q, k, excluir=pos).tolist())
+        obtenidos, _ = indice.buscar(q, k, excluir=pos, reordenar=reordenar)
+        aciertos += len(exactos.intersection(obtenidos.tolist()))
+    return aciertos / max(len(consultas) * k, 1)
+
+
+def sinteticos(n: int, dim: int = 384, rango: int = 48, ruido: float = 0.3,
+               semilla: int = 0) -> np.ndarray:
+    """
+    n vectores normalizados con la varianza concentrada en `rango` direcciones
+    (como los embeddings de frases) más ruido isótropo.
+    """
+    rng = np.random.default_rng(semilla)
+    pesos = 1 / np.sqrt(np.arange(1, rango + 1, dtype=np.float32))
+    base = rng.standard_normal((rango, dim)).astype(np.float32)
+    X = (rng.standard_normal((n, rango)).astype(np.float32) * pesos) @ base
+    X += ruido * rng.standard_normal((n, dim)).astype(np.float32)
+    return normalizar_filas(X)
+
+
+def _tiempo_consulta(funcion, consultas: np.ndarray) -> float:
+    t0 = time.perf_counter()
+    for pos in consultas:
+        funcion(pos)
+    return (time.perf_counter() - t0) / max(len(consultas), 1) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de embeddings con PCA + int8 y su recall@k")
+    parser.add_argument("--modelo", default="sbert", choices=["sbert", "distilbert"])
+    parser.add_argument("--dim", default=str(DIM), help="Dimensiones tras la PCA (separadas por coma)")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--consultas", type=int, default=200, help="Documentos usados como consulta")
+    parser.add_argument("--sinteticos", type=int, default=0,
+                        help="Usar N vectores sintéticos en lugar del corpus")
+    parser.add_argument("--dim-original", type=int, default=384, help="Dimensión de los sintéticos")
+    parser.add_argument("--salida", default=None, help="Guardar el índice de la primera dimensión (.npz)")
+    args = parser.parse_args()
+
+    if args.sinteticos:
+        E = sinteticos(args.sinteticos, args.dim_original)
+        origen = f"{args.sinteticos} vectores sintéticos"
+    else:
+        from almacenEmbeddings import MODELOS_IA, almacen_compartido
+        from busquedaSimilares import cargar_corpus
+
+        medida = {"sbert": "Sentence-BERT", "distilbert": "DistilBERT STS"}[args.modelo]
+        E = almacen_compartido(MODELOS_IA[medida]).obtener(cargar_corpus()["abstract"].tolist(),
+                                                           normalizar=True)
+        origen = f"{E.shape[0]} abstracts ({medida})"
+
+    rng = np.random.default_rng(1)
+    consultas = rng.choice(E.shape[0], min(args.consultas, E.shape[0]), replace=False)
+    print(f"{origen}, dimensión {E.shape[1]}, {len(consultas)} consultas, k = {args.k}")
+    ms_completo = _tiempo_consulta(lambda pos: top_k(E @ E[pos], args.k, excluir=pos), consultas)
+    print(f"Vectores completos: {E.nbytes / 2**20:.1f} MB, {ms_completo:.2f} ms/consulta")
+
+    for i, dim in enumerate(int(x) for x in args.dim.split(",")):
+        t0 = time.perf_counter()
+        indice = IndiceComprimido.ajustar(E, dim)
+        t_ajuste = time.perf_counter() - t0
+        fila = (f"dim {indice.dim:>4}: {indice.nbytes() / 2**20:.1f} MB, "
+                f"varianza {indice.varianza:.1%}, ajuste {t_ajuste:.2f} s")
+        for reordenar in (False, True):
+            recall = recall_en_k(E, indice, consultas, args.k, reordenar)
+            ms = _tiempo_consulta(
+                lambda pos: indice.buscar(E[pos], args.k, excluir=pos, reordenar=reordenar), consultas)
+            fila += f" | {'reordenado' if reordenar else 'códigos'}: recall@{args.k} {recall:.3f}, {ms:.2f} ms"
+        print(fila)
+        if args.salida and i == 0:
+            print(f"Índice guardado en: {indice.guardar(args.salida)}")
+
+
+if __name__ == "__main__":
+    main()
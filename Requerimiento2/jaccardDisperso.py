@@ -0,0 +1,108 @@
+"""
+Matriz de Jaccard para todo el corpus con matrices dispersas binarias.
+
+Cada abstract se representa como una fila binaria documento-término.
+Para dos documentos A y B:
+    |A ∩ B| = (X · Xᵀ)[a, b]      (producto de matrices dispersas)
+    |A ∪ B| = |A| + |B| - |A ∩ B| (|A| = suma de la fila)
+Se recorre la matriz por bloques de filas y cada bloque solo se multiplica
+contra las columnas j >= inicio del bloque, es decir, solo el triángulo
+superior. La diagonal es 1 para cualquier documento con al menos una palabra.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+# Mismo criterio que jaccard_similarity: re.findall(r'\w+', texto.lower())
+PATRON_TOKEN = r'\w+'
+
+# Filas por bloque en el producto X · Xᵀ
+TAM_BLOQUE = 512
+
+
+def matriz_binaria(textos: list[str]) -> sp.csr_matrix:
+    """Matriz documento-término binaria (CSR, float32)."""
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    vectorizer = CountVectorizer(token_pattern=PATRON_TOKEN, lowercase=True,
+                                 binary=True, dtype=np.float32)
+    return vectorizer.fit_transform(textos).tocsr()
+
+
+def matriz_binaria_ids(conjuntos: list, n_columnas: int | None = None) -> sp.csr_matrix:
+    """
+    Matriz binaria a partir de conjuntos de ids enteros ya internados
+    (por ejemplo, los de CacheRasgos).
+    """
+    indptr = np.zeros(len(conjuntos) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in conjuntos], out=indptr[1:])
+    indices = np.fromiter((i for c in conjuntos for i in c), dtype=np.int64, count=int(indptr[-1]))
+    if n_columnas is None:
+        n_columnas = int(indices.max()) + 1 if indices.size else 0
+    datos = np.ones(indices.size, dtype=np.float32)
+    return sp.csr_matrix((datos, indices, indptr), shape=(len(conjuntos), n_columnas))
+
+
+def _bloques(X: sp.csr_matrix, tam_bloque: int):
+    """Genera (inicio, intersecciones) con las filas [inicio, fin) contra las columnas >= inicio."""
+    n = X.shape[0]
+    XT = X.T.tocsc()
+    for s in range(0, n, tam_bloque):
+        yield s, X[s:s + tam_bloque] @ XT[:, s:]
+
+
+def jaccard_triangular(X: sp.csr_matrix, tam_bloque: int = TAM_BLOQUE) -> sp.coo_matrix:
+    """
+    Similitudes de Jaccard del triángulo superior estricto (i < j) como COO.
+    Los pares sin palabras en común no aparecen (su Jaccard es 0).
+    """
+    X = X.tocsr()
+    n = X.shape[0]
+    tamanos = np.asarray(X.sum(axis=1), dtype=np.float64).ravel()
+    filas, cols, vals = [], [], []
+    for s, inter in _bloques(X, tam_bloque):
+        inter = sp.triu(inter, k=1).tocoo()
+        i = inter.row + s
+        j = inter.col + s
+        filas.append(i)
+        cols.append(j)
+        vals.append(inter.data / (tamanos[i] + tamanos[j] - inter.data))
+    if not filas:
+        return sp.coo_matrix((n, n))
+    return sp.coo_matrix((np.concatenate(vals), (np.concatenate(filas), np.concatenate(cols))),
+                         shape=(n, n))
+
+
+def jaccard_densa(X: sp.csr_matrix, tam_bloque: int = TAM_BLOQUE) -> np.ndarray:
+    """Matriz n×n simétrica de Jaccard calculando solo los bloques del triángulo superior."""
+    X = X.tocsr()
+    n = X.shape[0]
+    tamanos = np.asarray(X.sum(axis=1), dtype=np.float64).ravel()
+    M = np.zeros((n, n))
+    for s, inter in _bloques(X, tam_bloque):
+        inter = inter.toarray()
+        e = s + inter.shape[0]
+        union = tamanos[s:e, None] + tamanos[None, s:] - inter
+        np.divide(inter, union, out=M[s:e, s:], where=union > 0)
+    # Los bloques por debajo de la diagonal quedaron en 0: se reflejan
+    return np.maximum(M, M.T)
+
+
+def matriz_jaccard(textos: list[str], densa: bool = True):
+    """
+    Matriz de Jaccard de todos los pares de `textos`.
+    densa=True devuelve un ndarray n×n simétrico (como la versión con doble bucle);
+    densa=False devuelve solo el triángulo superior en formato disperso (COO).
+    """
+    n = len(textos)
+    try:
+        X = matriz_binaria(textos)
+    except ValueError:
+        # Vocabulario vacío: ningún texto tiene palabras, todas las similitudes son 0
+        return np.zeros((n, n)) if densa else sp.coo_matrix((n, n))
+    return jaccard_densa(X) if densa else jaccard_triangular(X)
+
+
+def matriz_jaccard_conjuntos(conjuntos: list, densa: bool = True):
+    """Igual que matriz_jaccard pero partiendo de conjuntos de ids ya calculados."""
+    X = matriz_binaria_ids(conjuntos)
+    return jaccard_densa(X) if densa else jaccard_triangular(X)
@@ -0,0 +1,208 @@
+"""
+Todos los pares con Jaccard >= umbral sin calcular la matriz completa
+(join por similitud con filtrado de prefijos, estilo AllPairs / PPJoin).
+
+Cada documento es un conjunto de ids (palabras o n-gramas de CacheRasgos).
+  1. Orden global de tokens por frecuencia de documento, de menos a más
+     frecuente; cada conjunto se reescribe como lista ordenada de rangos.
+  2. Filtro de prefijo: si J(x, y) >= t, x e y comparten algún token entre los
+     |x| - ⌈t·|x|⌉ + 1 primeros de x. Solo esos tokens (los más raros) se
+     buscan en el índice invertido, y en él solo se guarda el prefijo
+     intermedio |x| - ⌈2t/(1+t)·|x|⌉ + 1 de cada documento.
+  3. Filtro de longitud: los documentos se recorren por tamaño creciente y un
+     candidato y necesita |y| >= t·|x|; las entradas más cortas se descartan
+     del principio de cada lista para siempre.
+  4. Filtro posicional: con el token en la posición i de x y j de y, el
+     solapamiento no puede pasar de (común hasta ahora) + 1 + min(|x|-i-1, |y|-j-1);
+     si eso no llega a α = ⌈t/(1+t)·(|x|+|y|)⌉ el candidato se poda.
+  5. Verificación exacta de los candidatos que sobreviven (intersección de
+     conjuntos).
+El resultado es exactamente el mismo conjunto de pares que filtrar la matriz
+completa, pero solo se verifica una fracción pequeña de los n(n-1)/2 pares.
+
+Uso por consola (compara con la matriz dispersa exacta de jaccardDisperso):
+    python joinPrefijos.py --umbral 0.5
+    python joinPrefijos.py --umbral 0.8 --medida ngramas
+    python joinPrefijos.py --umbral 0.9 --sinteticos 100000 --sin-exacta
+    python joinPrefijos.py --umbral 0.8 --salida ResultadosSimilitud/casi_duplicados
+"""
+import argparse
+import math
+import time
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+
+# Margen para que ⌈t·x⌉ no suba por errores de redondeo (t·x entero)
+EPS = 1e-9
+
+
+def _techo(x: float) -> int:
+    return math.ceil(x - EPS)
+
+
+def ordenar_por_frecuencia(conjuntos: list) -> list[list[int]]:
+    """Cada conjunto como lista creciente de rangos (rango 0 = token menos frecuente)."""
+    cuenta = Counter(w for c in conjuntos for w in c)
+    rango = {w: r for r, w in enumerate(sorted(cuenta, key=lambda w: (cuenta[w], w)))}
+    return [sorted(rango[w] for w in c) for c in conjuntos]
+
+
+def join_jaccard(conjuntos: list, umbral: float,
+                 estadisticas: dict | None = None) -> sp.coo_matrix:
+    """
+    Pares (i < j) con Jaccard(conjuntos[i], conjuntos[j]) >= umbral, en una
+    matriz COO n×n del triángulo superior. umbral debe estar en (0, 1].
+    estadisticas (opcional) se rellena con candidatos (pares que comparten un
+    token del prefijo), verificados (los que pasan el filtro posicional) y pares.
+    """
+    if not 0 < umbral <= 1:
+        raise ValueError("El umbral debe estar en (0, 1]")
+    n = len(conjuntos)
+    registros = ordenar_por_frecuencia(conjuntos)
+    longitudes = [len(r) for r in registros]
+    rangos = [frozenset(r) for r in registros]
+    orden = sorted(range(n), key=longitudes.__getitem__)
+    t = umbral
+    factor_alpha = t / (1 + t)
+    factor_indice = 2 * t / (1 + t)
+
+    # token -> entradas (documento, posición) y comienzo vigente de la lista
+    indice: dict[int, list[tuple[int, int]]] = {}
+    comienzo: dict[int, int] = {}
+    filas, cols, vals = [], [], []
+    n_candidatos = n_verificados = 0
+
+    for x in orden:
+        r = registros[x]
+        lx = longitudes[x]
+        if lx == 0:
+            continue
+        min_ly = _techo(t * lx)
+        prefijo = lx - min_ly + 1
+        prefijo_indice = lx - _techo(factor_indice * lx) + 1
+        comunes: dict[int, int] = {}  # candidato -> tokens comunes (-1 = podado)
+        for i in range(prefijo):
+            w = r[i]
+            lista = indice.get(w)
+            if lista is not None:
+                k = comienzo[w]
+                while k < len(lista) and longitudes[lista[k][0]] < min_ly:
+                    k += 1
+                comienzo[w] = k
+                for y, j in lista[k:] if k else lista:
+                    a = comunes.get(y, 0)
+                    if a < 0:
+                        continue
+                    ly = longitudes[y]
+                    alpha = _techo(factor_alpha * (lx + ly))
+                    if a + 1 + min(lx - i - 1, ly - j - 1) >= alpha:
+                        comunes[y] = a + 1
+                    else:
+                        comunes[y] = -1
+            if i < prefijo_indice:
+                if lista is None:
+                    indice[w] = lista = []
+                    comienzo[w] = 0
+                lista.append((x, i))
+
+        rx = rangos[x]
+        n_candidatos += len(comunes)
+        for y, a in comunes.items():
+            if a <= 0:
+                continue
+            ly = longitudes[y]
+            alpha = _techo(factor_alpha * (lx + ly))
+            n_verificados += 1
+            solape = len(rx & rangos[y])
+            if solape >= alpha:
+                sim = solape / (lx + ly - solape)
+                if sim >= t - EPS:
+                    filas.append(min(x, y))
+                    cols.append(max(x, y))
+                    vals.append(sim)
+
+    if estadisticas is not None:
+        estadisticas.update({
+            "documentos": n,
+            "pares_totales": n * (n - 1) // 2,
+            "candidatos": n_candidatos,
+            "verificados": n_verificados,
+            "pares": len(vals),
+        })
+    return sp.coo_matrix((np.asarray(vals, dtype=np.float32),
+                          (np.asarray(filas, dtype=np.int32), np.asarray(cols, dtype=np.int32))),
+                         shape=(n, n))
+
+
+# -----------------------------------------------------------
+# Comparación con la matriz exacta
+# -----------------------------------------------------------
+
+def sinteticos(conjuntos: list, n: int, quitar: float = 0.1, semilla: int = 0) -> list:
+    """
+    n conjuntos sacados de `conjuntos` al azar, cada uno sin un `quitar` de
+    sus elementos. Cada original se repite unas n / len(conjuntos) veces, así
+    que hay muchos más casi duplicados que en un corpus real (caso pesimista).
+    """
+    rng = np.random.default_rng(semilla)
+    origen = rng.integers(0, len(conjuntos), size=n)
+    salida = []
+    for d in origen:
+        c = np.fromiter(conjuntos[d], dtype=np.int64, count=len(conjuntos[d]))
+        salida.append(frozenset(c[rng.random(c.size) >= quitar].tolist()))
+    return salida
+
+
+def main():
+    from busquedaSimilares import cargar_corpus
+    from cacheRasgos import CacheRasgos
+    from jaccardDisperso import jaccard_triangular, matriz_binaria_ids
+
+    parser = argparse.ArgumentParser(description="Join por similitud de Jaccard con filtrado de prefijos")
+    parser.add_argument("--umbral", type=float, default=0.5)
+    parser.add_argument("--medida", default="palabras", choices=["palabras", "ngramas"])
+    parser.add_argument("--sinteticos", type=int, default=0,
+                        help="Usar N documentos sintéticos (casi duplicados del corpus)")
+    parser.add_argument("--sin-exacta", action="store_true", help="No calcular la matriz exacta")
+    parser.add_argument("--salida", default=None, help="Guardar los pares (columnar, ver paresDispersos)")
+    args = parser.parse_args()
+
+    textos = cargar_corpus()["abstract"].tolist()
+    rasgos = CacheRasgos.cargar()
+    if args.medida == "palabras":
+        conjuntos = [rasgos.tokens(t) for t in textos]
+    else:
+        conjuntos = [rasgos.ngramas(t, 3) for t in textos]
+    rasgos.guardar()
+    if args.sinteticos:
+        conjuntos = sinteticos(conjuntos, args.sinteticos)
+
+    estadisticas = {}
+    t0 = time.perf_counter()
+    pares = join_jaccard(conjuntos, args.umbral, estadisticas)
+    t_join = time.perf_counter() - t0
+    total = max(estadisticas["pares_totales"], 1)
+    print(f"{estadisticas['documentos']} documentos, {estadisticas['pares_totales']} pares posibles")
+    print(f"Join por prefijos: {t_join:.2f} s, {estadisticas['candidatos']} candidatos, "
+          f"{estadisticas['verificados']} verificados ({estadisticas['verificados'] / total:.4%} de los pares), "
+          f"{estadisticas['pares']} pares >= {args.umbral}")
+
+    if args.salida:
+        from paresDispersos import guardar_pares
+        print(f"Pares guardados en: {guardar_pares(pares, args.salida)}")
+
+    if not args.sin_exacta:
+        t0 = time.perf_counter()
+        exacta = jaccard_triangular(matriz_binaria_ids(conjuntos)).tocoo()
+        t_exacta = time.perf_counter() - t0
+        ok = exacta.data >= args.umbral - EPS
+        esperados = set(zip(exacta.row[ok].tolist(), exacta.col[ok].tolist()))
+        obtenidos = set(zip(pares.row.tolist(), pares.col.tolist()))
+        print(f"Matriz exacta: {t_exacta:.2f} s, {len(esperados)} pares >= {args.umbral}; "
+              f"{'mismos pares' if esperados == obtenidos else 'DIFERENCIAS: ' + str(len(esperados ^ obtenidos))}")
+
+
+if __name__ == "__main__":
+    main()
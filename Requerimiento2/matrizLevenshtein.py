@@ -0,0 +1,191 @@
+"""
+Matriz de similitud de Levenshtein para muchos documentos.
+
+- Solo se calculan los pares i < j (la matriz es simétrica y la diagonal es 1).
+- Las filas del triángulo superior se reparten en trozos de trabajo parecido
+  entre varios procesos.
+- Con un umbral de similitud mínimo, cada par tiene una distancia máxima
+  permitida: si la diferencia de longitudes ya la supera el par se descarta
+  sin calcular nada, y si no, Levenshtein.distance corta el cálculo en cuanto
+  la distancia supera ese máximo (score_cutoff, algoritmo por bandas).
+  Los pares descartados quedan con similitud 0.
+
+sim = 1 - dist / max(len(a), len(b))
+
+Modo "palabras": la distancia se cuenta en palabras (re.findall(r'\w+') en
+minúsculas, como cacheRasgos) en lugar de caracteres. Cada palabra se interna
+como un entero y la secuencia se codifica como un str con un carácter por
+palabra (chr(id), saltando los sustitutos; como mucho MAX_VOCABULARIO
+palabras distintas), así Levenshtein.distance trabaja igual pero sobre
+secuencias unas 6 veces más cortas: insertar, borrar o cambiar palabras.
+"""
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+import Levenshtein
+
+# Por debajo de este número de documentos no compensa levantar procesos
+MIN_DOCS_PARALELO = 200
+
+# El pool se suele crear desde un hilo (ejecucionConcurrente) mientras otros
+# hilos importan sklearn/torch o tienen locks tomados: con fork el hijo
+# heredaría esos locks cerrados. forkserver (spawn en Windows) arranca los
+# trabajadores desde un proceso limpio.
+CONTEXTO_PROCESOS = "spawn" if os.name == "nt" else "forkserver"
+
+# Textos del proceso trabajador (se envían una vez, en el inicializador)
+_textos: list[str] = []
+
+MODOS = ("caracteres", "palabras")
+
+RE_PALABRA = re.compile(r'\w+')
+
+# Puntos de código sustitutos (no se usan como "carácter" de una palabra)
+_SUSTITUTOS = 0xD800
+_FIN_SUSTITUTOS = 0xE000
+# Palabras distintas que caben en los puntos de código de Unicode sin sustitutos
+MAX_VOCABULARIO = 0x110000 - (_FIN_SUSTITUTOS - _SUSTITUTOS)
+
+
+def _caracter(id_palabra: int) -> str:
+    if id_palabra >= MAX_VOCABULARIO:
+        raise ValueError(
+            f"Vocabulario demasiado grande para el modo 'palabras' (más de {MAX_VOCABULARIO} "
+            "palabras distintas, una por punto de código); use modo='caracteres'"
+        )
+    if id_palabra >= _SUSTITUTOS:
+        id_palabra += _FIN_SUSTITUTOS - _SUSTITUTOS
+    return chr(id_palabra)
+
+
+def secuencias_palabras(textos: list[str], vocabulario: dict[str, int] | None = None) -> list[str]:
+    """
+    Cada texto como un str con un carácter por palabra (ids internados en
+    `vocabulario`, que se amplía con las palabras nuevas).
+    """
+    vocabulario = {} if vocabulario is None else vocabulario
+    return ["".join(_caracter(vocabulario.setdefault(w, len(vocabulario)))
+                    for w in RE_PALABRA.findall(t.lower()))
+            for t in textos]
+
+
+def _preparar_textos(textos: list[str], modo: str) -> list[str]:
+    if modo == "caracteres":
+        return list(textos)
+    if modo == "palabras":
+        return secuencias_palabras(textos)
+    raise ValueError(f"Modo desconocido: {modo} (opciones: {', '.join(MODOS)})")
+
+
+def distancia_maxima(umbral: float, longitud: int) -> int:
+    """Mayor distancia que todavía alcanza `umbral` para textos de `longitud` máxima."""
+    return int(math.floor((1 - umbral) * longitud + 1e-9))
+
+
+def similitud_levenshtein(a: str, b: str, umbral: float | None = None,
+                          modo: str = "caracteres") -> float | None:
+    """
+    Similitud normalizada entre dos textos (modo "caracteres" o "palabras").
+    Con `umbral`, devuelve None si el par no puede alcanzarlo.
+    """
+    if modo != "caracteres":
+        a, b = _preparar_textos([a, b], modo)
+    m = max(len(a), len(b))
+    if m == 0:
+        return 0.0
+    if umbral is None:
+        return 1 - Levenshtein.distance(a, b) / m
+    max_dist = distancia_maxima(umbral, m)
+    # Cota inferior barata: la distancia nunca es menor que la diferencia de longitudes
+    if abs(len(a) - len(b)) > max_dist:
+        return None
+    dist = Levenshtein.distance(a, b, score_cutoff=max_dist)
+    if dist > max_dist:
+        return None
+    return 1 - dist / m
+
+
+def _iniciar(textos: list[str]):
+    global _textos
+    _textos = textos
+
+
+def _calcular_filas(args: tuple[int, int, float | None]):
+    """Pares (i, j > i) de las filas [inicio, fin). Devuelve arrays fila, columna, similitud."""
+    inicio, fin, umbral = args
+    textos = _textos
+    n = len(textos)
+    filas, cols, vals = [], [], []
+    for i in range(inicio, fin):
+        a = textos[i]
+        for j in range(i + 1, n):
+            sim = similitud_levenshtein(a, textos[j], umbral)
+            if sim:
+                filas.append(i)
+                cols.append(j)
+                vals.append(sim)
+    return (np.asarray(filas, dtype=np.int32), np.asarray(cols, dtype=np.int32),
+            np.asarray(vals, dtype=np.float64))
+
+
+def _trozos_filas(n: int, n_trozos: int) -> list[tuple[int, int]]:
+    """Corta las filas 0..n-1 en trozos con un número parecido de pares i < j."""
+    total = n * (n - 1) // 2
+    objetivo = max(total // max(n_trozos, 1), 1)
+    trozos = []
+    inicio = 0
+    acumulado = 0
+    for i in range(n):
+        acumulado += n - 1 - i
+        if acumulado >= objetivo:
+            trozos.append((inicio, i + 1))
+            inicio = i + 1
+            acumulado = 0
+    if inicio < n:
+        trozos.append((inicio, n))
+    return trozos
+
+
+def pares_levenshtein(textos: list[str], umbral: float | None = None,
+                      procesos: int | None = None, modo: str = "caracteres") -> sp.coo_matrix:
+    """
+    Similitudes del triángulo superior estricto (i < j) en formato COO.
+    Solo aparecen los pares con similitud > 0 (y >= umbral si se indica).
+    """
+    textos = _preparar_textos(textos, modo)
+    n = len(textos)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or n < MIN_DOCS_PARALELO:
+        _iniciar(textos)
+        partes = [_calcular_filas((0, n, umbral))]
+    else:
+        tareas = [(a, b, umbral) for a, b in _trozos_filas(n, procesos * 8)]
+        contexto = multiprocessing.get_context(CONTEXTO_PROCESOS)
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto, initializer=_iniciar,
+                                 initargs=(textos,)) as pool:
+            partes = list(pool.map(_calcular_filas, tareas))
+
+    filas = np.concatenate([p[0] for p in partes]) if partes else np.zeros(0, np.int32)
+    cols = np.concatenate([p[1] for p in partes]) if partes else np.zeros(0, np.int32)
+    vals = np.concatenate([p[2] for p in partes]) if partes else np.zeros(0)
+    return sp.coo_matrix((vals, (filas, cols)), shape=(n, n))
+
+
+def matriz_levenshtein(textos: list[str], umbral: float | None = None,
+                       procesos: int | None = None, modo: str = "caracteres") -> np.ndarray:
+    """Matriz n×n simétrica de similitud de Levenshtein (mismos valores que el doble bucle)."""
+    textos = _preparar_textos(textos, modo)
+    n = len(textos)
+    triu = pares_levenshtein(textos, umbral, procesos)
+    M = np.zeros((n, n))
+    M[triu.row, triu.col] = triu.data
+    M[triu.col, triu.row] = triu.data
+    for i, t in enumerate(textos):
+        if t:
+            M[i, i] = 1.0
+    return M
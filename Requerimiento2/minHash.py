@@ -0,0 +1,196 @@
+"""
+MinHash y LSH para estimar Jaccard (palabras) y coincidencia de n-gramas.
+
+Cada documento se resume en una firma de `num_perm` valores: para cada
+función hash h_k, el mínimo de h_k sobre los ids de su conjunto (los de
+CacheRasgos). La probabilidad de que dos firmas coincidan en una posición es
+exactamente el Jaccard de los conjuntos, así que
+    Jaccard(A, B) ≈ media(firma_A == firma_B)
+en tiempo constante por par (num_perm comparaciones), sin tocar los textos.
+El error típico es sqrt(J (1 - J) / num_perm).
+
+Las firmas son arrays uint32 o uint64 (n × num_perm) y se pueden guardar con
+np.save. Las funciones hash parten de a_k · x + b_k (módulo 2^64, a_k y b_k
+aleatorios con semilla fija): uint32 se queda con los 32 bits altos y uint64
+pasa el valor por el mezclador de splitmix64.
+
+LSH por bandas: la firma se corta en `bandas` trozos de `filas` valores; dos
+documentos son candidatos si coinciden en algún trozo completo. Con Jaccard s
+la probabilidad de ser candidato es 1 - (1 - s^filas)^bandas, una curva en S
+cuyo punto de corte es ≈ (1 / bandas)^(1 / filas); parametros_lsh elige
+bandas y filas para un umbral dado.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+NUM_PERM = 128
+
+# Ids por trozo al calcular firmas (acota la matriz num_perm × ids)
+TAM_TROZO = 1 << 16
+
+# Filas por bloque al estimar la matriz completa
+TAM_BLOQUE = 256
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mezclar(x: np.ndarray) -> np.ndarray:
+    """Finalizador de splitmix64 (aritmética módulo 2^64)."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * _M1
+    x = x ^ (x >> np.uint64(27))
+    x = x * _M2
+    return x ^ (x >> np.uint64(31))
+
+
+class MinHash:
+    """Familia de `num_perm` funciones hash y cálculo de firmas."""
+
+    def __init__(self, num_perm: int = NUM_PERM, semilla: int = 1, dtype=np.uint32):
+        if np.dtype(dtype) not in (np.dtype(np.uint32), np.dtype(np.uint64)):
+            raise ValueError("dtype debe ser uint32 o uint64")
+        self.num_perm = num_perm
+        self.dtype = np.dtype(dtype)
+        rng = np.random.default_rng(semilla)
+        self.a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def _hash(self, ids: np.ndarray) -> np.ndarray:
+        """Matriz num_perm × len(ids) con h_k(id)."""
+        with np.errstate(over="ignore"):
+            h = self.a[:, None] * ids[None, :] + self.b[:, None]
+            if self.dtype == np.uint32:
+                # Multiplicación-desplazamiento: los 32 bits altos ya están bien repartidos
+                return (h >> np.uint64(32)).astype(np.uint32)
+            return _mezclar(h)
+
+    def firmas(self, conjuntos: list) -> np.ndarray:
+        """
+        Firmas (n × num_perm) de conjuntos de ids enteros.
+        Un conjunto vacío queda con el valor máximo en todas las posiciones.
+        """
+        n = len(conjuntos)
+        tamanos = np.fromiter((len(c) for c in conjuntos), dtype=np.int64, count=n)
+        ids = np.fromiter((i for c in conjuntos for i in c), dtype=np.uint64, count=int(tamanos.sum()))
+        inicio = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(tamanos, out=inicio[1:])
+        F = np.full((n, self.num_perm), np.iinfo(self.dtype).max, dtype=self.dtype)
+        # Se recorren los documentos en trozos de unos TAM_TROZO ids
+        d = 0
+        while d < n:
+            fin = int(np.searchsorted(inicio, inicio[d] + TAM_TROZO, side="right")) - 1
+            fin = min(max(fin, d + 1), n)
+            lleno = np.nonzero(tamanos[d:fin])[0] + d
+            if lleno.size:
+                H = self._hash(ids[inicio[d]:inicio[fin]])
+                F[lleno] = np.minimum.reduceat(H, inicio[lleno] - inicio[d], axis=1).T
+            d = fin
+        return F
+
+
+def jaccard_estimado(fa: np.ndarray, fb: np.ndarray) -> float:
+    """Fracción de posiciones iguales entre dos firmas."""
+    return float(np.count_nonzero(fa == fb)) / fa.size
+
+
+def matriz_estimada(F: np.ndarray, tam_bloque: int = TAM_BLOQUE) -> np.ndarray:
+    """Jaccard estimado de todos los pares (n×n), por bloques de filas."""
+    n, num_perm = F.shape
+    M = np.empty((n, n))
+    for s in range(0, n, tam_bloque):
+        iguales = (F[s:s + tam_bloque, None, :] == F[None, :, :]).sum(axis=2)
+        M[s:s + tam_bloque] = iguales / num_perm
+    # Igual que la versión exacta: un documento vacío tiene similitud 0 con todos
+    vacio = (F == np.iinfo(F.dtype).max).all(axis=1)
+    M[vacio, :] = 0
+    M[:, vacio] = 0
+    return M
+
+
+# -----------------------------------------------------------
+# LSH por bandas
+# -----------------------------------------------------------
+
+def _probabilidad_candidato(s: np.ndarray, bandas: int, filas: int) -> np.ndarray:
+    return 1 - (1 - s ** filas) ** bandas
+
+
+def parametros_lsh(umbral: float, num_perm: int = NUM_PERM, peso_fp: float = 0.5,
+                   peso_fn: float = 0.5) -> tuple[int, int]:
+    """
+    (bandas, filas) con bandas·filas <= num_perm que minimizan
+    peso_fp · falsos positivos + peso_fn · falsos negativos, medidos como el
+    área bajo la curva de probabilidad de candidato por debajo del umbral
+    (positivos) y por encima de él (negativos).
+    """
+    s_bajo = np.linspace(0, umbral, 200)
+    s_alto = np.linspace(umbral, 1, 200)
+    mejor = None
+    for filas in range(1, num_perm + 1):
+        bandas = num_perm // filas
+        fp = _probabilidad_candidato(s_bajo, bandas, filas).mean() * umbral
+        fn = (1 - _probabilidad_candidato(s_alto, bandas, filas)).mean() * (1 - umbral)
+        error = peso_fp * fp + peso_fn * fn
+        if mejor is None or error < mejor[0]:
+            mejor = (error, bandas, filas)
+    return mejor[1], mejor[2]
+
+
+def pares_candidatos(F: np.ndarray, bandas: int, filas: int) -> np.ndarray:
+    """Pares (i, j), i < j, que coinciden en al menos una banda completa (array k×2)."""
+    n = F.shape[0]
+    codigos = []
+    vacio = (F == np.iinfo(F.dtype).max).all(axis=1)
+    for b in range(bandas):
+        banda = np.ascontiguousarray(F[:, b * filas:(b + 1) * filas])
+        # Cada fila de la banda como un único valor de bytes para agrupar
+        claves = banda.view(np.dtype((np.void, banda.dtype.itemsize * filas))).ravel()
+        _, grupo, cuentas = np.unique(claves, return_inverse=True, return_counts=True)
+        grupo = grupo.ravel()
+        repetidos = np.nonzero(cuentas[grupo] > 1)[0]
+        repetidos = repetidos[~vacio[repetidos]]
+        if not repetidos.size:
+            continue
+        orden = repetidos[np.argsort(grupo[repetidos], kind="stable")]
+        cortes = np.nonzero(np.diff(grupo[orden]))[0] + 1
+        for cubeta in np.split(orden, cortes):
+            a, c = np.triu_indices(cubeta.size, k=1)
+            # orden ya viene creciente dentro de cada cubeta: i < j
+            codigos.append(cubeta[a] * n + cubeta[c])
+    if not codigos:
+        return np.zeros((0, 2), dtype=np.int64)
+    codigos = np.unique(np.concatenate(codigos))
+    return np.stack([codigos // n, codigos % n], axis=1)
+
+
+def pares_similares(F: np.ndarray, umbral: float, bandas: int | None = None,
+                    filas: int | None = None) -> sp.coo_matrix:
+    """
+    Pares (i < j) con Jaccard estimado >= umbral, buscando solo entre los
+    candidatos de LSH. Devuelve una matriz COO n×n con las estimaciones.
+    """
+    if bandas is None or filas is None:
+        bandas, filas = parametros_lsh(umbral, F.shape[1])
+    n = F.shape[0]
+    pares = pares_candidatos(F, bandas, filas)
+    i, j = pares[:, 0], pares[:, 1]
+    est = (F[i] == F[j]).mean(axis=1)
+    ok = est >= umbral
+    return sp.coo_matrix((est[ok], (i[ok], j[ok])), shape=(n, n))
+
+
+# -----------------------------------------------------------
+# Firmas de palabras y n-gramas a partir de CacheRasgos
+# -----------------------------------------------------------
+
+def firmas_palabras(textos: list[str], rasgos, minhash: MinHash | None = None) -> np.ndarray:
+    """Firmas de los conjuntos de palabras (Jaccard)."""
+    minhash = minhash or MinHash()
+    return minhash.firmas([rasgos.tokens(t) for t in textos])
+
+
+def firmas_ngramas(textos: list[str], rasgos, n: int = 3, minhash: MinHash | None = None) -> np.ndarray:
+    """Firmas de los conjuntos de n-gramas de caracteres (coincidencia de n-gramas)."""
+    minhash = minhash or MinHash()
+    return minhash.firmas([rasgos.ngramas(t, n) for t in textos])
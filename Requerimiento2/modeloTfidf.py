@@ -0,0 +1,199 @@
+"""
+Modelo TF-IDF ajustado una sola vez sobre todo el corpus y guardado en disco.
+
+Antes cada comparación ajustaba un TfidfVectorizer con solo los dos textos
+comparados: el IDF no significaba nada y el ajuste se repetía en cada clic.
+Aquí se ajusta con todos los abstracts y se guarda en
+Requerimiento2/cache/tfidf/<firma del corpus>/:
+  - modelo.npz : vocabulario (término de cada columna), IDF y hash de cada documento
+  - matriz.npz : matriz dispersa documento-término con filas de norma L2 = 1
+Con las filas normalizadas el coseno es un producto escalar de filas
+dispersas, tanto para un par como para un documento contra todo el corpus.
+Al guardar un corpus nuevo solo se conservan los MODELOS_CONSERVADOS más
+recientes; los de corpus anteriores se borran.
+
+La transformación de textos nuevos reproduce la de TfidfVectorizer por
+defecto (minúsculas, tokens de 2+ caracteres, tf * idf, norma L2), así que
+cargar y consultar el modelo no necesita sklearn.
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from almacenEmbeddings import bloqueo_archivo
+
+RAIZ_TFIDF = Path(__file__).resolve().parent / "cache" / "tfidf"
+
+# Modelos de corpus distintos que se conservan en disco (los más recientes)
+MODELOS_CONSERVADOS = 3
+# Carpetas temporales más antiguas que esto (segundos) son de escritores caídos
+ANTIGUEDAD_TEMPORAL = 3600
+
+# Mismo patrón que TfidfVectorizer (token_pattern por defecto)
+RE_TOKEN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def hash_texto(texto: str) -> str:
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def firma_corpus(hashes: list[str]) -> str:
+    """Identifica el corpus por el conjunto de hashes de sus documentos."""
+    return hashlib.sha1("\n".join(sorted(set(hashes))).encode("utf-8")).hexdigest()[:16]
+
+
+def normalizar_filas(X: sp.csr_matrix) -> sp.csr_matrix:
+    normas = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    return (sp.diags(1 / np.where(normas > 0, normas, 1)) @ X).tocsr()
+
+
+def limpiar(raiz: Path = RAIZ_TFIDF, conservar: str | None = None):
+    """
+    Borra los modelos de corpus anteriores salvo los MODELOS_CONSERVADOS más
+    recientes (`conservar` nunca se borra) y las carpetas temporales huérfanas.
+    Debe llamarse con el bloqueo de raiz tomado.
+    """
+    ahora = time.time()
+    modelos = []
+    for d in Path(raiz).iterdir():
+        if not d.is_dir():
+            continue
+        if "." in d.name:
+            # <firma>.<sufijo>: temporal de otro escritor o de uno que se cayó
+            if ahora - d.stat().st_mtime > ANTIGUEDAD_TEMPORAL:
+                shutil.rmtree(d, ignore_errors=True)
+        elif d.name != conservar:
+            modelos.append(d)
+    modelos.sort(key=lambda d: d.stat().st_mtime, reverse=True)
+    for d in modelos[max(MODELOS_CONSERVADOS - 1, 0):]:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+class ModeloTfidf:
+    """Vocabulario, IDF y matriz TF-IDF normalizada del corpus."""
+
+    def __init__(self, terminos: np.ndarray, idf: np.ndarray, hashes: list[str], X: sp.csr_matrix):
+        self.terminos = terminos
+        self.idf = idf
+        self.vocabulario = {t: i for i, t in enumerate(terminos.tolist())}
+        self.hashes = list(hashes)
+        self.filas = {h: i for i, h in enumerate(self.hashes)}
+        self.X = X
+        self.firma = firma_corpus(self.hashes)
+
+    # ------------------------- Ajuste y persistencia -------------------------
+
+    @classmethod
+    def ajustar(cls, textos: list[str]) -> "ModeloTfidf":
+        """Ajusta el TF-IDF sobre los textos del corpus (única llamada a sklearn)."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(dtype=np.float32)
+        X = vectorizer.fit_transform(textos).tocsr()
+        terminos = vectorizer.get_feature_names_out().astype(str)
+        return cls(terminos, vectorizer.idf_.astype(np.float64), [hash_texto(t) for t in textos], X)
+
+    def guardar(self, raiz: Path = RAIZ_TFIDF) -> Path:
+        """
+        Escribe el modelo en raiz/<firma>/. Cada escritor usa su propia carpeta
+        temporal y el cambio se hace bajo un bloqueo entre procesos; al final se
+        borran los modelos de corpus anteriores (ver limpiar).
+        """
+        raiz = Path(raiz)
+        raiz.mkdir(parents=True, exist_ok=True)
+        carpeta = raiz / self.firma
+        tmp = Path(tempfile.mkdtemp(dir=raiz, prefix=self.firma + "."))
+        try:
+            np.savez(tmp / "modelo.npz", terminos=self.terminos, idf=self.idf,
+                     hashes=np.array(self.hashes))
+            sp.save_npz(tmp / "matriz.npz", self.X)
+            with bloqueo_archivo(raiz / "bloqueo"):
+                # El modelo anterior se aparta con un renombrado para que la
+                # carpeta definitiva no quede nunca a medio escribir
+                viejo = None
+                if carpeta.exists():
+                    viejo = Path(tempfile.mkdtemp(dir=raiz, prefix=self.firma + "."))
+                    os.replace(carpeta, viejo / "modelo")
+                os.replace(tmp, carpeta)
+                if viejo is not None:
+                    shutil.rmtree(viejo, ignore_errors=True)
+                limpiar(raiz, conservar=self.firma)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return carpeta
+
+    @classmethod
+    def cargar(cls, carpeta: Path) -> "ModeloTfidf":
+        datos = np.load(Path(carpeta) / "modelo.npz")
+        X = sp.load_npz(Path(carpeta) / "matriz.npz").tocsr()
+        return cls(datos["terminos"], datos["idf"], datos["hashes"].tolist(), X)
+
+    @classmethod
+    def cargar_o_ajustar(cls, textos: list[str], raiz: Path = RAIZ_TFIDF) -> "ModeloTfidf":
+        """Modelo guardado para este corpus; si no existe, lo ajusta y lo guarda."""
+        carpeta = Path(raiz) / firma_corpus([hash_texto(t) for t in textos])
+        if (carpeta / "matriz.npz").exists():
+            try:
+                return cls.cargar(carpeta)
+            except Exception as e:
+                print(f"[WARN] Modelo TF-IDF ignorado ({e})")
+        modelo = cls.ajustar(textos)
+        modelo.guardar(raiz)
+        return modelo
+
+    # ------------------------- Vectores -------------------------
+
+    def transformar(self, textos: list[str]) -> sp.csr_matrix:
+        """Vectores TF-IDF (norma 1) de textos cualquiera con el IDF del corpus."""
+        indptr = [0]
+        indices = []
+        datos = []
+        for texto in textos:
+            cuentas = Counter(self.vocabulario[t] for t in RE_TOKEN.findall(texto.lower())
+                              if t in self.vocabulario)
+            indices.extend(cuentas.keys())
+            datos.extend(cuentas.values())
+            indptr.append(len(indices))
+        X = sp.csr_matrix((np.asarray(datos, dtype=np.float64), np.asarray(indices, dtype=np.int64),
+                           np.asarray(indptr, dtype=np.int64)), shape=(len(textos), len(self.terminos)))
+        X = X @ sp.diags(self.idf)
+        X.sort_indices()
+        return normalizar_filas(X).astype(np.float32)
+
+    def vectores(self, textos: list[str]) -> sp.csr_matrix:
+        """Filas de `textos`: las del corpus salen de la matriz guardada, el resto se transforma."""
+        pos = [self.filas.get(hash_texto(t)) for t in textos]
+        nuevos = [t for t, p in zip(textos, pos) if p is None]
+        if not nuevos:
+            return self.X[pos]
+        filas = []
+        extra = iter(self.transformar(nuevos))
+        for p in pos:
+            filas.append(self.X[p] if p is not None else next(extra))
+        return sp.vstack(filas, format="csr")
+
+    # ------------------------- Similitudes -------------------------
+
+    def similitud(self, a: str, b: str) -> float:
+        """Coseno entre dos textos: producto escalar de sus filas normalizadas."""
+        V = self.vectores([a, b])
+        return float(V[0].multiply(V[1]).sum())
+
+    def uno_contra_todos(self, texto: str) -> np.ndarray:
+        """Coseno de `texto` contra cada documento del corpus (en el orden del ajuste)."""
+        q = self.vectores([texto])
+        return np.asarray((self.X @ q.T).todense(), dtype=np.float64).ravel()
+
+    def matriz(self, textos: list[str]) -> np.ndarray:
+        """Matriz de cosenos entre `textos` (n×n)."""
+        V = self.vectores(textos)
+        return np.asarray((V @ V.T).todense(), dtype=np.float64)
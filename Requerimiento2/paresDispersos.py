@@ -0,0 +1,154 @@
+"""
+Solo los pares interesantes: similitud >= umbral o los k vecinos de cada fila.
+
+En lugar de una matriz n×n densa por algoritmo, las similitudes se calculan
+por bloques (los calculadores de similitudBloques) y de cada bloque se
+conserva solo lo que pasa el filtro:
+  - umbral: pares i < j con similitud >= umbral, en una matriz COO del
+    triángulo superior (solo se recorren los bloques J >= I),
+  - k: los k más similares de cada fila (sin el propio documento), en una
+    matriz CSR n×n con k valores por fila (no simétrica),
+  - los dos: los k vecinos que además superan el umbral.
+Levenshtein con umbral usa pares_levenshtein, que descarta los pares
+imposibles sin calcular la distancia completa. Jaccard y n-gramas con umbral
+pueden usar el join por prefijos (joinPrefijos, prefijos=True): no recorre
+todos los bloques y conviene con corpus grandes y umbrales altos.
+
+La memoria y el tamaño de los archivos dependen del número de pares
+conservados, no de n². Los archivos son columnares (fila, columna,
+similitud) vía exportacion.exportar_columnas.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+from exportacion import exportar_columnas, leer_pares
+from joinPrefijos import join_jaccard
+from matrizLevenshtein import pares_levenshtein
+from similitudBloques import preparar
+
+# Filas/columnas por bloque (un bloque float32 de 1024×1024 ocupa 4 MB)
+TAM_BLOQUE = 1024
+
+
+def pares_umbral(calculador, umbral: float, tam_bloque: int = TAM_BLOQUE) -> sp.coo_matrix:
+    """Pares (i < j) con similitud >= umbral (COO n×n, triángulo superior)."""
+    n = calculador.n
+    filas, cols, vals = [], [], []
+    for s in range(0, n, tam_bloque):
+        e = min(s + tam_bloque, n)
+        for c in range(s, n, tam_bloque):
+            f = min(c + tam_bloque, n)
+            B = calculador.bloque(slice(s, e), slice(c, f))
+            dentro = B >= umbral
+            if c == s:
+                dentro &= np.triu(np.ones(B.shape, dtype=bool), k=1)
+            i, j = np.nonzero(dentro)
+            filas.append((i + s).astype(np.int32))
+            cols.append((j + c).astype(np.int32))
+            vals.append(B[i, j].astype(np.float32))
+    if not filas:
+        return sp.coo_matrix((n, n), dtype=np.float32)
+    return sp.coo_matrix((np.concatenate(vals), (np.concatenate(filas), np.concatenate(cols))),
+                         shape=(n, n))
+
+
+def pares_top_k(calculador, k: int, umbral: float | None = None,
+                tam_bloque: int = TAM_BLOQUE) -> sp.csr_matrix:
+    """
+    Los k más similares de cada fila (sin el propio documento) como CSR n×n.
+    Con umbral, solo los que además lo alcanzan. Las similitudes 0 no se guardan.
+    """
+    n = calculador.n
+    k = min(k, max(n - 1, 0))
+    filas, cols, vals = [], [], []
+    for s in range(0, n, tam_bloque):
+        e = min(s + tam_bloque, n)
+        mejores_sim = np.full((e - s, k), -np.inf, dtype=np.float32)
+        mejores_idx = np.full((e - s, k), -1, dtype=np.int64)
+        for c in range(0, n, tam_bloque):
+            f = min(c + tam_bloque, n)
+            B = calculador.bloque(slice(s, e), slice(c, f))
+            # El propio documento no cuenta como vecino
+            propios = np.arange(max(s, c), min(e, f))
+            B[propios - s, propios - c] = -np.inf
+            sim = np.concatenate([mejores_sim, B], axis=1)
+            idx = np.concatenate([mejores_idx, np.broadcast_to(np.arange(c, f), B.shape)], axis=1)
+            sel = np.argpartition(-sim, k - 1, axis=1)[:, :k] if k else np.zeros((e - s, 0), dtype=np.int64)
+            mejores_sim = np.take_along_axis(sim, sel, axis=1)
+            mejores_idx = np.take_along_axis(idx, sel, axis=1)
+        validos = (mejores_idx >= 0) & (mejores_sim > 0)
+        if umbral is not None:
+            validos &= mejores_sim >= umbral
+        i, j = np.nonzero(validos)
+        filas.append((i + s).astype(np.int32))
+        cols.append(mejores_idx[i, j].astype(np.int32))
+        vals.append(mejores_sim[i, j])
+    if not filas:
+        return sp.csr_matrix((n, n), dtype=np.float32)
+    return sp.csr_matrix((np.concatenate(vals), (np.concatenate(filas), np.concatenate(cols))),
+                         shape=(n, n))
+
+
+def calcular_pares(medida: str, textos: list[str], umbral: float | None = None,
+                   k: int | None = None, rasgos=None, modelo_tfidf=None,
+                   tam_bloque: int = TAM_BLOQUE, prefijos: bool = False) -> sp.spmatrix:
+    """
+    Pares de una de las 6 medidas (nombres de similitudBloques.MEDIDAS).
+    Sin k: COO del triángulo superior con similitud >= umbral.
+    Con k: CSR con los k vecinos de cada fila (y >= umbral si se indica).
+    rasgos y modelo_tfidf: cachés ya cargadas (ver similitudBloques.preparar).
+    prefijos: Jaccard / N-gramas solo con umbral mediante joinPrefijos.join_jaccard.
+    """
+    if umbral is None and not k:
+        raise ValueError("Hay que indicar un umbral, k o ambos")
+    if medida in ("Levenshtein", "Levenshtein (palabras)") and not k:
+        # La cota de distancia evita calcular por completo los pares que no llegan
+        modo = "palabras" if medida == "Levenshtein (palabras)" else "caracteres"
+        pares = pares_levenshtein(textos, umbral, modo=modo)
+        return sp.coo_matrix(pares, dtype=np.float32)
+    if prefijos and medida in ("Jaccard", "N-gramas") and not k:
+        from cacheRasgos import CacheRasgos
+        rasgos = rasgos or CacheRasgos.cargar()
+        if medida == "Jaccard":
+            conjuntos = [rasgos.tokens(t) for t in textos]
+        else:
+            conjuntos = [rasgos.ngramas(t, 3) for t in textos]
+        rasgos.guardar()
+        return join_jaccard(conjuntos, umbral)
+    calculador = preparar(medida, textos, rasgos, modelo_tfidf)
+    if k:
+        return pares_top_k(calculador, k, umbral, tam_bloque)
+    return pares_umbral(calculador, umbral, tam_bloque)
+
+
+# -----------------------------------------------------------
+# Archivos columnares
+# -----------------------------------------------------------
+
+def columnas_pares(pares: sp.spmatrix, indices: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """
+    Columnas indice_1, indice_2, similitud de los pares guardados.
+    indices: índice en el corpus de cada fila (por defecto, la posición).
+    """
+    pares = pares.tocoo()
+    fila, col = pares.row, pares.col
+    if indices is not None:
+        indices = np.asarray(indices)
+        fila, col = indices[fila], indices[col]
+    return {
+        "indice_1": fila.astype(np.int32),
+        "indice_2": col.astype(np.int32),
+        "similitud": pares.data.astype(np.float32),
+    }
+
+
+def guardar_pares(pares: sp.spmatrix, ruta, indices: np.ndarray | None = None):
+    """Escribe los pares en un archivo columnar (.parquet o .npz). Devuelve la ruta."""
+    return exportar_columnas(columnas_pares(pares, indices), ruta)
+
+
+def cargar_pares(ruta, n: int) -> sp.coo_matrix:
+    """Matriz dispersa n×n a partir de un archivo de guardar_pares (índices < n)."""
+    df = leer_pares(ruta)
+    return sp.coo_matrix((df["similitud"].to_numpy(), (df["indice_1"].to_numpy(), df["indice_2"].to_numpy())),
+                         shape=(n, n))
@@ -0,0 +1,339 @@
+"""
+Servicio local de embeddings compartido por scripts y sesiones de Streamlit.
+
+Cada proceso (similitudTextual, cada worker de Streamlit, los benchmarks)
+cargaba su propia copia de los modelos SentenceTransformer: cientos de MB y
+varios segundos por proceso. Aquí un único proceso mantiene los modelos
+cargados y atiende peticiones HTTP en localhost:
+
+    POST /codificar   cuerpo JSON {"modelo": "...", "textos": [...]}
+                      respuesta: float32 crudos (filas × dim), con las
+                      cabeceras X-Filas y X-Dim
+    GET  /salud       JSON con los modelos cargados y los que se están cargando
+
+Las peticiones que llegan casi a la vez para el mismo modelo se agrupan
+(ESPERA_AGRUPAR segundos o MAX_TEXTOS_LOTE textos) y se codifican en una sola
+llamada por cubetas de longitud (codificacionLotes); los textos repetidos
+dentro del grupo se codifican una vez.
+
+Los clientes usan ClienteEmbeddings o CodificadorConRespaldo(modelo), que se
+pasa como `codificador` a AlmacenEmbeddings. El respaldo decide en cada llamada:
+si el servicio no responde (no arrancó, se cayó o se está reiniciando) carga el
+modelo en este proceso la primera vez que hace falta y vuelve a probar el
+servicio pasados REINTENTO_SERVICIO segundos. El cliente espera la respuesta
+TIEMPO_RESPUESTA segundos (más TIEMPO_POR_TEXTO por texto); solo si /salud no
+da el modelo por cargado espera además TIEMPO_CARGA, porque esa petición
+incluye cargarlo. Así un servicio colgado no bloquea al cliente diez minutos.
+
+Uso:
+    python servicioEmbeddings.py                         # puerto 8765, carga bajo demanda
+    python servicioEmbeddings.py --precargar sbert,distilbert --puerto 9000
+    EMBEDDINGS_URL=http://127.0.0.1:9000 streamlit run app.py
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from codificacionLotes import codificar_por_cubetas
+
+PUERTO = 8765
+URL_SERVICIO = os.environ.get("EMBEDDINGS_URL", f"http://127.0.0.1:{PUERTO}")
+
+# Agrupación de peticiones por modelo
+ESPERA_AGRUPAR = 0.01
+MAX_TEXTOS_LOTE = 1024
+
+# Segundos de espera del cliente
+TIEMPO_CONEXION = 0.5
+TIEMPO_RESPUESTA = 30
+TIEMPO_POR_TEXTO = 0.05
+# Espera adicional cuando la petición incluye cargar el modelo en el servicio
+TIEMPO_CARGA = 600
+
+# Segundos sin volver a probar el servicio después de un fallo de conexión
+REINTENTO_SERVICIO = 30.0
+
+
+# -----------------------------------------------------------
+# Servidor
+# -----------------------------------------------------------
+
+class _Peticion:
+    def __init__(self, textos: list[str]):
+        self.textos = textos
+        self.resultado: np.ndarray | None = None
+        self.error: Exception | None = None
+        self.lista = threading.Event()
+
+
+class CodificadorAgrupado:
+    """Un modelo cargado y un hilo que codifica juntas las peticiones que coinciden en el tiempo."""
+
+    def __init__(self, nombre_modelo: str, espera: float = ESPERA_AGRUPAR,
+                 max_textos: int = MAX_TEXTOS_LOTE):
+        from sentence_transformers import SentenceTransformer
+
+        self.nombre_modelo = nombre_modelo
+        self.modelo = SentenceTransformer(nombre_modelo, device="cpu")
+        self.espera = espera
+        self.max_textos = max_textos
+        self.cola: queue.Queue[_Peticion] = queue.Queue()
+        self.lotes = 0
+        self.peticiones = 0
+        threading.Thread(target=self._bucle, daemon=True).start()
+
+    def codificar(self, textos: list[str]) -> np.ndarray:
+        peticion = _Peticion(textos)
+        self.cola.put(peticion)
+        peticion.lista.wait()
+        if peticion.error is not None:
+            raise peticion.error
+        return peticion.resultado
+
+    def _bucle(self):
+        while True:
+            grupo = [self.cola.get()]
+            n = len(grupo[0].textos)
+            # Se esperan unos milisegundos a que lleguen más peticiones
+            while n < self.max_textos:
+                try:
+                    p = self.cola.get(timeout=self.espera)
+                except queue.Empty:
+                    break
+                grupo.append(p)
+                n += len(p.textos)
+            self._atender(grupo)
+
+    def _atender(self, grupo: list[_Peticion]):
+        unicos: dict[str, int] = {}
+        for p in grupo:
+            for t in p.textos:
+                unicos.setdefault(t, len(unicos))
+        try:
+            emb = codificar_por_cubetas(self.modelo, list(unicos))
+            for p in grupo:
+                p.resultado = emb[[unicos[t] for t in p.textos]] if p.textos else np.zeros((0, 0), np.float32)
+        except Exception as e:
+            for p in grupo:
+                p.error = e
+        self.lotes += 1
+        self.peticiones += len(grupo)
+        for p in grupo:
+            p.lista.set()
+
+
+class ServicioEmbeddings(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, direccion: tuple[str, int], modelos_permitidos: set[str] | None = None):
+        super().__init__(direccion, _Manejador)
+        self.modelos_permitidos = modelos_permitidos
+        self.codificadores: dict[str, CodificadorAgrupado] = {}
+        self._lock = threading.Lock()
+        # Un lock por modelo: la carga no bloquea /salud ni a los demás modelos
+        self._locks_carga: dict[str, threading.Lock] = {}
+
+    def codificador(self, nombre_modelo: str) -> CodificadorAgrupado:
+        with self._lock:
+            if nombre_modelo in self.codificadores:
+                return self.codificadores[nombre_modelo]
+            if self.modelos_permitidos is not None and nombre_modelo not in self.modelos_permitidos:
+                raise ValueError(f"Modelo no permitido: {nombre_modelo}")
+            lock_carga = self._locks_carga.setdefault(nombre_modelo, threading.Lock())
+        with lock_carga:
+            with self._lock:
+                codificador = self.codificadores.get(nombre_modelo)
+            if codificador is None:
+                print(f"Cargando {nombre_modelo}...")
+                try:
+                    codificador = CodificadorAgrupado(nombre_modelo)
+                except Exception:
+                    # Deja de figurar como "cargando"; la próxima petición lo reintenta
+                    with self._lock:
+                        self._locks_carga.pop(nombre_modelo, None)
+                    raise
+                with self._lock:
+                    self.codificadores[nombre_modelo] = codificador
+            return codificador
+
+    def estado(self) -> dict:
+        with self._lock:
+            codificadores = dict(self.codificadores)
+            cargando = [m for m in self._locks_carga if m not in codificadores]
+        return {
+            "modelos": {nombre: {"lotes": c.lotes, "peticiones": c.peticiones}
+                        for nombre, c in codificadores.items()},
+            "cargando": cargando,
+        }
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    server: ServicioEmbeddings
+
+    def _responder_json(self, codigo: int, datos: dict):
+        cuerpo = json.dumps(datos).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        if self.path != "/salud":
+            self._responder_json(404, {"error": "ruta desconocida"})
+            return
+        self._responder_json(200, self.server.estado())
+
+    def do_POST(self):
+        if self.path != "/codificar":
+            self._responder_json(404, {"error": "ruta desconocida"})
+            return
+        try:
+            datos = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            emb = self.server.codificador(datos["modelo"]).codificar(list(datos["textos"]))
+        except (ValueError, KeyError) as e:
+            self._responder_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._responder_json(500, {"error": str(e)})
+            return
+        emb = np.ascontiguousarray(emb, dtype=np.float32)
+        cuerpo = emb.tobytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.send_header("X-Filas", str(emb.shape[0]))
+        self.send_header("X-Dim", str(emb.shape[1] if emb.ndim == 2 else 0))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+# -----------------------------------------------------------
+# Cliente
+# -----------------------------------------------------------
+
+class ClienteEmbeddings:
+    """Cliente HTTP del servicio (solo biblioteca estándar y numpy)."""
+
+    def __init__(self, url: str = URL_SERVICIO):
+        self.url = url.rstrip("/")
+        # Modelos que el servicio ya tiene cargados (visto en /salud o en una respuesta)
+        self._listos: set[str] = set()
+
+    def salud(self) -> dict | None:
+        """Estado del servicio (/salud); None si no responde."""
+        try:
+            with urllib.request.urlopen(self.url + "/salud", timeout=TIEMPO_CONEXION) as r:
+                return json.loads(r.read())
+        except (OSError, urllib.error.URLError, ValueError):
+            return None
+
+    def disponible(self) -> bool:
+        return self.salud() is not None
+
+    def listo(self, nombre_modelo: str) -> bool:
+        """True si el servicio tiene el modelo cargado (la petición no incluirá cargarlo)."""
+        if nombre_modelo not in self._listos:
+            estado = self.salud()
+            if estado is not None and nombre_modelo in estado.get("modelos", {}):
+                self._listos.add(nombre_modelo)
+        return nombre_modelo in self._listos
+
+    def codificar(self, nombre_modelo: str, textos: list[str]) -> np.ndarray:
+        cuerpo = json.dumps({"modelo": nombre_modelo, "textos": list(textos)}).encode("utf-8")
+        peticion = urllib.request.Request(self.url + "/codificar", data=cuerpo,
+                                          headers={"Content-Type": "application/json"})
+        espera = TIEMPO_RESPUESTA + TIEMPO_POR_TEXTO * len(textos)
+        if not self.listo(nombre_modelo):
+            espera += TIEMPO_CARGA
+        try:
+            with urllib.request.urlopen(peticion, timeout=espera) as r:
+                filas, dim = int(r.headers["X-Filas"]), int(r.headers["X-Dim"])
+                emb = np.frombuffer(r.read(), dtype=np.float32).reshape(filas, dim)
+            self._listos.add(nombre_modelo)
+            return emb
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"Servicio de embeddings: {json.loads(e.read()).get('error', e)}") from None
+
+    def codificador(self, nombre_modelo: str):
+        """Función textos -> ndarray para AlmacenEmbeddings(codificador=...)."""
+        return lambda textos: self.codificar(nombre_modelo, textos)
+
+
+def codificador_servicio(nombre_modelo: str, url: str = URL_SERVICIO):
+    """Codificador del servicio si está en marcha; None si no responde."""
+    cliente = ClienteEmbeddings(url)
+    return cliente.codificador(nombre_modelo) if cliente.disponible() else None
+
+
+class CodificadorConRespaldo:
+    """
+    Codificador textos -> ndarray que usa el servicio si responde y, si no,
+    un SentenceTransformer propio (cargado solo cuando hace falta).
+    """
+
+    def __init__(self, nombre_modelo: str, url: str = URL_SERVICIO, modelo=None,
+                 reintento: float = REINTENTO_SERVICIO):
+        self.nombre_modelo = nombre_modelo
+        self.cliente = ClienteEmbeddings(url)
+        self.reintento = reintento
+        self._modelo = modelo
+        self._proximo_intento = 0.0
+        self._lock = threading.Lock()
+
+    def _local(self, textos: list[str]) -> np.ndarray:
+        with self._lock:
+            if self._modelo is None:
+                from sentence_transformers import SentenceTransformer
+                self._modelo = SentenceTransformer(self.nombre_modelo, device="cpu")
+        return codificar_por_cubetas(self._modelo, textos)
+
+    def __call__(self, textos: list[str]) -> np.ndarray:
+        if time.monotonic() >= self._proximo_intento:
+            try:
+                return self.cliente.codificar(self.nombre_modelo, textos)
+            except (urllib.error.URLError, OSError) as e:
+                # Los errores HTTP del servicio llegan como RuntimeError y no entran aquí
+                print(f"[WARN] Servicio de embeddings sin respuesta ({e}); se usa el modelo local.")
+                self._proximo_intento = time.monotonic() + self.reintento
+        return self._local(textos)
+
+
+def main():
+    from almacenEmbeddings import MODELOS_IA
+
+    alias = {"sbert": "Sentence-BERT", "distilbert": "DistilBERT STS"}
+    parser = argparse.ArgumentParser(description="Servicio local de embeddings")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--precargar", default="", help="sbert, distilbert (separados por coma)")
+    parser.add_argument("--cualquier-modelo", action="store_true",
+                        help="Aceptar modelos fuera de MODELOS_IA")
+    args = parser.parse_args()
+
+    permitidos = None if args.cualquier_modelo else set(MODELOS_IA.values())
+    servidor = ServicioEmbeddings((args.host, args.puerto), permitidos)
+    for m in filter(None, (x.strip() for x in args.precargar.split(","))):
+        servidor.codificador(MODELOS_IA[alias[m]])
+    print(f"✅ Servicio de embeddings en http://{args.host}:{args.puerto}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""
+Similitud de todo el corpus por bloques, con memoria acotada.
+
+Una matriz n×n float64 por algoritmo no cabe en memoria para corpus grandes
+(100k abstracts = 80 GB). Aquí el corpus se divide en bloques de filas y
+cada tarea calcula un bloque de similitudes; el resultado va a disco:
+
+  - salida="matriz": matriz n×n en un archivo memmap float16 o float32.
+    Solo se calculan los bloques (I, J) con J >= I; cada bloque se escribe
+    en su sitio y traspuesto en (J, I).
+  - salida="topk": para cada fila, los k vecinos más similares (sin contar
+    el propio documento) en dos memmap n×k: índices int32 y similitudes
+    float32. Cada tarea recorre un bloque de filas contra todas las columnas,
+    bloque a bloque, conservando solo los k mejores.
+
+Las tareas se reparten entre procesos. Cada tarea terminada se anota en
+progreso.txt después de volcar su parte del memmap, así que una ejecución
+interrumpida se retoma llamando de nuevo con la misma carpeta; meta.json
+guarda una firma de los textos (sha1 de sus hashes, en orden), así que si el
+corpus cambió, aunque tenga el mismo número de documentos, no se mezclan
+bloques viejos con nuevos.
+
+El tamaño de bloque se elige a partir de un presupuesto de memoria (MB),
+descontando la copia del calculador (matriz o textos del corpus) que recibe
+cada proceso; al retomar se usa el tamaño de bloque guardado, aunque cambien
+--procesos o --memoria.
+
+Uso por consola:
+    python similitudBloques.py --medida jaccard --salida topk -k 20
+    python similitudBloques.py --medida tfidf --salida matriz --dtype float16 --memoria 1024
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from matrizLevenshtein import secuencias_palabras, similitud_levenshtein
+
+CARPETA_SALIDA = Path(__file__).resolve().parent / "cache" / "bloques"
+
+# Límites del tamaño de bloque
+MIN_BLOQUE = 64
+MAX_BLOQUE = 8192
+
+# Por debajo de este número de documentos no compensa levantar procesos
+MIN_DOCS_PARALELO = 2000
+
+MEDIDAS = ("Jaccard", "Coseno (TF-IDF)", "Levenshtein", "N-gramas", "Sentence-BERT", "DistilBERT STS",
+           "Levenshtein (palabras)")
+
+# Nombres cortos aceptados por consola
+ALIAS_MEDIDAS = {
+    "jaccard": "Jaccard",
+    "tfidf": "Coseno (TF-IDF)",
+    "levenshtein": "Levenshtein",
+    "levenshtein-palabras": "Levenshtein (palabras)",
+    "ngramas": "N-gramas",
+    "sbert": "Sentence-BERT",
+    "distilbert": "DistilBERT STS",
+}
+
+
+# -----------------------------------------------------------
+# Cálculo de un bloque por medida
+# -----------------------------------------------------------
+
+def _nbytes_matriz(X) -> int:
+    if sp.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+class BloquesCoseno:
+    """Coseno entre filas (dispersas o densas) normalizadas a norma 1."""
+
+    def __init__(self, X):
+        if sp.issparse(X):
+            X = sp.csr_matrix(X, dtype=np.float32)
+            normas = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            self.X = sp.diags(1 / np.where(normas > 0, normas, 1)) @ X
+            self.X = self.X.tocsr()
+        else:
+            X = np.asarray(X, dtype=np.float32)
+            normas = np.linalg.norm(X, axis=1, keepdims=True)
+            self.X = X / np.where(normas > 0, normas, 1)
+        self.n = X.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return _nbytes_matriz(self.X)
+
+    def bloque(self, filas: slice, cols: slice) -> np.ndarray:
+        B = self.X[filas] @ self.X[cols].T
+        return np.asarray(B.toarray() if sp.issparse(B) else B, dtype=np.float32)
+
+
+class BloquesJaccard:
+    """Jaccard sobre una matriz binaria documento-término (palabras o n-gramas)."""
+
+    def __init__(self, X: sp.csr_matrix):
+        self.X = sp.csr_matrix(X, dtype=np.float32)
+        self.tamanos = np.asarray(self.X.sum(axis=1), dtype=np.float64).ravel()
+        self.n = self.X.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return _nbytes_matriz(self.X) + self.tamanos.nbytes
+
+    def bloque(self, filas: slice, cols: slice) -> np.ndarray:
+        inter = (self.X[filas] @ self.X[cols].T).toarray().astype(np.float64)
+        union = self.tamanos[filas, None] + self.tamanos[None, cols] - inter
+        return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0).astype(np.float32)
+
+
+class BloquesLevenshtein:
+    """Levenshtein normalizado, par a par dentro del bloque (en caracteres o en palabras)."""
+
+    def __init__(self, textos: list[str], modo: str = "caracteres"):
+        self.textos = secuencias_palabras(textos) if modo == "palabras" else list(textos)
+        self.n = len(self.textos)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(t) for t in self.textos)
+
+    def bloque(self, filas: slice, cols: slice) -> np.ndarray:
+        A = self.textos[filas]
+        B = self.textos[cols]
+        salida = np.empty((len(A), len(B)), dtype=np.float32)
+        for i, a in enumerate(A):
+            for j, b in enumerate(B):
+                salida[i, j] = similitud_levenshtein(a, b)
+        return salida
+
+
+def firma_textos(textos: list[str]) -> str:
+    """sha1 de los hashes de los textos en orden: cambia si cambia o se mueve cualquiera."""
+    h = hashlib.sha1()
+    for t in textos:
+        h.update(hashlib.sha1(t.encode("utf-8")).digest())
+    return h.hexdigest()
+
+
+def preparar(medida: str, textos: list[str], rasgos=None, modelo_tfidf=None):
+    """
+    Objeto con .n y .bloque(filas, cols) para una de las 6 medidas del Requerimiento 2,
+    y .firma (firma_textos) para reconocer el corpus al retomar.
+    modelo_tfidf: ModeloTfidf ya ajustado (por defecto se ajusta sobre `textos`).
+    """
+    calculador = _preparar(medida, textos, rasgos, modelo_tfidf)
+    calculador.firma = firma_textos(textos)
+    return calculador
+
+
+def _preparar(medida: str, textos: list[str], rasgos, modelo_tfidf):
+    if medida in ("Jaccard", "N-gramas"):
+        from cacheRasgos import CacheRasgos
+        from jaccardDisperso import matriz_binaria_ids
+
+        rasgos = rasgos or CacheRasgos.cargar()
+        if medida == "Jaccard":
+            conjuntos = [rasgos.tokens(t) for t in textos]
+        else:
+            conjuntos = [rasgos.ngramas(t, 3) for t in textos]
+        rasgos.guardar()
+        return BloquesJaccard(matriz_binaria_ids(conjuntos))
+    if medida == "Coseno (TF-IDF)":
+        from modeloTfidf import ModeloTfidf
+        modelo_tfidf = modelo_tfidf or ModeloTfidf.cargar_o_ajustar(textos)
+        return BloquesCoseno(modelo_tfidf.vectores(textos))
+    if medida == "Levenshtein":
+        return BloquesLevenshtein(textos)
+    if medida == "Levenshtein (palabras)":
+        return BloquesLevenshtein(textos, modo="palabras")
+    if medida in ("Sentence-BERT", "DistilBERT STS"):
+        from almacenEmbeddings import MODELOS_IA, almacen_compartido
+        return BloquesCoseno(almacen_compartido(MODELOS_IA[medida]).obtener(textos))
+    raise ValueError(f"Medida desconocida: {medida} (opciones: {', '.join(MEDIDAS)})")
+
+
+# -----------------------------------------------------------
+# Tamaño de bloque y archivos de salida
+# -----------------------------------------------------------
+
+def memoria_calculador(calculador) -> int:
+    """Bytes de los datos del calculador (lo que se copia en cada proceso)."""
+    nbytes = getattr(calculador, "nbytes", None)
+    if nbytes is None:
+        nbytes = len(pickle.dumps(calculador, protocol=pickle.HIGHEST_PROTOCOL))
+    return nbytes
+
+
+def copias_calculador(procesos: int) -> int:
+    """El proceso principal tiene el calculador y, con pool, cada trabajador recibe otra copia."""
+    return 1 if procesos <= 1 else procesos + 1
+
+
+def tam_bloque_para(memoria_mb: float, procesos: int, n: int, fijo_bytes: int = 0) -> int:
+    """
+    Filas por bloque para que los procesos no pasen de `memoria_mb` en total.
+    fijo_bytes: tamaño del calculador, que se descuenta una vez por copia.
+    Cada tarea mantiene unas 4 matrices b×b de float64 (producto, unión, resultado).
+    """
+    libre = memoria_mb * 2**20 - fijo_bytes * copias_calculador(procesos)
+    por_proceso = max(libre, 0) / max(procesos, 1)
+    b = int(math.sqrt(por_proceso / (4 * 8)))
+    return max(MIN_BLOQUE, min(b, MAX_BLOQUE, max(n, 1)))
+
+
+def procesos_para(memoria_mb: float, procesos: int, fijo_bytes: int) -> int:
+    """Menos procesos si las copias del calculador y un bloque mínimo por proceso no caben."""
+    minimo = 4 * 8 * MIN_BLOQUE ** 2
+    while procesos > 1 and fijo_bytes * copias_calculador(procesos) + procesos * minimo > memoria_mb * 2**20:
+        procesos -= 1
+    return procesos
+
+
+def _rutas(carpeta: Path) -> dict[str, Path]:
+    return {
+        "meta": carpeta / "meta.json",
+        "progreso": carpeta / "progreso.txt",
+        "matriz": carpeta / "matriz.bin",
+        "indices": carpeta / "vecinos_indices.i32",
+        "similitudes": carpeta / "vecinos_similitudes.f32",
+    }
+
+
+def _abrir_memmaps(carpeta: Path, meta: dict, modo: str) -> dict[str, np.memmap]:
+    rutas = _rutas(carpeta)
+    n = meta["n"]
+    if meta["salida"] == "matriz":
+        return {"matriz": np.memmap(rutas["matriz"], dtype=meta["dtype"], mode=modo, shape=(n, n))}
+    k = meta["k"]
+    return {
+        "indices": np.memmap(rutas["indices"], dtype=np.int32, mode=modo, shape=(n, k)),
+        "similitudes": np.memmap(rutas["similitudes"], dtype=np.float32, mode=modo, shape=(n, k)),
+    }
+
+
+def abrir_matriz(carpeta: Path) -> np.memmap:
+    """Matriz n×n calculada con salida="matriz" (memmap de solo lectura)."""
+    carpeta = Path(carpeta)
+    meta = json.loads(_rutas(carpeta)["meta"].read_text(encoding="utf-8"))
+    return _abrir_memmaps(carpeta, meta, "r")["matriz"]
+
+
+def abrir_vecinos(carpeta: Path) -> tuple[np.memmap, np.memmap]:
+    """(índices, similitudes) n×k calculados con salida="topk", ordenados de mayor a menor."""
+    carpeta = Path(carpeta)
+    meta = json.loads(_rutas(carpeta)["meta"].read_text(encoding="utf-8"))
+    m = _abrir_memmaps(carpeta, meta, "r")
+    return m["indices"], m["similitudes"]
+
+
+def _leer_progreso(ruta: Path) -> set[tuple[int, int]]:
+    if not ruta.exists():
+        return set()
+    hechas = set()
+    for linea in ruta.read_text(encoding="utf-8").splitlines():
+        partes = linea.split(",")
+        if len(partes) == 2:
+            hechas.add((int(partes[0]), int(partes[1])))
+    return hechas
+
+
+# -----------------------------------------------------------
+# Tareas (se ejecutan en los procesos trabajadores)
+# -----------------------------------------------------------
+
+# Estado del proceso trabajador (se fija una vez, en el inicializador)
+_calculador = None
+_meta: dict = {}
+_memmaps: dict = {}
+
+
+def _iniciar(calculador, carpeta: str, meta: dict):
+    global _calculador, _meta, _memmaps
+    _calculador = calculador
+    _meta = meta
+    _memmaps = _abrir_memmaps(Path(carpeta), meta, "r+")
+
+
+def _tarea_matriz(tarea: tuple[int, int]) -> tuple[int, int]:
+    """Bloque (I, J), J >= I: se escribe en (I, J) y traspuesto en (J, I)."""
+    bi, bj = tarea
+    b, n = _meta["tam_bloque"], _meta["n"]
+    filas = slice(bi * b, min((bi + 1) * b, n))
+    cols = slice(bj * b, min((bj + 1) * b, n))
+    B = _calculador.bloque(filas, cols)
+    M = _memmaps["matriz"]
+    M[filas, cols] = B
+    if bi != bj:
+        M[cols, filas] = B.T
+    M.flush()
+    return tarea
+
+
+def _tarea_topk(tarea: tuple[int, int]) -> tuple[int, int]:
+    """Filas del bloque I contra todas las columnas, guardando los k mejores de cada fila."""
+    bi, _ = tarea
+    b, n, k = _meta["tam_bloque"], _meta["n"], _meta["k"]
+    if k == 0:
+        return tarea
+    inicio, fin = bi * b, min((bi + 1) * b, n)
+    filas = slice(inicio, fin)
+    filas_idx = np.arange(inicio, fin)
+    mejores_sim = np.full((fin - inicio, 0), -np.inf, dtype=np.float32)
+    mejores_idx = np.zeros((fin - inicio, 0), dtype=np.int64)
+    for c0 in range(0, n, b):
+        c1 = min(c0 + b, n)
+        B = _calculador.bloque(filas, slice(c0, c1))
+        # El propio documento no cuenta como vecino
+        diag = (filas_idx >= c0) & (filas_idx < c1)
+        B[np.nonzero(diag)[0], filas_idx[diag] - c0] = -np.inf
+        sim = np.concatenate([mejores_sim, B], axis=1)
+        idx = np.concatenate([mejores_idx, np.broadcast_to(np.arange(c0, c1), B.shape)], axis=1)
+        if sim.shape[1] > k:
+            sel = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+            sim = np.take_along_axis(sim, sel, axis=1)
+            idx = np.take_along_axis(idx, sel, axis=1)
+        mejores_sim, mejores_idx = sim, idx
+    orden = np.argsort(-mejores_sim, axis=1, kind="stable")
+    mejores_sim = np.take_along_axis(mejores_sim, orden, axis=1)
+    mejores_idx = np.take_along_axis(mejores_idx, orden, axis=1)
+    # Con menos de k vecinos posibles, el resto queda como índice -1 y similitud 0
+    vacio = ~np.isfinite(mejores_sim)
+    mejores_idx[vacio] = -1
+    mejores_sim[vacio] = 0
+    anchura = mejores_sim.shape[1]
+    _memmaps["indices"][filas, :anchura] = mejores_idx
+    _memmaps["similitudes"][filas, :anchura] = mejores_sim
+    _memmaps["indices"][filas, anchura:] = -1
+    _memmaps["similitudes"][filas, anchura:] = 0
+    _memmaps["indices"].flush()
+    _memmaps["similitudes"].flush()
+    return tarea
+
+
+# -----------------------------------------------------------
+# Ejecución
+# -----------------------------------------------------------
+
+def calcular_por_bloques(calculador, carpeta: Path = CARPETA_SALIDA, salida: str = "topk",
+                         k: int = 10, dtype: str = "float16", memoria_mb: float = 512,
+                         tam_bloque: int | None = None, procesos: int | None = None,
+                         medida: str = "") -> Path:
+    """
+    Calcula las similitudes de todo el corpus y las escribe en `carpeta`.
+    calculador: objeto de preparar() (o cualquiera con .n y .bloque(filas, cols);
+    sin .firma no se puede comprobar que los textos sean los mismos al retomar).
+    Si la carpeta ya tiene una ejecución con los mismos parámetros y textos,
+    solo se calculan las tareas que faltan (con el tam_bloque de esa ejecución).
+    """
+    if salida not in ("matriz", "topk"):
+        raise ValueError(f"Salida desconocida: {salida} (opciones: matriz, topk)")
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    rutas = _rutas(carpeta)
+    n = calculador.n
+    procesos = procesos or os.cpu_count() or 1
+    if n < MIN_DOCS_PARALELO:
+        procesos = 1
+    fijo = memoria_calculador(calculador)
+    procesos_memoria = procesos_para(memoria_mb, procesos, fijo)
+    if procesos_memoria < procesos:
+        print(f"[INFO] {procesos_memoria} procesos en vez de {procesos}: cada uno copia "
+              f"{fijo / 2**20:.0f} MB de datos y el presupuesto es {memoria_mb:.0f} MB")
+        procesos = procesos_memoria
+
+    meta = {"medida": medida, "n": n, "firma": getattr(calculador, "firma", None), "salida": salida,
+            "dtype": np.dtype(dtype).name if salida == "matriz" else "float32",
+            "k": min(k, max(n - 1, 0)) if salida == "topk" else None}
+    if rutas["meta"].exists():
+        anterior = json.loads(rutas["meta"].read_text(encoding="utf-8"))
+        # El tamaño de bloque depende de --procesos y --memoria: al retomar se usa el guardado
+        guardado = anterior.pop("tam_bloque", None)
+        if anterior.get("firma") != meta["firma"] and {**anterior, "firma": None} == {**meta, "firma": None}:
+            raise ValueError(f"{carpeta} se calculó con otros textos (mismo n = {n}); use otra carpeta o bórrela")
+        if anterior != meta or guardado is None:
+            raise ValueError(f"{carpeta} tiene otra ejecución ({anterior}); use otra carpeta o bórrela")
+        meta["tam_bloque"] = guardado
+    else:
+        meta["tam_bloque"] = tam_bloque or tam_bloque_para(memoria_mb, procesos, n, fijo)
+        # Archivos de salida del tamaño final (dispersos en disco hasta que se escriben)
+        memmaps = _abrir_memmaps(carpeta, meta, "w+")
+        del memmaps
+        rutas["progreso"].unlink(missing_ok=True)
+        rutas["meta"].write_text(json.dumps(meta), encoding="utf-8")
+
+    tam_bloque = meta["tam_bloque"]
+    n_bloques = math.ceil(n / tam_bloque) if n else 0
+    if salida == "matriz":
+        tareas = [(i, j) for i in range(n_bloques) for j in range(i, n_bloques)]
+        funcion = _tarea_matriz
+    else:
+        tareas = [(i, 0) for i in range(n_bloques)]
+        funcion = _tarea_topk
+    hechas = _leer_progreso(rutas["progreso"])
+    pendientes = [t for t in tareas if t not in hechas]
+
+    with open(rutas["progreso"], "a", encoding="utf-8") as progreso:
+        def anotar(tarea):
+            progreso.write(f"{tarea[0]},{tarea[1]}\n")
+            progreso.flush()
+
+        if procesos == 1 or len(pendientes) < 2:
+            _iniciar(calculador, str(carpeta), meta)
+            for tarea in pendientes:
+                anotar(funcion(tarea))
+        else:
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar,
+                                     initargs=(calculador, str(carpeta), meta)) as pool:
+                for futuro in as_completed([pool.submit(funcion, t) for t in pendientes]):
+                    anotar(futuro.result())
+    return carpeta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Similitud de todo el corpus por bloques")
+    parser.add_argument("--medida", default="jaccard", choices=sorted(ALIAS_MEDIDAS))
+    parser.add_argument("--salida", default="topk", choices=["topk", "matriz"])
+    parser.add_argument("-k", type=int, default=10, help="Vecinos por fila (salida topk)")
+    parser.add_argument("--dtype", default="float16", choices=["float16", "float32"],
+                        help="Tipo de la matriz (salida matriz)")
+    parser.add_argument("--memoria", type=float, default=512, help="Presupuesto de memoria en MB")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--carpeta", type=Path, default=None)
+    args = parser.parse_args()
+
+    from busquedaSimilares import cargar_corpus
+
+    df = cargar_corpus()
+    if df.empty:
+        print("⚠️ No se encontraron abstracts en el corpus.")
+        sys.exit(1)
+    medida = ALIAS_MEDIDAS[args.medida]
+    carpeta = args.carpeta or CARPETA_SALIDA / f"{args.medida}_{args.salida}"
+
+    t0 = time.perf_counter()
+    calculador = preparar(medida, df["abstract"].tolist())
+    t1 = time.perf_counter()
+    calcular_por_bloques(calculador, carpeta, args.salida, args.k, args.dtype,
+                         args.memoria, procesos=args.procesos, medida=medida)
+    t2 = time.perf_counter()
+    print(f"{len(df)} artículos | {medida} | preparación {t1 - t0:.2f} s | bloques {t2 - t1:.2f} s")
+    print(f"✅ Resultados en: {carpeta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,109 @@
-import re
+"""
+Requerimiento 2: similitud textual entre abstracts con 6 algoritmos.
+
+Las dependencias pesadas (sentence_transformers, sklearn, reportlab) y los
+modelos de IA se cargan solo cuando se pide un algoritmo que los necesita.
+
+Uso:
+    python similitudTextual.py                       # los 6 algoritmos
+    python similitudTextual.py --algoritmos clasicos # Jaccard, TF-IDF, Levenshtein, N-gramas
+    python similitudTextual.py --algoritmos jaccard,sbert
+    python similitudTextual.py --algoritmos levenshtein-palabras   # edición en palabras
+    python similitudTextual.py --lote grupos.txt --formato json   # sin preguntas
+    python similitudTextual.py --lote all --algoritmos clasicos
+    python similitudTextual.py --lote all --formato dispersa --umbral "0.5,levenshtein=0.3" --top-k 10
+"""
+import argparse
+import json
+import sys
+import threading
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
-from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import Levenshtein
-from sentence_transformers import SentenceTransformer
-import bibtexparser
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
 
-# -----------------------------------------------------------
-# 1️⃣ Lectura de abstracts desde el archivo BibTeX unificado
-# -----------------------------------------------------------
+from almacenEmbeddings import MODELOS_IA, AlmacenEmbeddings, almacen_compartido
+from cacheRasgos import CacheRasgos, jaccard_conjuntos
+from ejecucionConcurrente import PROCESOS_CPU, ejecutar_concurrente, limitar_hilos_torch, repartir_cpu
+from exportacion import N_TOP, exportar_columnas, exportar_pares, exportar_pdf, exportar_top_csv
+from jaccardDisperso import matriz_jaccard_conjuntos
+from matrizLevenshtein import matriz_levenshtein
+from modeloTfidf import ModeloTfidf
+from paresDispersos import calcular_pares, columnas_pares
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 BIB_PATH = BASE_DIR / "Requerimiento1" / "ArchivosFiltrados" / "articulosOptimos.bib"
 
-with open(BIB_PATH, encoding="utf-8") as bibfile:
-    bib_database = bibtexparser.load(bibfile)
+sys.path.insert(0, str(BASE_DIR / "Requerimiento1"))
+from lecturabib import leer_bib  # noqa: E402
 
-# Extraemos títulos y abstracts
-data = []
-for entry in bib_database.entries:
-    title = entry.get("title", "Sin título").replace("\n", " ").strip()
-    abstract = entry.get("abstract", "").replace("\n", " ").strip()
-    if abstract:
-        data.append({"titulo": title, "abstract": abstract})
-
-df = pd.DataFrame(data)
-if df.empty:
-    print("⚠️ No se encontraron abstracts en el archivo BibTeX.")
-    exit()
+# -----------------------------------------------------------
+# 1️⃣ Lectura de abstracts desde el archivo BibTeX unificado
+# -----------------------------------------------------------
 
-print(f"\nSe cargaron {len(df)} artículos con abstracts.\n")
+def cargar_articulos(bib_path: Path = BIB_PATH) -> pd.DataFrame:
+    """
+    Títulos y abstracts de las entradas que tienen abstract. lecturabib da las
+    mismas entradas y valores que bibtexparser (tests/test_lecturabib.py), así
+    que los índices de los artículos no cambian, y tarda décimas en vez de ~10 s.
+    """
+    data = []
+    for entry in leer_bib(bib_path):
+        title = entry.get("title", "Sin título").replace("\n", " ").strip()
+        abstract = entry.get("abstract", "").replace("\n", " ").strip()
+        if abstract:
+            data.append({"titulo": title, "abstract": abstract})
+    return pd.DataFrame(data)
 
 # -----------------------------------------------------------
 # 2️⃣ Funciones de similitud clásicas
 # -----------------------------------------------------------
 
+# Conjuntos de palabras y n-gramas por abstract (se calculan una vez y se
+# reutilizan entre pares y entre ejecuciones). El pickle solo se lee la
+# primera vez que Jaccard o N-gramas lo necesitan, no al importar el módulo.
+_rasgos: CacheRasgos | None = None
+# Jaccard y N-gramas corren a la vez en hilos: una sola carga para los dos
+_lock_rasgos = threading.Lock()
+
+def cache_rasgos() -> CacheRasgos:
+    global _rasgos
+    if _rasgos is None:
+        with _lock_rasgos:
+            if _rasgos is None:
+                _rasgos = CacheRasgos.cargar()
+    return _rasgos
+
+def guardar_rasgos():
+    """Guarda la caché de rasgos si se llegó a cargar."""
+    if _rasgos is not None:
+        _rasgos.guardar()
+
 def jaccard_similarity(a: str, b: str) -> float:
     """
     Jaccard(A,B) = |A ∩ B| / |A ∪ B|
     Mide el solapamiento de conjuntos de palabras.
     """
-    A = set(re.findall(r'\w+', a.lower()))
-    B = set(re.findall(r'\w+', b.lower()))
-    return len(A & B) / len(A | B) if (A | B) else 0.0
+    rasgos = cache_rasgos()
+    return jaccard_conjuntos(rasgos.tokens(a), rasgos.tokens(b))
+
+
+_modelo_tfidf: ModeloTfidf | None = None
 
+def modelo_tfidf() -> ModeloTfidf:
+    """TF-IDF ajustado sobre todos los abstracts del corpus (se guarda en disco)."""
+    global _modelo_tfidf
+    if _modelo_tfidf is None:
+        _modelo_tfidf = ModeloTfidf.cargar_o_ajustar(cargar_articulos()["abstract"].tolist())
+    return _modelo_tfidf
 
 def cosine_tfidf_similarity(a: str, b: str) -> float:
     """
-    Similaridad del coseno entre vectores TF-IDF.
+    Similaridad del coseno entre vectores TF-IDF (IDF del corpus completo).
     cos(θ) = (A·B) / (||A|| * ||B||)
     """
-    vectorizer = TfidfVectorizer().fit([a, b])
-    tfidf = vectorizer.transform([a, b])
-    return float(cosine_similarity(tfidf[0], tfidf[1]))
+    return modelo_tfidf().similitud(a, b)
 
 
 def levenshtein_similarity(a: str, b: str) -> float:
@@ -75,193 +120,423 @@ def ngram_overlap_similarity(a: str, b: str, n=3) -> float:
     Coincidencia de n-gramas:
     sim = |Ngram(A) ∩ Ngram(B)| / |Ngram(A) ∪ Ngram(B)|
     """
-    def ngrams(text, n):
-        text = re.sub(r'\s+', ' ', text.lower())
-        return {text[i:i+n] for i in range(len(text) - n + 1)}
-    A, B = ngrams(a, n), ngrams(b, n)
-    return len(A & B) / len(A | B) if (A | B) else 0.0
+    rasgos = cache_rasgos()
+    return jaccard_conjuntos(rasgos.ngramas(a, n), rasgos.ngramas(b, n))
 
 # -----------------------------------------------------------
-# 3️⃣ Modelos IA
+# 3️⃣ Modelos IA (se cargan la primera vez que hacen falta)
 # -----------------------------------------------------------
 
-print("Cargando modelos de IA (esto puede tardar unos segundos)...")
-model_sbert = SentenceTransformer('all-MiniLM-L6-v2')
-model_distilbert = SentenceTransformer('distilbert-base-nli-stsb-mean-tokens')
+# Embeddings persistidos en disco: cada abstract se codifica una sola vez por
+# modelo. El modelo solo se carga si hay abstracts sin embedding guardado, y
+# si el servicio de embeddings está en marcha se usa su copia compartida.
+_almacenes: dict[str, AlmacenEmbeddings] = {}
+
+def almacen_embeddings(algoritmo: str) -> AlmacenEmbeddings:
+    if algoritmo not in _almacenes:
+        _almacenes[algoritmo] = almacen_compartido(MODELOS_IA[algoritmo])
+    return _almacenes[algoritmo]
 
 def embedding_similarity(model, a: str, b: str) -> float:
     """
     Similaridad del coseno entre embeddings semánticos generados por un modelo de lenguaje.
     """
     embeddings = model.encode([a, b])
-    sim = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-    return float(sim)
+    return float(matriz_coseno(np.asarray(embeddings))[0, 1])
 
 # -----------------------------------------------------------
-# 4️⃣ Selección de artículos y comparación múltiple
+# 4️⃣ Matrices por algoritmo
 # -----------------------------------------------------------
 
-print("Lista de artículos disponibles:\n")
-for i, row in df.iterrows():
-    print(f"[{i}] {row['titulo'][:100]}{'...' if len(row['titulo'])>100 else ''}")
-
-indices_input = input(
-    "\nIngrese los índices de los artículos a comparar (separados por coma, ej: 0,2,5): "
-)
-try:
-    indices = [int(x.strip()) for x in indices_input.split(",") if x.strip().isdigit()]
-except ValueError:
-    print("❌ Entrada inválida.")
-    exit()
-
-if len(indices) < 2:
-    print("⚠️ Debe seleccionar al menos dos artículos.")
-    exit()
-
-for i in indices:
-    if i not in df.index:
-        print(f"❌ Índice fuera de rango: {i}")
-        exit()
+def matriz_coseno(vectores: np.ndarray) -> np.ndarray:
+    """Coseno entre todas las filas (equivalente a sklearn cosine_similarity)."""
+    normas = np.linalg.norm(vectores, axis=1, keepdims=True)
+    unit = vectores / np.where(normas > 0, normas, 1)
+    return unit @ unit.T
+
+def _matriz_jaccard(abstracts):
+    # Matriz binaria dispersa sobre los ids cacheados, solo triángulo superior
+    return matriz_jaccard_conjuntos([cache_rasgos().tokens(a) for a in abstracts])
+
+def _matriz_tfidf(abstracts):
+    # Filas normalizadas del modelo del corpus: coseno = producto escalar
+    return modelo_tfidf().matriz(abstracts)
+
+def _matriz_ngramas(abstracts):
+    # Misma fórmula de Jaccard sobre los trigramas cacheados
+    return matriz_jaccard_conjuntos([cache_rasgos().ngramas(a, 3) for a in abstracts])
+
+def _matriz_embeddings(algoritmo):
+    def calcular(abstracts):
+        return matriz_coseno(almacen_embeddings(algoritmo).obtener(abstracts))
+    return calcular
+
+ALGORITMOS = {
+    "Jaccard": _matriz_jaccard,
+    "Coseno (TF-IDF)": _matriz_tfidf,
+    "Levenshtein": matriz_levenshtein,  # solo pares i<j, en paralelo para selecciones grandes
+    "N-gramas": _matriz_ngramas,
+    "Sentence-BERT": _matriz_embeddings("Sentence-BERT"),
+    "DistilBERT STS": _matriz_embeddings("DistilBERT STS"),
+    # Opcional (no entra en "todos"): edición en palabras, secuencias ~6 veces más cortas
+    "Levenshtein (palabras)": lambda abstracts: matriz_levenshtein(abstracts, modo="palabras"),
+}
+
+# Los 6 algoritmos del Requerimiento 2
+SEIS_ALGORITMOS = ["Jaccard", "Coseno (TF-IDF)", "Levenshtein", "N-gramas", "Sentence-BERT", "DistilBERT STS"]
+
+# Nombres cortos aceptados por --algoritmos
+ALIAS = {
+    "jaccard": ["Jaccard"],
+    "tfidf": ["Coseno (TF-IDF)"],
+    "coseno": ["Coseno (TF-IDF)"],
+    "levenshtein": ["Levenshtein"],
+    "levenshtein-palabras": ["Levenshtein (palabras)"],
+    "ngramas": ["N-gramas"],
+    "sbert": ["Sentence-BERT"],
+    "distilbert": ["DistilBERT STS"],
+    "clasicos": ["Jaccard", "Coseno (TF-IDF)", "Levenshtein", "N-gramas"],
+    "ia": ["Sentence-BERT", "DistilBERT STS"],
+    "todos": SEIS_ALGORITMOS,
+}
+
+def elegir_algoritmos(texto: str) -> list[str]:
+    """Convierte 'jaccard,sbert' (o 'clasicos', 'ia', 'todos') en nombres de ALGORITMOS."""
+    elegidos = []
+    for parte in texto.split(","):
+        parte = parte.strip().lower()
+        if not parte:
+            continue
+        if parte not in ALIAS:
+            raise ValueError(f"Algoritmo desconocido: {parte} (opciones: {', '.join(ALIAS)})")
+        for nombre in ALIAS[parte]:
+            if nombre not in elegidos:
+                elegidos.append(nombre)
+    # Mismo orden que ALGORITMOS
+    return [n for n in ALGORITMOS if n in elegidos]
+
+def _tarea(nombre: str, abstracts: list[str], cpus: int):
+    """Función sin argumentos que calcula la matriz de `nombre` con `cpus` CPU."""
+    if nombre == "Levenshtein":
+        return lambda: matriz_levenshtein(abstracts, procesos=cpus)
+    if nombre == "Levenshtein (palabras)":
+        return lambda: matriz_levenshtein(abstracts, procesos=cpus, modo="palabras")
+    if nombre in MODELOS_IA:
+        def calcular():
+            limitar_hilos_torch(cpus)
+            return ALGORITMOS[nombre](abstracts)
+        return calcular
+    return lambda: ALGORITMOS[nombre](abstracts)
+
+def calcular_matrices_concurrente(abstracts: list[str], algoritmos: list[str],
+                                  cpus: int | None = None):
+    """
+    Calcula los algoritmos a la vez y genera (nombre, matriz, segundos, error)
+    a medida que cada uno termina (ver ejecucionConcurrente).
+    """
+    reparto = repartir_cpu(algoritmos, cpus)
+    # Levenshtein primero: es el más lento y su pool (forkserver) arranca cuanto antes
+    orden = sorted(algoritmos, key=lambda a: a not in PROCESOS_CPU)
+    try:
+        yield from ejecutar_concurrente({a: _tarea(a, abstracts, reparto[a]) for a in orden})
+    finally:
+        guardar_rasgos()
+
+def calcular_matrices(abstracts: list[str], algoritmos: list[str],
+                      concurrente: bool = True) -> dict[str, np.ndarray]:
+    """Matrices de todos los algoritmos, en el orden de `algoritmos`."""
+    if not concurrente:
+        matrices = {nombre: ALGORITMOS[nombre](abstracts) for nombre in algoritmos}
+        guardar_rasgos()
+        return matrices
+    matrices = {}
+    for nombre, matriz, _, error in calcular_matrices_concurrente(abstracts, algoritmos):
+        if error is not None:
+            raise error
+        matrices[nombre] = matriz
+    return {nombre: matrices[nombre] for nombre in algoritmos}
 
 # -----------------------------------------------------------
-# 5️⃣ Cálculo de matriz de similitud para cada algoritmo
+# 5️⃣ Exportación (mapas de calor, top-N y pares comprimidos: ver exportacion.py)
 # -----------------------------------------------------------
 
-print("\nCalculando similitudes... Esto puede tardar un poco.\n")
-
-# Preparamos los abstracts seleccionados
-abstracts = [df.loc[i, "abstract"] for i in indices]
-titulos = [df.loc[i, "titulo"][:50] + ("..." if len(df.loc[i, 'titulo']) > 50 else "") for i in indices]
-
-# Diccionario para almacenar resultados por algoritmo
-matrices = {}
-
-# 1. Jaccard
-jac = np.zeros((len(abstracts), len(abstracts)))
-for i in range(len(abstracts)):
-    for j in range(len(abstracts)):
-        jac[i, j] = jaccard_similarity(abstracts[i], abstracts[j])
-matrices["Jaccard"] = jac
-
-# 2. Coseno TF-IDF
-tfidf = TfidfVectorizer().fit_transform(abstracts)
-matrices["Coseno (TF-IDF)"] = cosine_similarity(tfidf)
-
-# 3. Levenshtein
-lev = np.zeros((len(abstracts), len(abstracts)))
-for i in range(len(abstracts)):
-    for j in range(len(abstracts)):
-        lev[i, j] = levenshtein_similarity(abstracts[i], abstracts[j])
-matrices["Levenshtein"] = lev
-
-# 4. N-Gramas
-ng = np.zeros((len(abstracts), len(abstracts)))
-for i in range(len(abstracts)):
-    for j in range(len(abstracts)):
-        ng[i, j] = ngram_overlap_similarity(abstracts[i], abstracts[j])
-matrices["N-gramas"] = ng
-
-# 5. Sentence-BERT
-emb1 = model_sbert.encode(abstracts)
-matrices["Sentence-BERT"] = cosine_similarity(emb1)
-
-# 6. DistilBERT
-emb2 = model_distilbert.encode(abstracts)
-matrices["DistilBERT STS"] = cosine_similarity(emb2)
+def exportar_resultados(matrices: dict, titulos: list[str], indices: list[int],
+                        out_dir: Path, archivo_pdf: Path = Path("Resultados_Similitud.pdf")):
+    """PDF con mapa de calor y top-N por algoritmo; la lista completa de pares, aparte y comprimida."""
+    ruta_pares = exportar_pares(matrices, indices, out_dir / "pares")
+    print(f"\n✅ Todos los pares guardados en: {ruta_pares}")
+    try:
+        exportar_pdf(matrices, titulos, archivo_pdf)
+        print(f"✅ Resultados exportados correctamente a {archivo_pdf}\n")
+    except ImportError as e:
+        print(f"⚠️ No se generó el PDF ({e.name} no está instalado)\n")
 
 # -----------------------------------------------------------
-# 6️⃣ Mostrar resultados
+# 6️⃣ Ejecución por lotes (sin preguntas)
 # -----------------------------------------------------------
 
-for nombre, matriz in matrices.items():
-    print("\n==============================================")
-    print(f"   MATRIZ DE SIMILITUD - {nombre}")
-    print("==============================================")
-    dfmat = pd.DataFrame(matriz, index=titulos, columns=titulos)
-    print(dfmat.round(3))
-    print()
+# Pares por tramo al escribir el CSV del lote
+TAM_TRAMO_CSV = 200_000
+
+def validar_grupos(grupos: list[list[int]]):
+    """ValueError si no hay grupos o si alguno tiene menos de dos artículos."""
+    if not grupos:
+        raise ValueError("No hay grupos que comparar")
+    cortos = [g for g, grupo in enumerate(grupos) if len(grupo) < 2]
+    if cortos:
+        raise ValueError(f"Grupos con menos de dos artículos (posición en la lista): {cortos}")
 
-def exportar_resultados_pdf(resultados_dict, archivo_salida="Resultados_Similitud.pdf"):
+def leer_grupos(ruta: str, n_articulos: int) -> list[list[int]]:
     """
-    resultados_dict: diccionario con nombre del método como clave
-                     y DataFrame pandas con columnas ['Articulo_1', 'Articulo_2', 'Similitud']
+    Grupos de índices a comparar: un grupo por línea, índices separados por coma
+    (ej: 0,2,5). Las líneas vacías y las que empiezan por # se ignoran; una
+    línea sin índices (ej: ",") o un archivo sin grupos es un ValueError.
+    ruta="all" es un único grupo con todos los artículos.
     """
-    doc = SimpleDocTemplate(archivo_salida, pagesize=letter)
-    elementos = []
-    estilos = getSampleStyleSheet()
-    estilo_titulo = estilos['Heading1']
-    estilo_texto = estilos['BodyText']
-
-    for metodo, df in resultados_dict.items():
-        elementos.append(Paragraph(f"Resultados - {metodo}", estilo_titulo))
-        elementos.append(Spacer(1, 12))
-
-        # Tomar los primeros 20 resultados más altos
-        df_sorted = df.sort_values(by='Similitud', ascending=False).head(20)
-        datos = [df_sorted.columns.to_list()] + df_sorted.values.tolist()
-
-        # Crear tabla
-        tabla = Table(datos, repeatRows=1)
-        tabla.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elementos.append(tabla)
-        elementos.append(Spacer(1, 24))
-
-    doc.build(elementos)
-    print(f"\n✅ Resultados exportados correctamente a {archivo_salida}\n")
-
-# Opcional: guardar resultados en CSV
-guardar = input("¿Desea guardar los resultados en CSV? (s/n): ").lower()
-if guardar == "s":
-    out_dir = BASE_DIR / "Requerimiento2" / "ResultadosSimilitud"
-    out_dir.mkdir(exist_ok=True, parents=True)
-    for nombre, matriz in matrices.items():
-        dfmat = pd.DataFrame(matriz, index=titulos, columns=titulos)
-        dfmat.to_csv(out_dir / f"{nombre.replace(' ', '_')}.csv", encoding="utf-8")
-    print(f"\n✅ Resultados guardados en: {out_dir}\n")
-else:
-    print("\nAnálisis finalizado.\n")
+    if ruta == "all":
+        grupos = [list(range(n_articulos))]
+        validar_grupos(grupos)
+        return grupos
+    grupos = []
+    with open(ruta, encoding="utf-8") as f:
+        for num, linea in enumerate(f, 1):
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            try:
+                grupo = [int(x) for x in linea.split(",") if x.strip()]
+            except ValueError:
+                raise ValueError(f"Línea {num}: índices no numéricos ({linea})")
+            if not grupo:
+                raise ValueError(f"Línea {num}: grupo vacío ({linea})")
+            fuera = [i for i in grupo if not 0 <= i < n_articulos]
+            if fuera:
+                raise ValueError(f"Línea {num}: índices fuera de rango {fuera}")
+            if len(grupo) < 2:
+                raise ValueError(f"Línea {num}: se necesitan al menos dos artículos")
+            grupos.append(grupo)
+    if not grupos:
+        raise ValueError(f"{ruta} no tiene ningún grupo")
+    return grupos
+
+def ejecutar_lote(df: pd.DataFrame, grupos: list[list[int]], algoritmos: list[str],
+                  ruta_salida: Path, formato: str = "csv") -> Path:
+    """
+    Calcula los algoritmos una sola vez sobre la unión de los artículos de todos
+    los grupos y escribe los resultados de cada grupo a medida que se generan.
+    formato="csv": una fila por par (i<j) con una columna por algoritmo.
+    formato="json": JSON Lines, un objeto por grupo con sus matrices.
+    """
+    validar_grupos(grupos)
+    union = sorted({i for grupo in grupos for i in grupo})
+    posicion = {idx: k for k, idx in enumerate(union)}
+    matrices = calcular_matrices([df.loc[i, "abstract"] for i in union], algoritmos)
+
+    ruta_salida = Path(ruta_salida)
+    ruta_salida.parent.mkdir(parents=True, exist_ok=True)
+    titulos = df["titulo"].to_numpy()
+    with open(ruta_salida, "w", encoding="utf-8", newline="") as f:
+        for g, grupo in enumerate(grupos):
+            sel = [posicion[i] for i in grupo]
+            sub = {nombre: m[np.ix_(sel, sel)] for nombre, m in matrices.items()}
+            if formato == "json":
+                f.write(json.dumps({
+                    "grupo": g,
+                    "indices": grupo,
+                    "titulos": [df.loc[i, "titulo"] for i in grupo],
+                    "matrices": {nombre: np.round(m, 4).tolist() for nombre, m in sub.items()},
+                }, ensure_ascii=False) + "\n")
+                continue
+            # Pares i<j del grupo, escritos por tramos para no armar todo en memoria
+            idx = np.asarray(grupo)
+            pares_a, pares_b = np.triu_indices(len(grupo), k=1)
+            for inicio in range(0, pares_a.size, TAM_TRAMO_CSV):
+                a = pares_a[inicio:inicio + TAM_TRAMO_CSV]
+                b = pares_b[inicio:inicio + TAM_TRAMO_CSV]
+                bloque = pd.DataFrame({
+                    "grupo": g,
+                    "indice_1": idx[a],
+                    "indice_2": idx[b],
+                    "Articulo_1": titulos[idx[a]],
+                    "Articulo_2": titulos[idx[b]],
+                })
+                for nombre in algoritmos:
+                    bloque[nombre] = np.round(sub[nombre][a, b], 4)
+                bloque.to_csv(f, header=(f.tell() == 0), index=False)
+    return ruta_salida
+
+def leer_umbrales(texto: str | None, algoritmos: list[str]) -> dict[str, float | None]:
+    """
+    "0.5" aplica el mismo umbral a todos; "jaccard=0.3,tfidf=0.6" uno por
+    algoritmo (nombres de ALIAS). Los algoritmos sin umbral quedan en None.
+    """
+    umbrales = {nombre: None for nombre in algoritmos}
+    if not texto:
+        return umbrales
+    for parte in texto.split(","):
+        if not parte.strip():
+            continue
+        clave, _, valor = parte.rpartition("=")
+        try:
+            umbral = float(valor)
+        except ValueError:
+            raise ValueError(f"Umbral no numérico: {parte.strip()}")
+        if not clave:
+            umbrales = {nombre: umbral for nombre in algoritmos}
+            continue
+        for nombre in elegir_algoritmos(clave):
+            if nombre in umbrales:
+                umbrales[nombre] = umbral
+    return umbrales
+
+def ejecutar_lote_disperso(df: pd.DataFrame, grupos: list[list[int]], algoritmos: list[str],
+                           carpeta: Path, umbrales: dict[str, float | None],
+                           k: int | None = None) -> list[Path]:
+    """
+    Solo los pares que pasan el umbral de cada algoritmo (y/o los k vecinos de
+    cada artículo dentro de su grupo), sin armar matrices densas. Un archivo
+    columnar por algoritmo con grupo, indice_1, indice_2 y similitud.
+    """
+    validar_grupos(grupos)
+
+    def calcular(nombre):
+        partes = []
+        for g, grupo in enumerate(grupos):
+            pares = calcular_pares(nombre, [df.loc[i, "abstract"] for i in grupo],
+                                   umbrales[nombre], k,
+                                   cache_rasgos() if nombre in ("Jaccard", "N-gramas") else None,
+                                   modelo_tfidf() if nombre == "Coseno (TF-IDF)" else None)
+            columnas = columnas_pares(pares, np.asarray(grupo))
+            partes.append({"grupo": np.full(columnas["similitud"].size, g, dtype=np.int32), **columnas})
+        return exportar_columnas({c: np.concatenate([p[c] for p in partes]) for c in partes[0]},
+                                 Path(carpeta) / nombre.replace(" ", "_"))
+
+    sin_criterio = [nombre for nombre in algoritmos if umbrales[nombre] is None and not k]
+    if sin_criterio:
+        raise ValueError(f"Sin umbral ni k para: {', '.join(sin_criterio)}")
+    rutas = []
+    try:
+        for nombre, ruta, segundos, error in ejecutar_concurrente({a: (lambda a=a: calcular(a)) for a in algoritmos}):
+            if error is not None:
+                raise error
+            print(f"   {nombre}: {ruta} ({segundos:.2f} s)")
+            rutas.append(ruta)
+    finally:
+        guardar_rasgos()
+    return rutas
 
-    
 # -----------------------------------------------------------
-# 7️⃣ Generar PDF con todas las tablas de similitud
+# 7️⃣ Ejecución interactiva
 # -----------------------------------------------------------
 
-# Convertir las matrices en DataFrames planos (pares de artículos)
-resultados_dict = {}
+def main():
+    parser = argparse.ArgumentParser(description="Similitud textual entre abstracts")
+    parser.add_argument("--algoritmos", default="todos",
+                        help="Lista separada por comas: " + ", ".join(ALIAS))
+    parser.add_argument("--lote", default=None,
+                        help='Archivo con un grupo de índices por línea, o "all" (sin preguntas)')
+    parser.add_argument("--salida", type=Path, default=None,
+                        help="Archivo de resultados del lote (por defecto ResultadosSimilitud/lote.<formato>)")
+    parser.add_argument("--formato", default="csv", choices=["csv", "json", "dispersa"],
+                        help="dispersa: solo los pares que pasan --umbral y/o --top-k")
+    parser.add_argument("--umbral", default=None,
+                        help='Formato dispersa: "0.5" o por algoritmo "jaccard=0.3,tfidf=0.6"')
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="Formato dispersa: k vecinos más similares de cada artículo")
+    args = parser.parse_args()
+    try:
+        algoritmos = elegir_algoritmos(args.algoritmos)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    df = cargar_articulos()
+    if df.empty:
+        print("⚠️ No se encontraron abstracts en el archivo BibTeX.")
+        sys.exit()
+
+    if args.lote:
+        try:
+            grupos = leer_grupos(args.lote, len(df))
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"Calculando {len(algoritmos)} algoritmos para {len(grupos)} grupos...")
+        if args.formato == "dispersa":
+            carpeta = args.salida or BASE_DIR / "Requerimiento2" / "ResultadosSimilitud" / "pares_dispersos"
+            try:
+                ejecutar_lote_disperso(df, grupos, algoritmos, carpeta,
+                                       leer_umbrales(args.umbral, algoritmos), args.top_k)
+            except ValueError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+            print(f"✅ Pares guardados en: {carpeta}")
+            return
+        salida = args.salida or BASE_DIR / "Requerimiento2" / "ResultadosSimilitud" / f"lote.{args.formato}"
+        try:
+            ejecutar_lote(df, grupos, algoritmos, salida, args.formato)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ Resultados guardados en: {salida}")
+        return
+
+    print(f"\nSe cargaron {len(df)} artículos con abstracts.\n")
+
+    # Selección de artículos y comparación múltiple
+    print("Lista de artículos disponibles:\n")
+    for i, row in df.iterrows():
+        print(f"[{i}] {row['titulo'][:100]}{'...' if len(row['titulo'])>100 else ''}")
+
+    indices_input = input(
+        "\nIngrese los índices de los artículos a comparar (separados por coma, ej: 0,2,5): "
+    )
+    indices = [int(x.strip()) for x in indices_input.split(",") if x.strip().isdigit()]
 
-for nombre, matriz in matrices.items():
-    dfmat = pd.DataFrame(matriz, index=titulos, columns=titulos)
-    filas = []
-    for i in range(len(titulos)):
-        for j in range(i + 1, len(titulos)):  # evitar duplicados (i<j)
-            filas.append({
-                "Articulo_1": titulos[i],
-                "Articulo_2": titulos[j],
-                "Similitud": round(float(matriz[i, j]), 4)
-            })
-    resultados_dict[nombre] = pd.DataFrame(filas)
+    if len(indices) < 2:
+        print("⚠️ Debe seleccionar al menos dos artículos.")
+        sys.exit()
+
+    for i in indices:
+        if i not in df.index:
+            print(f"❌ Índice fuera de rango: {i}")
+            sys.exit()
+
+    # Cálculo de matriz de similitud para cada algoritmo
+    print("\nCalculando similitudes... Esto puede tardar un poco.\n")
+
+    abstracts = [df.loc[i, "abstract"] for i in indices]
+    titulos = [df.loc[i, "titulo"][:50] + ("..." if len(df.loc[i, 'titulo']) > 50 else "") for i in indices]
+
+    # Los algoritmos corren a la vez; cada matriz se muestra en cuanto está lista
+    matrices = {}
+    for nombre, matriz, segundos, error in calcular_matrices_concurrente(abstracts, algoritmos):
+        if error is not None:
+            print(f"❌ {nombre}: {error}\n")
+            continue
+        matrices[nombre] = matriz
+        print("\n==============================================")
+        print(f"   MATRIZ DE SIMILITUD - {nombre} ({segundos:.2f} s)")
+        print("==============================================")
+        dfmat = pd.DataFrame(matriz, index=titulos, columns=titulos)
+        print(dfmat.round(3))
+        print()
+    if not matrices:
+        sys.exit(1)
+    matrices = {nombre: matrices[nombre] for nombre in algoritmos if nombre in matrices}
 
-# Exportar todo en un solo PDF
-exportar_resultados_pdf(resultados_dict)
+    out_dir = BASE_DIR / "Requerimiento2" / "ResultadosSimilitud"
 
-# -----------------------------------------------------------
-# 8️⃣ (Opcional) Guardar también CSV individuales
-# -----------------------------------------------------------
+    # Lista completa de pares (comprimida) y PDF con mapas de calor y top-N
+    exportar_resultados(matrices, titulos, indices, out_dir)
 
-guardar = input("¿Desea guardar los resultados en CSV además del PDF? (s/n): ").lower()
-if guardar == "s":
-    out_dir = BASE_DIR / "Requerimiento2" / "ResultadosSimilitud"
-    out_dir.mkdir(exist_ok=True, parents=True)
-    for nombre, dfres in resultados_dict.items():
-        dfres.to_csv(out_dir / f"{nombre.replace(' ', '_')}.csv", index=False, encoding="utf-8")
-    print(f"\n✅ Resultados guardados en: {out_dir}\n")
-else:
-    print("\n✅ Análisis finalizado. PDF generado correctamente.\n")
+    # (Opcional) Guardar también en CSV los pares más similares de cada algoritmo
+    guardar = input(f"¿Desea guardar en CSV los {N_TOP} pares más similares de cada algoritmo? (s/n): ").lower()
+    if guardar == "s":
+        exportar_top_csv(matrices, titulos, out_dir)
+        print(f"\n✅ Resultados guardados en: {out_dir}\n")
+    else:
+        print("\n✅ Análisis finalizado.\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# Proyecto/Requerimiento3/normalizacionTexto.py
+"""
+Normalización de abstracts compilada una vez, en paralelo y con caché.
+
+limpiar_texto volvía a construir el conjunto de stopwords (inglés + español) y
+a compilar las expresiones regulares en cada llamada, y los abstracts se
+limpiaban de uno en uno. Aquí:
+  - NormalizadorTexto guarda las stopwords (frozenset) y las regex compiladas;
+    con el tokenizador "punkt", limpiar() da el mismo resultado que la función original,
+  - limpiar_lote reparte los textos en trozos de TAM_TROZO entre un
+    ProcessPoolExecutor (el normalizador se envía una vez a cada proceso),
+  - CacheLimpieza guarda el texto limpio por hash del abstract original, así
+    que al volver a ejecutar preparacionDatos.py con un corpus que creció solo
+    se limpian los abstracts nuevos. La caché lleva la firma del normalizador:
+    si cambian el tokenizador, las stopwords o la longitud mínima se descarta entera.
+
+Tokenizadores (se elige uno por ejecución):
+  - "punkt" (por defecto): word_tokenize de NLTK, como el script original.
+  - "regex" (opcional): el texto ya quedó reducido a [a-záéíóúüñ\s], así que
+    las palabras son las rachas de esas letras; una sola regex compilada
+    (findall) sustituye a quitar símbolos, colapsar espacios y tokenizar. No
+    necesita NLTK, pero no separa como "punkt" las contracciones sin apóstrofo
+    (cannot -> can not, gonna -> gon na, ...), así que el texto limpio puede
+    cambiar en esas palabras.
+Las stopwords de inglés y español van incluidas en la carpeta stopwords/ (las
+listas del corpus stopwords de NLTK; la versión está en stopwords/README.md),
+así que no se descarga nada al importar; los datos de punkt solo se buscan (y
+descargan si faltan) al usar "punkt".
+
+Uso:
+    from normalizacionTexto import CacheLimpieza, NormalizadorTexto, limpiar_corpus
+    limpios = limpiar_corpus(abstracts, NormalizadorTexto(), CacheLimpieza.cargar())
+
+Comparación de tokenizadores por consola:
+    python normalizacionTexto.py --tokenizadores regex,punkt
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+RUTA_CACHE = Path(__file__).resolve().parent / "cache" / "limpieza.pkl"
+RUTA_STOPWORDS = Path(__file__).resolve().parent / "stopwords"
+
+# Textos por tarea del pool y mínimo de textos para que compense arrancar procesos
+TAM_TROZO = 256
+MIN_TEXTOS_PARALELO = 1000
+
+TOKENIZADORES = ("regex", "punkt")
+TOKENIZADOR = "punkt"
+
+IDIOMAS_STOPWORDS = ("english", "spanish")
+LONGITUD_MINIMA = 3
+
+RE_ETIQUETAS = re.compile(r'<[^>]+>')
+RE_NO_LETRAS = re.compile(r'[^a-záéíóúüñ\s]')
+RE_ESPACIOS = re.compile(r'\s+')
+RE_PALABRA = re.compile(r'[a-záéíóúüñ]+')
+
+
+def hash_texto(texto: str) -> str:
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def cargar_stopwords(idiomas: tuple[str, ...] = IDIOMAS_STOPWORDS) -> frozenset:
+    """Unión de las listas incluidas en stopwords/<idioma> (una palabra por línea)."""
+    palabras = set()
+    for idioma in idiomas:
+        ruta = RUTA_STOPWORDS / idioma
+        if not ruta.exists():
+            raise ValueError(f"No hay lista de stopwords para '{idioma}' en {RUTA_STOPWORDS}")
+        palabras.update(ruta.read_text(encoding="utf-8").split())
+    return frozenset(palabras)
+
+
+def preparar_punkt():
+    """Descarga los datos de punkt de NLTK solo si no están instalados."""
+    import nltk
+
+    for recurso, ruta in (("punkt", "tokenizers/punkt"), ("punkt_tab", "tokenizers/punkt_tab")):
+        try:
+            nltk.data.find(ruta)
+        except LookupError:
+            nltk.download(recurso, quiet=True)
+
+
+class NormalizadorTexto:
+    """Etiquetas fuera, minúsculas, solo letras, tokenización y filtro de stopwords."""
+
+    def __init__(self, tokenizador: str = TOKENIZADOR,
+                 idiomas: tuple[str, ...] = IDIOMAS_STOPWORDS,
+                 longitud_minima: int = LONGITUD_MINIMA):
+        if tokenizador not in TOKENIZADORES:
+            raise ValueError(f"Tokenizador desconocido: {tokenizador} (opciones: {', '.join(TOKENIZADORES)})")
+        if tokenizador == "punkt":
+            preparar_punkt()
+        self.tokenizador = tokenizador
+        self.idiomas = tuple(idiomas)
+        self.longitud_minima = longitud_minima
+        self.stopwords = cargar_stopwords(self.idiomas)
+
+    @property
+    def firma(self) -> str:
+        """Identifica la configuración: textos limpiados con otra firma no se reutilizan."""
+        partes = [self.tokenizador, ",".join(self.idiomas), str(self.longitud_minima),
+                  " ".join(sorted(self.stopwords))]
+        return hash_texto("|".join(partes))
+
+    def tokenizar(self, texto: str) -> list[str]:
+        """Palabras de un texto en minúsculas y sin etiquetas."""
+        if self.tokenizador == "regex":
+            return RE_PALABRA.findall(texto)
+        from nltk.tokenize import word_tokenize
+
+        texto = RE_ESPACIOS.sub(' ', RE_NO_LETRAS.sub(' ', texto)).strip()
+        return word_tokenize(texto, language='english')
+
+    def limpiar(self, texto: str) -> str:
+        """Texto limpio (con "punkt", idéntico al del limpiar_texto original)."""
+        if not texto:
+            return ""
+        texto = RE_ETIQUETAS.sub(' ', texto).lower()
+        stop_words = self.stopwords
+        minimo = self.longitud_minima
+        return ' '.join(t for t in self.tokenizar(texto) if t not in stop_words and len(t) >= minimo)
+
+
+# -----------------------------------------------------------
+# Limpieza en paralelo
+# -----------------------------------------------------------
+
+def _iniciar(normalizador: NormalizadorTexto):
+    global _normalizador
+    _normalizador = normalizador
+
+
+def _limpiar_trozo(textos: list[str]) -> list[str]:
+    return [_normalizador.limpiar(t) for t in textos]
+
+
+def limpiar_lote(textos: list[str], normalizador: NormalizadorTexto,
+                 procesos: int | None = None, tam_trozo: int = TAM_TROZO) -> list[str]:
+    """Textos limpios en el mismo orden; con muchos textos, repartidos por trozos entre procesos."""
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(textos) < MIN_TEXTOS_PARALELO:
+        return [normalizador.limpiar(t) for t in textos]
+    trozos = [textos[k:k + tam_trozo] for k in range(0, len(textos), tam_trozo)]
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar,
+                             initargs=(normalizador,)) as pool:
+        return [t for trozo in pool.map(_limpiar_trozo, trozos) for t in trozo]
+
+
+# -----------------------------------------------------------
+# Caché por hash del abstract
+# -----------------------------------------------------------
+
+class CacheLimpieza:
+    """Texto limpio por hash del abstract original, para una firma de normalizador."""
+
+    def __init__(self, ruta: Path | None = RUTA_CACHE):
+        self.ruta = Path(ruta) if ruta else None
+        self.firma: str | None = None
+        self.limpios: dict[str, str] = {}
+        self._modificada = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def cargar(cls, ruta: Path = RUTA_CACHE) -> "CacheLimpieza":
+        """Carga la caché desde disco; si no existe o está dañada, empieza vacía."""
+        cache = cls(ruta)
+        if ruta and Path(ruta).exists():
+            try:
+                with open(ruta, "rb") as f:
+                    estado = pickle.load(f)
+                cache.firma = estado["firma"]
+                cache.limpios = estado["limpios"]
+            except Exception as e:
+                print(f"[WARN] Caché de limpieza ignorada ({e})")
+        return cache
+
+    def guardar(self):
+        """
+        Escribe la caché en disco (solo si cambió). Escritura atómica: un
+        temporal propio por llamada, movido a su sitio dentro del lock.
+        """
+        if not self.ruta:
+            return
+        with self._lock:
+            if not self._modificada:
+                return
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.ruta.parent, prefix=self.ruta.name + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump({"firma": self.firma, "limpios": self.limpios}, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self.ruta)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+            self._modificada = False
+
+    def usar_firma(self, firma: str):
+        """Fija la configuración del normalizador; si es otra, la caché se vacía."""
+        with self._lock:
+            if firma != self.firma:
+                if self.limpios:
+                    print("[INFO] La normalización cambió: la caché de limpieza se descarta.")
+                self.firma = firma
+                self.limpios = {}
+                self._modificada = True
+
+    def pendientes(self, textos: list[str]) -> dict[str, str]:
+        """hash -> texto de los abstracts (sin repetir) que aún no están limpios."""
+        faltan = {}
+        for t in textos:
+            h = hash_texto(t)
+            if h not in self.limpios and h not in faltan:
+                faltan[h] = t
+        return faltan
+
+    def anadir(self, hashes: list[str], limpios: list[str]):
+        with self._lock:
+            self.limpios.update(zip(hashes, limpios))
+            self._modificada = True
+
+    def obtener(self, texto: str) -> str:
+        return self.limpios[hash_texto(texto)]
+
+
+def limpiar_corpus(textos: list[str], normalizador: NormalizadorTexto,
+                   cache: CacheLimpieza | None = None, procesos: int | None = None,
+                   estadisticas: dict | None = None) -> list[str]:
+    """
+    Textos limpios en el mismo orden que `textos`. Con caché, solo se limpian
+    los abstracts que no estaban y la caché se guarda al terminar.
+    estadisticas (opcional) se rellena con textos, nuevos y reutilizados.
+    """
+    if cache is None:
+        limpios = limpiar_lote(textos, normalizador, procesos)
+        nuevos = len(textos)
+    else:
+        cache.usar_firma(normalizador.firma)
+        faltan = cache.pendientes(textos)
+        if faltan:
+            cache.anadir(list(faltan), limpiar_lote(list(faltan.values()), normalizador, procesos))
+            cache.guardar()
+        limpios = [cache.obtener(t) for t in textos]
+        nuevos = len(faltan)
+    if estadisticas is not None:
+        estadisticas.update({"textos": len(textos), "nuevos": nuevos,
+                             "reutilizados": len(textos) - nuevos})
+    return limpios
+
+
+# -----------------------------------------------------------
+# Comparación de tokenizadores
+# -----------------------------------------------------------
+
+def main():
+    from preparacionDatos import IN_FILE, extraer_abstracts
+
+    parser = argparse.ArgumentParser(description="Tiempo y coincidencias de los tokenizadores")
+    parser.add_argument("--tokenizadores", default=",".join(TOKENIZADORES))
+    parser.add_argument("--repeticiones", type=int, default=3, help="Veces que se limpia el corpus")
+    args = parser.parse_args()
+
+    abstracts = extraer_abstracts(IN_FILE) * args.repeticiones
+    print(f"\n{len(abstracts)} abstracts ({args.repeticiones} pasadas del corpus)\n")
+    resultados = {}
+    for nombre in (x.strip() for x in args.tokenizadores.split(",")):
+        t0 = time.perf_counter()
+        normalizador = NormalizadorTexto(nombre)
+        t_inicio = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        resultados[nombre] = [normalizador.limpiar(t) for t in abstracts]
+        t_limpiar = time.perf_counter() - t0
+        palabras = sum(len(t.split()) for t in resultados[nombre])
+        print(f"{nombre:>6}: inicio {t_inicio * 1000:.0f} ms | limpieza {t_limpiar:.2f} s "
+              f"({len(abstracts) / t_limpiar:.0f} abstracts/s, {palabras} palabras)")
+    if "punkt" in resultados:
+        referencia = resultados["punkt"]
+        for nombre, limpios in resultados.items():
+            if nombre != "punkt":
+                iguales = sum(a == b for a, b in zip(limpios, referencia))
+                print(f"{nombre} = punkt en {iguales}/{len(referencia)} abstracts")
+
+
+if __name__ == "__main__":
+    main()
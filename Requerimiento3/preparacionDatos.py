@@ -1,16 +1,15 @@
 # Proyecto/Requerimiento3/PrepararDatos.py
 
+import argparse
 import re
+import time
 import pandas as pd
 from pathlib import Path
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import nltk
 
-# Descargar recursos necesarios de NLTK (solo la primera vez)
-nltk.download('punkt', quiet=True)
-nltk.download('punkt_tab', quiet=True)  # ← Agrega esta
-nltk.download('stopwords', quiet=True)
+from normalizacionTexto import TOKENIZADOR, TOKENIZADORES, CacheLimpieza, NormalizadorTexto, limpiar_corpus
+
+# Las stopwords van incluidas en Requerimiento3/stopwords; los datos de punkt de
+# NLTK solo se descargan si faltan (con --tokenizador regex no se usa NLTK)
 
 # --- CONFIGURACIONES ---
 BASE_DIR = Path(__file__).resolve().parent
@@ -25,34 +24,19 @@ print("Existe archivo:", IN_FILE.exists())
 
 # --- FUNCIONES AUXILIARES ---
 
-def limpiar_texto(texto: str) -> str:
-    """Normaliza el texto: elimina etiquetas, minúsculas, quita signos, números y stopwords."""
-    if not texto:
-        return ""
-    
-    # --- ELIMINAR ETIQUETAS HTML / MathML ---
-    texto = re.sub(r'<[^>]+>', ' ', texto)  # elimina cualquier cosa entre < y >
-    
-    # Minúsculas
-    texto = texto.lower()
-
-    # Quitar caracteres especiales, números y saltos de línea
-    texto = re.sub(r'[^a-záéíóúüñ\s]', ' ', texto)
-    texto = re.sub(r'\s+', ' ', texto).strip()
+_normalizadores: dict[str, NormalizadorTexto] = {}
 
-    # Tokenización
-    tokens = word_tokenize(texto, language='english')
 
-    # Stopwords en inglés y español
-    stop_words = set(stopwords.words('english')).union(set(stopwords.words('spanish')))
+def normalizador(tokenizador: str = TOKENIZADOR) -> NormalizadorTexto:
+    """Normalizador compartido (stopwords y regex se preparan una sola vez)."""
+    if tokenizador not in _normalizadores:
+        _normalizadores[tokenizador] = NormalizadorTexto(tokenizador)
+    return _normalizadores[tokenizador]
 
-    # Filtrar stopwords
-    tokens_filtrados = [t for t in tokens if t not in stop_words and len(t) > 2]
 
-    # Unir de nuevo en texto limpio
-    texto_limpio = ' '.join(tokens_filtrados)
-
-    return texto_limpio
+def limpiar_texto(texto: str) -> str:
+    """Normaliza el texto: elimina etiquetas, minúsculas, quita signos, números y stopwords."""
+    return normalizador().limpiar(texto)
 
 
 def extraer_abstracts(bib_path: Path):
@@ -90,12 +74,26 @@ def extraer_abstracts(bib_path: Path):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Limpieza de los abstracts del corpus")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos (por defecto, todas las CPU)")
+    parser.add_argument("--sin-cache", action="store_true", help="Limpiar todo sin usar la caché")
+    parser.add_argument("--tokenizador", default=TOKENIZADOR, choices=TOKENIZADORES,
+                        help="punkt (word_tokenize de NLTK, como el original) o regex (rápido, sin NLTK; "
+                             "no separa contracciones como cannot)")
+    args = parser.parse_args()
+
     print("📘 Cargando y procesando abstracts...")
 
     abstracts = extraer_abstracts(IN_FILE)
     print(f"✅ {len(abstracts)} abstracts extraídos del archivo.")
 
-    datos_limpios = [limpiar_texto(abs_) for abs_ in abstracts]
+    # Solo se limpian los abstracts que no están en la caché
+    estadisticas = {}
+    t0 = time.perf_counter()
+    cache = None if args.sin_cache else CacheLimpieza.cargar()
+    datos_limpios = limpiar_corpus(abstracts, normalizador(args.tokenizador), cache, args.procesos, estadisticas)
+    print(f"🧹 {estadisticas['nuevos']} abstracts limpiados y {estadisticas['reutilizados']} "
+          f"tomados de la caché en {time.perf_counter() - t0:.2f} s")
 
     df = pd.DataFrame({
         'abstract_original': abstracts,
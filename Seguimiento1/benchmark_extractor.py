@@ -0,0 +1,99 @@
+# Proyecto/Seguimiento1/benchmark_extractor.py
+"""
+Microbenchmark: extractor de una sola pasada (extractorbib) contra la
+extracción anterior con una regex por campo (get_year / get_title / get_type
+de punto1.py y get_author_raw de punto3.py).
+
+Uso:
+    python benchmark_extractor.py [archivo.bib] [repeticiones]
+"""
+import re
+import sys
+from pathlib import Path
+from time import perf_counter
+
+from extractorbib import extraer
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR / "Requerimiento1"))
+
+from lecturabib import read_text, split_bib_entries  # noqa: E402
+
+IN_BIB = BASE_DIR / "Requerimiento1" / "ArchivosFiltrados" / "articulosOptimos.bib"
+
+# === Versión anterior: una regex por campo (copiada de punto1.py / punto3.py) ===
+
+RE_YEAR   = re.compile(r'(?im)^\s*year\s*=\s*(?:\{([^}]*)\}|"([^"]*)")', re.M)
+RE_TITLE  = re.compile(r'(?im)^\s*title\s*=\s*(?:\{((?:[^{}]|\{[^{}]*\})*)\}|"([^"]*)")', re.M)
+RE_TYPE   = re.compile(r'(?is)^\s*@\s*([A-Za-z]+)\s*{')
+RE_AUTHOR = re.compile(r'(?im)^\s*author\s*=\s*(?:\{((?:[^{}]|\{[^{}]*\})*)\}|"([^"]*)")', re.M)
+
+def get_field(rx: re.Pattern, entry: str) -> str:
+    m = rx.search(entry)
+    if not m: return ""
+    return (m.group(1) or m.group(2) or "").strip()
+
+def get_year(entry: str) -> int:
+    m = re.search(r'\b(19|20)\d{2}\b', get_field(RE_YEAR, entry))
+    return int(m.group(0)) if m else 0
+
+def get_title(entry: str) -> str:
+    return re.sub(r'[\{\}]', '', get_field(RE_TITLE, entry)).strip()
+
+def get_type(entry: str) -> str:
+    m = RE_TYPE.search(entry)
+    return (m.group(1).lower() if m else "unknown")
+
+def get_author(entry: str) -> str:
+    val = re.sub(r'[\{\}]', '', get_field(RE_AUTHOR, entry))
+    return re.sub(r'\s+', ' ', val).strip()
+
+# === Casos medidos ===
+
+def por_regex(entries: list[str]) -> list[tuple]:
+    return [(get_type(e), get_year(e), get_title(e), get_author(e)) for e in entries]
+
+def una_pasada(entries: list[str]) -> list[tuple]:
+    out = []
+    for e in entries:
+        reg = extraer(e, ("year", "title", "author"))
+        out.append((reg.tipo, reg.year or 0, reg.title, reg.author))
+    return out
+
+def medir(func, entries: list[str], repeticiones: int) -> tuple[float, list]:
+    """Mejor tiempo de `repeticiones` ejecuciones y el último resultado."""
+    mejor = float("inf")
+    res = None
+    for _ in range(repeticiones):
+        t0 = perf_counter()
+        res = func(entries)
+        mejor = min(mejor, perf_counter() - t0)
+    return mejor, res
+
+def main():
+    in_path = Path(sys.argv[1]) if len(sys.argv) > 1 else IN_BIB
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    if not in_path.exists():
+        print(f"[ERROR] No existe el archivo de entrada: {in_path}", file=sys.stderr)
+        sys.exit(1)
+
+    entries = split_bib_entries(read_text(in_path))
+    print(f"[INFO] Entradas: {len(entries)}  repeticiones: {repeticiones}")
+
+    t_regex, r_regex = medir(por_regex, entries, repeticiones)
+    t_pasada, r_pasada = medir(una_pasada, entries, repeticiones)
+
+    n = max(len(entries), 1)
+    print(f"Regex por campo : {t_regex:.4f}s  ({t_regex / n * 1e6:.1f} µs/entrada)")
+    print(f"Una sola pasada : {t_pasada:.4f}s  ({t_pasada / n * 1e6:.1f} µs/entrada)")
+    print(f"Aceleración     : {t_regex / t_pasada:.2f}x")
+
+    # Coincidencia campo a campo (la regex anterior exige el campo al inicio de línea,
+    # por eso puede perder campos que comparten línea con otro)
+    nombres = ("tipo", "year", "title", "author")
+    for k, nombre in enumerate(nombres):
+        iguales = sum(1 for a, b in zip(r_regex, r_pasada) if a[k] == b[k])
+        print(f"  {nombre:7s} coincide en {iguales}/{len(entries)}")
+
+if __name__ == "__main__":
+    main()
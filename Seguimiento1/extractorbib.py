@@ -0,0 +1,153 @@
+# Proyecto/Seguimiento1/extractorbib.py
+"""
+Extractor de campos BibTeX en una sola pasada.
+
+En vez de lanzar una búsqueda regex por campo sobre la entrada completa,
+se recorre la entrada una vez anotando dónde empieza y termina el valor de
+cada campo. El texto solo se decodifica (quitar llaves, convertir el año a
+entero, normalizar espacios) cuando alguien pide ese campo, y el resultado
+queda guardado en el registro.
+"""
+import re
+
+RE_CABECERA = re.compile(r'\s*@\s*([A-Za-z]+)\s*[{(]\s*([^,\s]*)\s*,?')
+RE_CAMPO = re.compile(r'[,\s]*([A-Za-z][\w\-:.]*)\s*=\s*')
+RE_LLAVE = re.compile(r'[{}]')
+RE_COMILLA = re.compile(r'[{}"]')
+RE_SIN_DELIMITAR = re.compile(r'[^,}\s]*')
+
+RE_ANIO = re.compile(r'\b(19|20)\d{2}\b')
+RE_LLAVES = re.compile(r'[\{\}]')
+RE_ESPACIOS = re.compile(r'\s+')
+
+
+def _fin_llaves(entry: str, i: int) -> int:
+    """Posición de la llave que cierra el valor abierto justo antes de i."""
+    # Caso común: valor sin llaves anidadas, dos búsquedas en C
+    cierre = entry.find('}', i)
+    if cierre != -1 and entry.find('{', i, cierre) == -1:
+        return cierre
+    depth = 1
+    for m in RE_LLAVE.finditer(entry, i):
+        if m.group() == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return m.start()
+    return len(entry)
+
+
+def _fin_comillas(entry: str, i: int) -> int:
+    """Posición de la comilla que cierra el valor (ignora comillas dentro de llaves)."""
+    depth = 0
+    for m in RE_COMILLA.finditer(entry, i):
+        c = m.group()
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+        elif depth == 0 and entry[m.start() - 1] != '\\':
+            return m.start()
+    return len(entry)
+
+
+class RegistroBib:
+    """
+    Registro tipado de una entrada BibTeX.
+    Guarda solo las posiciones de cada valor; la decodificación es perezosa.
+    """
+    __slots__ = ("entry", "tipo", "clave", "_spans", "_cache")
+
+    def __init__(self, entry: str, tipo: str, clave: str, spans: dict[str, tuple[int, int]]):
+        self.entry = entry
+        self.tipo = tipo
+        self.clave = clave
+        self._spans = spans
+        self._cache = {}
+
+    def __contains__(self, campo: str) -> bool:
+        return campo in self._spans
+
+    def campos(self) -> list[str]:
+        return list(self._spans)
+
+    def raw(self, campo: str) -> str:
+        """Valor sin delimitadores externos y sin ninguna limpieza."""
+        span = self._spans.get(campo)
+        return self.entry[span[0]:span[1]] if span else ""
+
+    def get(self, campo: str) -> str:
+        """Valor sin llaves internas y sin espacios en los extremos."""
+        val = self._cache.get(campo)
+        if val is None:
+            val = RE_LLAVES.sub('', self.raw(campo)).strip()
+            self._cache[campo] = val
+        return val
+
+    @property
+    def year(self) -> int | None:
+        # Clave propia: get("year") guarda el texto en "year" y no deben mezclarse
+        if "_year" not in self._cache:
+            m = RE_ANIO.search(self.raw("year"))
+            self._cache["_year"] = int(m.group(0)) if m else None
+        return self._cache["_year"]
+
+    @property
+    def title(self) -> str:
+        return self.get("title")
+
+    @property
+    def author(self) -> str:
+        """Campo author sin llaves y con espacios normalizados."""
+        return RE_ESPACIOS.sub(' ', self.get("author")).strip()
+
+    @property
+    def doi(self) -> str:
+        return self.get("doi")
+
+    @property
+    def abstract(self) -> str:
+        return self.get("abstract")
+
+
+def extraer(entry: str, campos: tuple[str, ...] | None = None) -> RegistroBib:
+    """
+    Recorre la entrada una sola vez y devuelve un RegistroBib.
+    Si se indican `campos`, el recorrido se detiene en cuanto aparecen todos.
+    Si la entrada no tiene cabecera @tipo{clave el registro queda vacío
+    con tipo "unknown".
+    """
+    m = RE_CABECERA.match(entry)
+    if not m:
+        return RegistroBib(entry, "unknown", "", {})
+
+    spans = {}
+    pendientes = set(campos) if campos else None
+    n = len(entry)
+    i = m.end()
+    while i < n:
+        mc = RE_CAMPO.match(entry, i)
+        if not mc:
+            break
+        nombre = mc.group(1).lower()
+        j = mc.end()
+        c = entry[j:j + 1]
+        if c == '{':
+            fin = _fin_llaves(entry, j + 1)
+            spans[nombre] = (j + 1, fin)
+            i = fin + 1
+        elif c == '"':
+            fin = _fin_comillas(entry, j + 1)
+            spans[nombre] = (j + 1, fin)
+            i = fin + 1
+        else:
+            fin = RE_SIN_DELIMITAR.match(entry, j).end()
+            spans[nombre] = (j, fin)
+            i = fin
+        if pendientes is not None:
+            pendientes.discard(nombre)
+            if not pendientes:
+                break
+
+    return RegistroBib(entry, m.group(1).lower(), m.group(2), spans)
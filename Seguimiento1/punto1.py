@@ -1,5 +1,4 @@
 # Proyecto/Seguimiento1/ordenar_productos.py
-import re
 import sys
 from pathlib import Path
 from time import perf_counter
@@ -7,6 +6,7 @@ from time import perf_counter
 # importar algoritmos
 sys.path.append(str(Path(__file__).resolve().parents[1] / "Algoritmos"))
 import algoritmos as algo
+from extractorbib import extraer
 
 import matplotlib.pyplot as plt  # opcional para ranking en barras
 
@@ -47,36 +47,13 @@ def split_bib_entries(text: str) -> list[str]:
         i = j
     return entries
 
-# Patrones robustos: {valor} o "valor"
-RE_YEAR   = re.compile(r'(?im)^\s*year\s*=\s*(?:\{([^}]*)\}|"([^"]*)")', re.M)
-RE_TITLE  = re.compile(r'(?im)^\s*title\s*=\s*(?:\{((?:[^{}]|\{[^{}]*\})*)\}|"([^"]*)")', re.M)
-RE_TYPE   = re.compile(r'(?is)^\s*@\s*([A-Za-z]+)\s*{')  # @article{... → article
-
-def get_field(rx: re.Pattern, entry: str) -> str:
-    m = rx.search(entry)
-    if not m: return ""
-    val = (m.group(1) or m.group(2) or "").strip()
-    return val
-
-def get_year(entry: str) -> int:
-    raw = get_field(RE_YEAR, entry)
-    m = re.search(r'\b(19|20)\d{2}\b', raw)
-    return int(m.group(0)) if m else 0  # si falta, al inicio
-
-def get_title(entry: str) -> str:
-    t = get_field(RE_TITLE, entry)
-    t = re.sub(r'[\{\}]', '', t).strip()
-    return t
-
-def get_type(entry: str) -> str:
-    m = RE_TYPE.search(entry)
-    return (m.group(1).lower() if m else "unknown")
-
-def to_csv_row(entry: str) -> str:
-    year = get_year(entry)
-    title = get_title(entry).replace('"', '""')
-    kind  = get_type(entry)
-    return f'"{kind}","{year}","{title}"\n'
+# Campos que se leen de cada entrada (una sola pasada por entrada)
+CAMPOS = ("year", "title")
+
+def to_csv_row(reg) -> str:
+    year = reg.year or 0
+    title = reg.title.replace('"', '""')
+    return f'"{reg.tipo}","{year}","{title}"\n'
 
 def main():
     # Permitir pasar otra ruta .bib por CLI (opcional)
@@ -93,10 +70,11 @@ def main():
     records = []
     titles_norm = []
     for e in entries:
-        year = get_year(e)
-        title = get_title(e)
+        reg = extraer(e, CAMPOS)
+        year = reg.year or 0  # si falta, al inicio
+        title = reg.title
         tnorm = title.lower()
-        records.append({"entry": e, "year": year, "title": title, "title_norm": tnorm})
+        records.append({"entry": e, "reg": reg, "year": year, "title": title, "title_norm": tnorm})
         titles_norm.append(tnorm)
 
     # Mapa determinista de títulos → ids según orden lexicográfico
@@ -116,7 +94,7 @@ def main():
     with OUT_CSV.open("w", encoding="utf-8", newline="") as f:
         f.write('"type","year","title"\n')
         for r in gold:
-            f.write(to_csv_row(r["entry"]))
+            f.write(to_csv_row(r["reg"]))
 
     print("\nPrimeros 10 (year, title):")
     for r in gold[:10]:
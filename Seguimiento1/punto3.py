@@ -5,6 +5,8 @@ from pathlib import Path
 
 import matplotlib.pyplot as plt
 
+from extractorbib import extraer
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 BIB_PATH = BASE_DIR / "Requerimiento1" / "ArchivosFiltrados" / "articulosOptimos.bib"
 
@@ -42,18 +44,8 @@ def split_bib_entries(text: str) -> list[str]:
         i = j
     return entries
 
-# Captura robusta del campo author = { ... } o " ... "
-RE_AUTHOR = re.compile(r'(?im)^\s*author\s*=\s*(?:\{((?:[^{}]|\{[^{}]*\})*)\}|"([^"]*)")', re.M)
-
 def get_author_raw(entry: str) -> str:
-    m = RE_AUTHOR.search(entry)
-    if not m: return ""
-    val = (m.group(1) or m.group(2) or "").strip()
-    # quitar llaves residuales
-    val = re.sub(r'[\{\}]', '', val)
-    # normalizar espacios
-    val = re.sub(r'\s+', ' ', val).strip()
-    return val
+    return extraer(entry, ("author",)).author
 
 def split_authors(author_field: str) -> list[str]:
     # BibTeX separa autores por la palabra ' and '
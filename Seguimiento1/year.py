@@ -1,11 +1,12 @@
 # Proyecto/Seguimiento1/year.py
-import sys, re
+import sys
 from pathlib import Path
 from time import perf_counter
 
 # importar algoritmos
 sys.path.append(str(Path(__file__).resolve().parents[1] / "Algoritmos"))
 import algoritmos as algo
+from extractorbib import extraer
 
 import matplotlib.pyplot as plt  # <- para la gráfica
 
@@ -43,14 +44,8 @@ def split_bib_entries(text: str) -> list[str]:
         i = j
     return entries
 
-RE_YEAR  = re.compile(r'(?im)^\s*year\s*=\s*(?:\{([^}]*)\}|"([^"]*)")', re.M)
-
 def get_year(entry: str) -> int | None:
-    m = RE_YEAR.search(entry)
-    if not m: return None
-    val = (m.group(1) or m.group(2) or "").strip()
-    m2 = re.search(r'\b(19|20)\d{2}\b', val)
-    return int(m2.group(0)) if m2 else None
+    return extraer(entry, ("year",)).year
 
 def main():
     # Cargar años
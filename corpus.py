@@ -0,0 +1,304 @@
+"""
+Base de datos local del corpus (SQLite + FTS5).
+
+Reúne en un único archivo lo que antes viajaba entre etapas como .bib y .csv
+sueltos: artículos, autores, abstracts limpios (Requerimiento 3) y claves
+derivadas (DOI y título normalizados, hash del abstract). Incluye un índice
+FTS5 sobre título y abstract para búsquedas de texto completo.
+
+Las consultas abren una conexión de solo lectura con `leer()`, que antes
+comprueba si el .bib o el CSV cambiaron desde la última construcción (sus
+fechas de modificación quedan en la tabla `fuentes`) y en ese caso reconstruye
+la base.
+
+Uso por consola (reconstruye la base desde los archivos de cada etapa):
+    python corpus.py
+"""
+import hashlib
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR / "Requerimiento1"))
+
+from lecturabib import leer_bib  # noqa: E402
+
+DB_PATH = BASE_DIR / "corpus.sqlite"
+BIB_PATH = BASE_DIR / "Requerimiento1" / "ArchivosFiltrados" / "articulosOptimos_limpio.bib"
+ABSTRACTS_CSV = BASE_DIR / "Requerimiento3" / "DatosProcesados" / "abstracts_limpios.csv"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS articulos (
+    id            INTEGER PRIMARY KEY,
+    clave         TEXT UNIQUE NOT NULL,
+    tipo          TEXT,
+    titulo        TEXT,
+    titulo_norm   TEXT,
+    anio          INTEGER,
+    doi           TEXT,
+    revista       TEXT,
+    autores       TEXT,
+    abstract      TEXT,
+    abstract_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_articulos_doi ON articulos(doi);
+CREATE INDEX IF NOT EXISTS idx_articulos_anio ON articulos(anio);
+CREATE INDEX IF NOT EXISTS idx_articulos_hash ON articulos(abstract_hash);
+
+CREATE TABLE IF NOT EXISTS autores (
+    id         INTEGER PRIMARY KEY,
+    nombre     TEXT NOT NULL,
+    clave_norm TEXT UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS articulo_autor (
+    articulo_id INTEGER NOT NULL REFERENCES articulos(id),
+    autor_id    INTEGER NOT NULL REFERENCES autores(id),
+    posicion    INTEGER NOT NULL,
+    PRIMARY KEY (articulo_id, posicion)
+);
+CREATE INDEX IF NOT EXISTS idx_articulo_autor_autor ON articulo_autor(autor_id);
+
+CREATE TABLE IF NOT EXISTS abstracts_limpios (
+    abstract_hash   TEXT PRIMARY KEY,
+    abstract_limpio TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fuentes (
+    ruta  TEXT PRIMARY KEY,
+    mtime REAL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articulos_fts USING fts5(
+    titulo, abstract,
+    content='articulos', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# ------------------------- Claves derivadas -------------------------
+
+def normalizar_espacios(texto: str) -> str:
+    return re.sub(r'\s+', ' ', texto or "").strip()
+
+def hash_texto(texto: str) -> str:
+    """Hash estable de un texto (ignora diferencias de espacios)."""
+    return hashlib.sha1(normalizar_espacios(texto).encode("utf-8")).hexdigest()
+
+def normalizar_doi(doi: str) -> str:
+    d = (doi or "").strip().lower()
+    for prefijo in ("https://doi.org/", "http://doi.org/"):
+        if d.startswith(prefijo):
+            d = d[len(prefijo):]
+    return d
+
+def normalizar_titulo(titulo: str) -> str:
+    return normalizar_espacios(re.sub(r'[\{\}]', '', titulo or "")).lower()
+
+def separar_autores(campo: str) -> list[str]:
+    campo = normalizar_espacios(re.sub(r'[\{\}]', '', campo or ""))
+    return [a.strip() for a in campo.split(" and ") if a.strip()]
+
+# ------------------------- Conexión -------------------------
+
+def conectar(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    """Abre (o crea) la base del corpus para escribir. Las filas se devuelven como sqlite3.Row."""
+    con = sqlite3.connect(str(db_path), check_same_thread=False)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.executescript(ESQUEMA)
+    return con
+
+def _mtime(ruta: Path) -> float | None:
+    ruta = Path(ruta)
+    return ruta.stat().st_mtime if ruta.exists() else None
+
+def desactualizada(db_path: Path = DB_PATH, bib_path: Path = BIB_PATH,
+                   abstracts_csv: Path = ABSTRACTS_CSV) -> bool:
+    """True si la base no existe o si el .bib o el CSV cambiaron desde que se construyó."""
+    if not existe(db_path):
+        return True
+    try:
+        con = sqlite3.connect(f"file:{Path(db_path).as_posix()}?mode=ro", uri=True)
+        try:
+            guardadas = dict(con.execute("SELECT ruta, mtime FROM fuentes").fetchall())
+        finally:
+            con.close()
+    except sqlite3.Error:
+        return True
+    return any(guardadas.get(str(Path(r).resolve())) != _mtime(r) for r in (bib_path, abstracts_csv))
+
+@contextmanager
+def leer(db_path: Path = DB_PATH, bib_path: Path = BIB_PATH, abstracts_csv: Path = ABSTRACTS_CSV):
+    """
+    Conexión de solo lectura que se cierra al salir del bloque. Si las fuentes
+    son más nuevas que la base (o no existe), primero se reconstruye.
+
+        with corpus.leer() as con:
+            df = corpus.articulos_con_abstract(con)
+    """
+    if desactualizada(db_path, bib_path, abstracts_csv):
+        construir(db_path, bib_path, abstracts_csv).close()
+    con = sqlite3.connect(f"file:{Path(db_path).as_posix()}?mode=ro", uri=True, check_same_thread=False)
+    con.row_factory = sqlite3.Row
+    try:
+        yield con
+    finally:
+        con.close()
+
+# ------------------------- Construcción -------------------------
+
+def construir(db_path: Path = DB_PATH, bib_path: Path = BIB_PATH,
+              abstracts_csv: Path = ABSTRACTS_CSV) -> sqlite3.Connection:
+    """
+    Reconstruye la base desde el .bib filtrado y el CSV de abstracts limpios.
+    Devuelve la conexión abierta.
+    """
+    con = conectar(db_path)
+    entradas = leer_bib(bib_path)
+
+    with con:
+        con.execute("DELETE FROM articulo_autor")
+        con.execute("DELETE FROM autores")
+        con.execute("DELETE FROM articulos")
+        con.execute("DELETE FROM abstracts_limpios")
+        con.execute("DELETE FROM fuentes")
+
+        autores_ids = {}
+        for e in entradas:
+            clave = e.get("ID", "")
+            if not clave:
+                continue
+            titulo = normalizar_espacios(re.sub(r'[\{\}]', '', e.get("title", "")))
+            abstract = normalizar_espacios(e.get("abstract", ""))
+            anio = re.search(r'\b(19|20)\d{2}\b', e.get("year", ""))
+            autores = separar_autores(e.get("author", ""))
+            cur = con.execute(
+                "INSERT OR IGNORE INTO articulos (clave, tipo, titulo, titulo_norm, anio, doi, "
+                "revista, autores, abstract, abstract_hash) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (clave, e.get("ENTRYTYPE", ""), titulo, titulo.lower(),
+                 int(anio.group(0)) if anio else None,
+                 normalizar_doi(e.get("doi", "")),
+                 normalizar_espacios(e.get("journal", "")),
+                 " and ".join(autores), abstract,
+                 hash_texto(abstract) if abstract else None),
+            )
+            if cur.rowcount == 0:
+                continue  # clave duplicada
+            articulo_id = cur.lastrowid
+            for pos, nombre in enumerate(autores):
+                clave_autor = nombre.lower()
+                autor_id = autores_ids.get(clave_autor)
+                if autor_id is None:
+                    autor_id = con.execute(
+                        "INSERT INTO autores (nombre, clave_norm) VALUES (?, ?)",
+                        (nombre, clave_autor),
+                    ).lastrowid
+                    autores_ids[clave_autor] = autor_id
+                con.execute(
+                    "INSERT INTO articulo_autor (articulo_id, autor_id, posicion) VALUES (?,?,?)",
+                    (articulo_id, autor_id, pos),
+                )
+
+        # Abstracts limpios: se enlazan por el hash del abstract original
+        if Path(abstracts_csv).exists():
+            df = pd.read_csv(abstracts_csv).dropna(subset=["abstract_original", "abstract_limpio"])
+            con.executemany(
+                "INSERT OR REPLACE INTO abstracts_limpios (abstract_hash, abstract_limpio) VALUES (?, ?)",
+                ((hash_texto(o), l) for o, l in zip(df["abstract_original"], df["abstract_limpio"])),
+            )
+
+        con.execute("INSERT INTO articulos_fts(articulos_fts) VALUES ('rebuild')")
+        # Fechas de las fuentes usadas: leer() reconstruye si cambian
+        con.executemany("INSERT INTO fuentes (ruta, mtime) VALUES (?, ?)",
+                        ((str(Path(r).resolve()), _mtime(r)) for r in (bib_path, abstracts_csv)))
+    con.execute("ANALYZE")
+    return con
+
+def existe(db_path: Path = DB_PATH) -> bool:
+    return Path(db_path).exists()
+
+# ------------------------- Consultas -------------------------
+
+def articulos_con_abstract(con: sqlite3.Connection) -> pd.DataFrame:
+    """Artículos con abstract, con las columnas que usan las páginas Streamlit."""
+    return pd.read_sql_query(
+        "SELECT clave AS ID, titulo, abstract, autores AS autor, "
+        "COALESCE(CAST(anio AS TEXT), '') AS year "
+        "FROM articulos WHERE abstract <> '' ORDER BY id",
+        con,
+    )
+
+def abstracts_limpios(con: sqlite3.Connection) -> pd.DataFrame:
+    """Abstracts originales y limpios (mismas columnas que abstracts_limpios.csv)."""
+    return pd.read_sql_query(
+        "SELECT a.clave AS ID, a.abstract AS abstract_original, l.abstract_limpio "
+        "FROM articulos a JOIN abstracts_limpios l ON l.abstract_hash = a.abstract_hash "
+        "ORDER BY a.id",
+        con,
+    )
+
+def obtener_articulo(con: sqlite3.Connection, clave: str) -> dict | None:
+    fila = con.execute("SELECT * FROM articulos WHERE clave = ?", (clave,)).fetchone()
+    return dict(fila) if fila else None
+
+def obtener_por_doi(con: sqlite3.Connection, doi: str) -> dict | None:
+    fila = con.execute("SELECT * FROM articulos WHERE doi = ?", (normalizar_doi(doi),)).fetchone()
+    return dict(fila) if fila else None
+
+def articulos_de_autor(con: sqlite3.Connection, nombre: str) -> list[dict]:
+    filas = con.execute(
+        "SELECT a.clave, a.titulo, a.anio FROM articulos a "
+        "JOIN articulo_autor aa ON aa.articulo_id = a.id "
+        "JOIN autores au ON au.id = aa.autor_id "
+        "WHERE au.clave_norm = ? ORDER BY a.anio",
+        (normalizar_espacios(nombre).lower(),),
+    ).fetchall()
+    return [dict(f) for f in filas]
+
+def _consulta_fts(texto: str) -> str:
+    """Convierte texto libre en una consulta FTS5 segura (términos entre comillas, AND implícito)."""
+    terminos = re.findall(r'\w+', texto.lower())
+    return " ".join(f'"{t}"' for t in terminos)
+
+def buscar(con: sqlite3.Connection, texto: str, limite: int = 20) -> pd.DataFrame:
+    """
+    Búsqueda de texto completo sobre título y abstract, ordenada por BM25
+    (el título pesa el doble que el abstract).
+    """
+    consulta = _consulta_fts(texto)
+    if not consulta:
+        return pd.DataFrame(columns=["ID", "titulo", "year", "puntaje"])
+    return pd.read_sql_query(
+        "SELECT a.clave AS ID, a.titulo, a.anio AS year, "
+        "-bm25(articulos_fts, 2.0, 1.0) AS puntaje "
+        "FROM articulos_fts JOIN articulos a ON a.id = articulos_fts.rowid "
+        "WHERE articulos_fts MATCH ? ORDER BY bm25(articulos_fts, 2.0, 1.0) LIMIT ?",
+        con,
+        params=(consulta, limite),
+    )
+
+# ------------------------- Ejecución por consola -------------------------
+
+def main():
+    if not BIB_PATH.exists():
+        print(f"[ERROR] No existe el archivo de entrada: {BIB_PATH}", file=sys.stderr)
+        sys.exit(1)
+    con = construir()
+    try:
+        n_art = con.execute("SELECT COUNT(*) FROM articulos").fetchone()[0]
+        n_aut = con.execute("SELECT COUNT(*) FROM autores").fetchone()[0]
+        n_lim = len(abstracts_limpios(con))
+    finally:
+        con.close()
+    print(f"[OK] Artículos: {n_art}  Autores: {n_aut}  Abstracts limpios enlazados: {n_lim}")
+    print(f"[OK] Base guardada en: {DB_PATH}")
+
+if __name__ == "__main__":
+    main()
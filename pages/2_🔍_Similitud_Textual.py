@@ -2,23 +2,29 @@
 Página Streamlit - Requerimiento 2: Análisis de Similitud Textual
 """
 
+import atexit
 import streamlit as st
 import sys
 import pandas as pd
-import numpy as np
 from pathlib import Path
-import re
 import bibtexparser
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import Levenshtein
-from sentence_transformers import SentenceTransformer
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 # Agregar el directorio raíz al path
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "Requerimiento2"))
+
+import corpus
+from almacenEmbeddings import almacen_compartido
+from busquedaSimilares import MEDIDAS, BuscadorSimilares, firma_articulos
+from cachePares import CachePares
+from cacheRasgos import CacheRasgos, jaccard_conjuntos
+from ejecucionConcurrente import ejecutar_concurrente
+from modeloTfidf import ModeloTfidf
 
 st.title("🔍 Requerimiento 2: Análisis de Similitud Textual")
 
@@ -45,7 +51,13 @@ if not BIB_PATH.exists():
 # Cargar artículos
 @st.cache_data
 def cargar_articulos():
-    """Carga artículos desde el archivo BibTeX."""
+    """Carga artículos desde la base del corpus (si existe) o desde el archivo BibTeX."""
+    if corpus.existe():
+        try:
+            with corpus.leer() as con:
+                return corpus.articulos_con_abstract(con)
+        except Exception as e:
+            st.warning(f"No se pudo leer la base del corpus, se usa el BibTeX: {e}")
     try:
         with open(BIB_PATH, encoding="utf-8") as bibfile:
             bib_database = bibtexparser.load(bibfile)
@@ -75,34 +87,56 @@ if df is None or df.empty:
 
 st.success(f"✅ Se cargaron {len(df)} artículos con abstracts")
 
+# Conjuntos de palabras y n-gramas por abstract, compartidos entre sesiones
+@st.cache_resource
+def cargar_rasgos():
+    """Caché de rasgos (ids internados por hash de abstract)."""
+    return CacheRasgos.cargar()
+
+rasgos = cargar_rasgos()
+
 # Funciones de similitud
 def jaccard_similarity(a: str, b: str) -> float:
-    A = set(re.findall(r'\w+', a.lower()))
-    B = set(re.findall(r'\w+', b.lower()))
-    return len(A & B) / len(A | B) if (A | B) else 0.0
+    return jaccard_conjuntos(rasgos.tokens(a), rasgos.tokens(b))
+
+# TF-IDF ajustado una vez sobre todo el corpus (persistido en disco)
+@st.cache_resource
+def cargar_modelo_tfidf(_df, firma):
+    """
+    Modelo TF-IDF del corpus: vocabulario, IDF y filas normalizadas; `firma`
+    (firma_articulos) cambia con cualquier artículo del corpus.
+    """
+    return ModeloTfidf.cargar_o_ajustar(_df["abstract"].tolist())
+
+modelo_tfidf = cargar_modelo_tfidf(df, firma_articulos(df))
 
 def cosine_tfidf_similarity(a: str, b: str) -> float:
-    vectorizer = TfidfVectorizer().fit([a, b])
-    tfidf = vectorizer.transform([a, b])
-    return float(cosine_similarity(tfidf[0], tfidf[1])[0][0])
+    return modelo_tfidf.similitud(a, b)
 
 def levenshtein_similarity(a: str, b: str) -> float:
     dist = Levenshtein.distance(a, b)
     return 1 - dist / max(len(a), len(b)) if max(len(a), len(b)) > 0 else 0
 
 def ngram_overlap_similarity(a: str, b: str, n=3) -> float:
-    def ngrams(text, n):
-        text = re.sub(r'\s+', ' ', text.lower())
-        return {text[i:i+n] for i in range(len(text) - n + 1)}
-    A = ngrams(a, n)
-    B = ngrams(b, n)
-    return len(A & B) / len(A | B) if (A | B) else 0.0
-
-# Modelos de IA (cargar una vez)
+    return jaccard_conjuntos(rasgos.ngramas(a, n), rasgos.ngramas(b, n))
+
+# Modelos de IA (cargar una vez). Con el servicio de embeddings en marcha
+# (Requerimiento2/servicioEmbeddings.py) no se cargan: todas las sesiones y
+# scripts comparten su copia. Si el servicio se cae, los almacenes cargan el
+# modelo local al primer uso (CodificadorConRespaldo).
+@st.cache_data(ttl=30, show_spinner=False)
+def servicio_embeddings_activo():
+    """True si el servicio local de embeddings responde."""
+    from servicioEmbeddings import ClienteEmbeddings
+    return ClienteEmbeddings().disponible()
+
 @st.cache_resource
 def cargar_modelos():
     """Carga los modelos de IA."""
+    if servicio_embeddings_activo():
+        return None, None
     try:
+        from sentence_transformers import SentenceTransformer
         # Usar los mismos modelos que el script original
         distilbert = SentenceTransformer('distilbert-base-nli-stsb-mean-tokens')
         sbert = SentenceTransformer('all-MiniLM-L6-v2')
@@ -114,18 +148,93 @@ def cargar_modelos():
 
 distilbert_model, sbert_model = cargar_modelos()
 
-def distilbert_similarity(a: str, b: str, model) -> float:
-    if model is None:
+@st.cache_resource
+def cargar_almacenes(_distilbert, _sbert):
+    """Embeddings persistidos en disco: cada abstract se codifica una sola vez por modelo."""
+    # Sin servicio ni modelo cargado (falló la carga) el algoritmo queda desactivado
+    disponible = servicio_embeddings_activo()
+    distilbert = (almacen_compartido('distilbert-base-nli-stsb-mean-tokens', modelo=_distilbert)
+                  if disponible or _distilbert else None)
+    sbert = almacen_compartido('all-MiniLM-L6-v2', modelo=_sbert) if disponible or _sbert else None
+    return distilbert, sbert
+
+distilbert_almacen, sbert_almacen = cargar_almacenes(distilbert_model, sbert_model)
+
+def distilbert_similarity(a: str, b: str, almacen) -> float:
+    if almacen is None:
         return 0.0
-    embeddings = model.encode([a, b])
+    embeddings = almacen.obtener([a, b])
     return float(cosine_similarity([embeddings[0]], [embeddings[1]])[0][0])
 
-def sbert_similarity(a: str, b: str, model) -> float:
-    if model is None:
+def sbert_similarity(a: str, b: str, almacen) -> float:
+    if almacen is None:
         return 0.0
-    embeddings = model.encode([a, b])
+    embeddings = almacen.obtener([a, b])
     return float(cosine_similarity([embeddings[0]], [embeddings[1]])[0][0])
 
+# Resultados por par (algoritmo, hash_a, hash_b), compartidos entre sesiones
+@st.cache_resource
+def cargar_cache_pares():
+    """Caché LRU de similitudes por par, persistida en disco."""
+    cache = CachePares.cargar()
+    # Lo que quede sin escribir por el intervalo entre guardados se escribe al cerrar
+    atexit.register(cache.guardar, forzar=True)
+    return cache
+
+cache_pares = cargar_cache_pares()
+
+def clave_cache(algoritmo: str) -> str:
+    # El coseno TF-IDF depende del IDF del corpus: cambia si cambia el corpus
+    return f"{algoritmo} {modelo_tfidf.firma}" if algoritmo == 'Coseno (TF-IDF)' else algoritmo
+
+# Búsqueda de texto completo (solo con la base del corpus)
+if corpus.existe():
+    with st.expander("🔎 Buscar artículos por texto (título y abstract)"):
+        consulta = st.text_input("Términos de búsqueda", key="busqueda_fts")
+        if consulta:
+            with corpus.leer() as con:
+                encontrados = corpus.buscar(con, consulta, limite=20)
+            if encontrados.empty:
+                st.info("Sin resultados.")
+            else:
+                st.dataframe(encontrados, use_container_width=True)
+
+# Vecinos más cercanos en todo el corpus
+@st.cache_resource
+def cargar_buscador(_df, firma):
+    """
+    Índices de búsqueda (uno por medida, se construyen al primer uso) compartidos
+    entre sesiones; `firma` (firma_articulos) cambia con cualquier artículo del corpus.
+    """
+    almacenes = {"Sentence-BERT": sbert_almacen} if sbert_almacen is not None else {}
+    return BuscadorSimilares.desde_dataframe(_df, rasgos=rasgos, almacenes=almacenes)
+
+with st.expander("🧭 Artículos más similares de todo el corpus"):
+    buscador = cargar_buscador(df, firma_articulos(df))
+    modo_consulta = st.radio("Consultar por", ["Artículo del corpus", "Texto libre"], horizontal=True)
+    if modo_consulta == "Artículo del corpus":
+        idx_consulta = st.selectbox(
+            "Artículo",
+            range(len(df)),
+            format_func=lambda x: f"{df.iloc[x]['titulo'][:60]}..." if len(df.iloc[x]['titulo']) > 60 else df.iloc[x]['titulo'],
+            key="articulo_vecinos"
+        )
+        consulta_vecinos = df.iloc[idx_consulta]['ID']
+    else:
+        consulta_vecinos = st.text_area("Texto de consulta", key="texto_vecinos")
+    col_medida, col_k = st.columns(2)
+    with col_medida:
+        medida_vecinos = st.selectbox("Medida", MEDIDAS)
+    with col_k:
+        k_vecinos = st.slider("Número de resultados (k)", 1, 50, 10)
+    if consulta_vecinos and st.button("Buscar similares"):
+        try:
+            with st.spinner("Buscando..."):
+                similares = buscador.buscar(consulta_vecinos, medida_vecinos, k_vecinos)
+            st.dataframe(similares, use_container_width=True)
+        except Exception as e:
+            st.warning(f"No se pudo buscar con {medida_vecinos}: {e}")
+
 # Interfaz de usuario
 st.subheader("📋 Seleccionar Artículos para Comparar")
 
@@ -175,41 +284,50 @@ if st.button("🔍 Calcular Similitud", type="primary"):
         abstract1 = art1['abstract']
         abstract2 = art2['abstract']
         
-        resultados = {}
-        
-        # Algoritmos clásicos
-        resultados['Jaccard'] = jaccard_similarity(abstract1, abstract2)
-        resultados['Coseno (TF-IDF)'] = cosine_tfidf_similarity(abstract1, abstract2)
-        resultados['Levenshtein'] = levenshtein_similarity(abstract1, abstract2)
-        resultados['N-gramas'] = ngram_overlap_similarity(abstract1, abstract2)
-        
-        # Modelos de IA
-        if distilbert_model is not None:
-            try:
-                resultados['DistilBERT'] = distilbert_similarity(abstract1, abstract2, distilbert_model)
-            except Exception as e:
-                st.warning(f"Error con DistilBERT: {e}")
-                resultados['DistilBERT'] = None
-        else:
-            resultados['DistilBERT'] = None
-            
-        if sbert_model is not None:
-            try:
-                resultados['Sentence-BERT'] = sbert_similarity(abstract1, abstract2, sbert_model)
-            except Exception as e:
-                st.warning(f"Error con Sentence-BERT: {e}")
-                resultados['Sentence-BERT'] = None
-        else:
-            resultados['Sentence-BERT'] = None
-        
-        # Mostrar resultados
-        df_resultados = pd.DataFrame([
-            {"Algoritmo": k, "Similitud": f"{v:.4f}" if v is not None else "N/A", "Valor": v if v is not None else 0}
-            for k, v in resultados.items()
-        ])
-        
-        st.dataframe(df_resultados[["Algoritmo", "Similitud"]], use_container_width=True)
-        
+        # Los 6 algoritmos corren a la vez; la tabla se actualiza con cada uno que termina
+        funciones = {
+            'Jaccard': jaccard_similarity,
+            'Coseno (TF-IDF)': cosine_tfidf_similarity,
+            'Levenshtein': levenshtein_similarity,
+            'N-gramas': ngram_overlap_similarity,
+        }
+        if distilbert_almacen is not None:
+            funciones['DistilBERT'] = lambda a, b: distilbert_similarity(a, b, distilbert_almacen)
+        if sbert_almacen is not None:
+            funciones['Sentence-BERT'] = lambda a, b: sbert_similarity(a, b, sbert_almacen)
+        resultados = {k: None for k in ['Jaccard', 'Coseno (TF-IDF)', 'Levenshtein', 'N-gramas',
+                                        'DistilBERT', 'Sentence-BERT']}
+
+        # Los pares ya comparados (en cualquier sesión) salen de la caché sin calcular
+        tareas = {}
+        for nombre, funcion in funciones.items():
+            valor = cache_pares.obtener(clave_cache(nombre), abstract1, abstract2)
+            if valor is not None:
+                resultados[nombre] = valor
+            else:
+                tareas[nombre] = lambda n=nombre, f=funcion: cache_pares.obtener_o_calcular(
+                    clave_cache(n), abstract1, abstract2, f)
+
+        tabla = st.empty()
+        pendientes = set(tareas)
+
+        def mostrar_tabla():
+            tabla.dataframe(pd.DataFrame([
+                {"Algoritmo": k,
+                 "Similitud": f"{v:.4f}" if v is not None else "calculando..." if k in pendientes else "N/A"}
+                for k, v in resultados.items()
+            ]), use_container_width=True)
+
+        mostrar_tabla()
+        for nombre, valor, segundos, error in ejecutar_concurrente(tareas):
+            if error is not None:
+                st.warning(f"Error con {nombre}: {error}")
+            resultados[nombre] = valor
+            pendientes.discard(nombre)
+            mostrar_tabla()
+        rasgos.guardar()
+        cache_pares.guardar()
+
         # Gráfico de barras
         fig, ax = plt.subplots(figsize=(10, 6))
         algoritmos = [k for k, v in resultados.items() if v is not None]
@@ -17,6 +17,8 @@ import matplotlib.pyplot as plt
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+import corpus
+
 st.title("🌳 Requerimiento 4: Clustering Jerárquico")
 
 st.markdown("""
@@ -48,12 +50,23 @@ if not ABSTRACTS_CSV.exists():
                 st.info("Esta funcionalidad requiere ejecutar el script de preparación de datos.")
     st.stop()
 
+# La base del corpus enlaza los abstracts con el .bib limpio: puede tener menos
+# filas y otro orden que el CSV, y el clustering de los primeros N cambia
+usar_base = corpus.existe() and st.checkbox(
+    "Leer los abstracts desde la base del corpus (corpus.sqlite)", value=False,
+    help="Por defecto se usa abstracts_limpios.csv, en su orden original.")
+
 # Cargar datos
 @st.cache_data
-def cargar_datos():
-    """Carga los abstracts procesados."""
+def cargar_datos(usar_base: bool = False):
+    """Carga los abstracts procesados (CSV; la base del corpus solo si se elige)."""
     try:
-        df = pd.read_csv(ABSTRACTS_CSV)
+        df = None
+        if usar_base:
+            with corpus.leer() as con:
+                df = corpus.abstracts_limpios(con)
+        if df is None or df.empty:
+            df = pd.read_csv(ABSTRACTS_CSV)
         if 'abstract_limpio' not in df.columns:
             st.error("El archivo CSV no tiene la columna 'abstract_limpio'")
             return None
@@ -64,7 +77,7 @@ def cargar_datos():
         st.error(f"Error al cargar datos: {e}")
         return None
 
-df = cargar_datos()
+df = cargar_datos(usar_base)
 
 if df is None:
     st.stop()
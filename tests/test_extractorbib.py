@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Seguimiento1"))
+
+from extractorbib import extraer
+
+CON_ANIO = "@article{Smith2020,\n  title = {Deep {L}earning},\n  year = {2020},\n}"
+SIN_ANIO = "@article{Nadie,\n  title = {Sin fecha},\n}"
+
+
+def test_year_despues_de_get():
+    registro = extraer(CON_ANIO)
+    assert registro.get("year") == "2020"
+    assert registro.year == 2020
+
+
+def test_get_despues_de_year():
+    registro = extraer(CON_ANIO)
+    assert registro.year == 2020
+    assert registro.get("year") == "2020"
+
+
+def test_sin_anio_en_ambos_ordenes():
+    registro = extraer(SIN_ANIO)
+    assert registro.year is None
+    assert registro.get("year") == ""
+    assert registro.year is None
+
+    registro = extraer(SIN_ANIO)
+    assert registro.get("year") == ""
+    assert registro.year is None
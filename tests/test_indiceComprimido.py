@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Requerimiento2"))
+
+from indiceComprimido import IndiceComprimido, sinteticos
+
+
+def test_menos_filas_que_dimensiones():
+    E = sinteticos(5, dim=32)
+    indice = IndiceComprimido.ajustar(E, dim=64)
+    assert indice.dim == 5
+    assert indice.codigos.shape == (5, 5)
+    posiciones, _ = indice.buscar(E[0], k=3, excluir=0)
+    assert len(posiciones) == 3 and 0 not in posiciones
+
+
+def test_reordenado_recupera_los_vecinos_exactos():
+    E = sinteticos(500, dim=64)
+    indice = IndiceComprimido.ajustar(E, dim=16)
+    exactos = np.argsort(-(E @ E[7]))[1:6]
+    posiciones, _ = indice.buscar(E[7], k=5, excluir=7, reordenar=True)
+    assert set(posiciones.tolist()) == set(exactos.tolist())
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / "Requerimiento1"))
+
+from lecturabib import leer_bib
+
+# Casos del corpus real: valores con llaves anidadas, comillas, sangría en las
+# líneas siguientes y una llave de más dentro de un abstract (entrada rota).
+BIB = """@comment{ignorado}
+
+@article{Anidado2020,
+  title = {Deep {L}earning for {G}raphs},
+  author = "Smith, {J}ohn and {Doe, Jane}",
+  year = {2020},
+  abstract = {Primera línea
+            segunda línea con sangría
+            tercera.},
+}
+
+@article{Roto2021,
+  title = {Lower Bounds},
+  abstract = {As a corollary, OBDD}(x, r) is strictly weaker than OBDD}
+
+@inproceedings{Siguiente2022,
+  title = {After the broken one},
+  pages = 12,
+  abstract = {Sigue leyéndose.}
+}
+"""
+
+ARTICULOS_OPTIMOS = RAIZ / "Requerimiento1" / "ArchivosFiltrados" / "articulosOptimos.bib"
+
+
+@pytest.fixture
+def bib(tmp_path):
+    ruta = tmp_path / "prueba.bib"
+    ruta.write_text(BIB, encoding="utf-8")
+    return ruta
+
+
+def test_entradas_y_valores(bib):
+    entradas = leer_bib(bib, modo="secuencial")
+    # La entrada con la llave de más se descarta sin arrastrar a la siguiente
+    assert [e["ID"] for e in entradas] == ["Anidado2020", "Siguiente2022"]
+    anidado = entradas[0]
+    assert anidado["title"] == "Deep {L}earning for {G}raphs"
+    assert anidado["author"] == "Smith, {J}ohn and {Doe, Jane}"
+    assert anidado["abstract"] == "Primera línea\nsegunda línea con sangría\ntercera."
+    assert entradas[1]["pages"] == "12"
+
+
+def test_paralelo_igual_que_secuencial(bib):
+    assert leer_bib(bib, modo="paralelo", procesos=2, trozos=3) == leer_bib(bib, modo="secuencial")
+
+
+def _bibtexparser(ruta: Path) -> list[dict]:
+    bibtexparser = pytest.importorskip("bibtexparser")
+    with open(ruta, encoding="utf-8") as f:
+        return bibtexparser.load(f).entries
+
+
+def test_igual_que_bibtexparser(bib):
+    assert leer_bib(bib, modo="secuencial") == _bibtexparser(bib)
+
+
+@pytest.mark.skipif(not ARTICULOS_OPTIMOS.exists(), reason="sin el corpus filtrado")
+def test_indices_del_corpus_igual_que_bibtexparser():
+    # similitudTextual numera los artículos por su posición: deben ser los mismos
+    assert leer_bib(ARTICULOS_OPTIMOS) == _bibtexparser(ARTICULOS_OPTIMOS)